@@ -6,11 +6,16 @@ Usage:
     python main.py [OPTIONS]
 
 Environment Variables:
-    PHONE_AGENT_BASE_URL: Model API base URL (default: http://localhost:8000/v1)
+    PHONE_AGENT_BASE_URL: Model API base URL, comma-separated for several
+        replicas (default: http://localhost:8000/v1)
     PHONE_AGENT_MODEL: Model name (default: autoglm-phone-9b)
     PHONE_AGENT_API_KEY: API key for model authentication (default: EMPTY)
     PHONE_AGENT_MAX_STEPS: Maximum steps per task (default: 100)
+    PHONE_AGENT_CONTEXT_BUDGET: Prompt token budget (default: unlimited)
     PHONE_AGENT_DEVICE_ID: ADB device ID for multi-device setups
+    PHONE_AGENT_DEVICES: Devices to run a task file on concurrently (fleet mode)
+    PHONE_AGENT_TRACE_FILE: Chrome trace-event file to write step traces to
+    PHONE_AGENT_METRICS_PORT: Port to serve Prometheus metrics on at /metrics
 """
 
 import argparse
@@ -18,6 +23,7 @@ import os
 import shutil
 import subprocess
 import sys
+from typing import Iterator
 from urllib.parse import urlparse
 
 from openai import OpenAI
@@ -25,11 +31,16 @@ from openai import OpenAI
 from phone_agent import PhoneAgent
 from phone_agent.agent import AgentConfig
 from phone_agent.agent_ios import IOSAgentConfig, IOSPhoneAgent
+from phone_agent.batch import run_batch
 from phone_agent.config.apps import list_supported_apps
 from phone_agent.config.apps_harmonyos import list_supported_apps as list_harmonyos_apps
 from phone_agent.config.apps_ios import list_supported_apps as list_ios_apps
 from phone_agent.device_factory import DeviceType, get_device_factory, set_device_type
+from phone_agent.fleet import Fleet, TaskResult, discover_devices
+from phone_agent.metrics import start_metrics_server
 from phone_agent.model import ModelConfig
+from phone_agent.tracing import format_summary, get_tracer
+from phone_agent.trajectory import Trajectory
 from phone_agent.xctest import XCTestConnection
 from phone_agent.xctest import list_devices as list_ios_devices
 
@@ -377,6 +388,12 @@ Examples:
     # List connected devices
     python main.py --list-devices
 
+    # Run a task file (one task per line) on every connected device
+    python main.py --devices all --task-file tasks.txt
+
+    # Run a JSONL batch, resumable: rerun to skip the tasks already done
+    python main.py --batch tasks.jsonl --results results.jsonl
+
     # Enable TCP/IP on USB device and get connection info
     python main.py --enable-tcpip
 
@@ -406,7 +423,48 @@ Examples:
         "--base-url",
         type=str,
         default=os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1"),
-        help="Model API base URL",
+        help="Model API base URL; comma-separate several replicas to balance "
+        "requests across them and fail over between them",
+    )
+
+    parser.add_argument(
+        "--routing",
+        type=str,
+        choices=["least_outstanding", "ewma"],
+        default="least_outstanding",
+        help="How requests are spread over several base URLs: fewest in flight "
+        "or lowest expected time to first token",
+    )
+
+    parser.add_argument(
+        "--first-token-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds to wait for the model's first token before retrying",
+    )
+
+    parser.add_argument(
+        "--model-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds a model request may take in total, retries included",
+    )
+
+    parser.add_argument(
+        "--model-retries",
+        type=int,
+        default=2,
+        help="Retries of model requests that failed with a connection error, "
+        "timeout, 429 or 5xx (jittered exponential backoff)",
+    )
+
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=None,
+        help="With several base URLs, send a duplicate request to another one "
+        "when no token arrived within this percentile of recent times to first "
+        "token (e.g. 95); the first stream to start wins",
     )
 
     parser.add_argument(
@@ -430,6 +488,86 @@ Examples:
         help="Maximum steps per task",
     )
 
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        default=os.getenv("PHONE_AGENT_CONTEXT_BUDGET"),
+        help="Prompt token budget; older steps are summarized to stay within it",
+    )
+
+    parser.add_argument(
+        "--context-keep-turns",
+        type=int,
+        default=4,
+        help="Recent steps always sent verbatim when a context budget is set",
+    )
+
+    parser.add_argument(
+        "--stable-prompt-prefix",
+        action="store_true",
+        help="Send the date with the task instead of in the system prompt, so the "
+        "server's prefix cache is reused across days and processes",
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        default=os.getenv("PHONE_AGENT_TRACE_FILE"),
+        help="Write the traced step phases and device calls to a Chrome "
+        "trace-event JSON file (open in chrome://tracing or Perfetto)",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=os.getenv("PHONE_AGENT_METRICS_PORT"),
+        help="Serve latency and task metrics for Prometheus at "
+        "http://127.0.0.1:PORT/metrics while running",
+    )
+
+    parser.add_argument(
+        "--report-usage",
+        action="store_true",
+        help="Request token usage and report prompt cache hits (vLLM/SGLang)",
+    )
+
+    # Model input image options
+    parser.add_argument(
+        "--image-max-edge",
+        type=int,
+        default=os.getenv("PHONE_AGENT_IMAGE_MAX_EDGE"),
+        help="Downscale screenshots so the longer side is at most this many pixels",
+    )
+
+    parser.add_argument(
+        "--image-max-pixels",
+        type=int,
+        default=os.getenv("PHONE_AGENT_IMAGE_MAX_PIXELS"),
+        help="Downscale screenshots to at most this many pixels",
+    )
+
+    parser.add_argument(
+        "--image-format",
+        type=str,
+        choices=["png", "jpeg", "webp"],
+        default=os.getenv("PHONE_AGENT_IMAGE_FORMAT"),
+        help="Screenshot upload format (default: keep the captured format)",
+    )
+
+    parser.add_argument(
+        "--image-quality",
+        type=int,
+        default=int(os.getenv("PHONE_AGENT_IMAGE_QUALITY", "85")),
+        help="JPEG/WebP quality for screenshot uploads (default: 85)",
+    )
+
+    parser.add_argument(
+        "--image-grayscale",
+        action="store_true",
+        help="Send screenshots to the model in grayscale",
+    )
+
     # Device options
     parser.add_argument(
         "--device-id",
@@ -439,6 +577,58 @@ Examples:
         help="ADB device ID",
     )
 
+    parser.add_argument(
+        "--devices",
+        type=str,
+        default=os.getenv("PHONE_AGENT_DEVICES"),
+        help="Comma-separated device IDs, or 'all' for every connected device, "
+        "to run tasks on concurrently with one agent per device (fleet mode)",
+    )
+
+    parser.add_argument(
+        "--task-file",
+        type=str,
+        help="File with one task per line ('-' for stdin), for fleet mode",
+    )
+
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="TASKS_JSONL",
+        help='Run the tasks of a JSONL file ({"id": ..., "task": ...} per line), '
+        "skipping those already in the results file",
+    )
+
+    parser.add_argument(
+        "--results",
+        type=str,
+        metavar="RESULTS_JSONL",
+        help="Append-only results file of --batch (default: <batch>.results.jsonl)",
+    )
+
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="With --batch, run tasks whose recorded result failed again",
+    )
+
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="FILE",
+        help="Save the trajectory of the task (screens, model output, actions) "
+        "to a JSON file for --replay",
+    )
+
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="FILE",
+        help="Replay a trajectory saved with --record, asking the model only "
+        "where the screen differs from the recording (the task defaults to "
+        "the recorded one)",
+    )
+
     parser.add_argument(
         "--connect",
         "-c",
@@ -469,6 +659,13 @@ Examples:
         help="Enable TCP/IP debugging on USB device (default port: 5555)",
     )
 
+    parser.add_argument(
+        "--watch-app",
+        action="store_true",
+        default=os.getenv("PHONE_AGENT_WATCH_APP", "").lower() in ("true", "1", "yes"),
+        help="Track the foreground app in the background (Android/HarmonyOS)",
+    )
+
     # iOS specific options
     parser.add_argument(
         "--wda-url",
@@ -681,6 +878,157 @@ def handle_device_commands(args) -> bool:
     return False
 
 
+def read_task_file(path: str) -> Iterator[str]:
+    """
+    Yield the tasks of a task file, one per non-empty line.
+
+    Args:
+        path: Task file, or "-" for stdin.
+    """
+    if path == "-":
+        lines = (line.strip() for line in sys.stdin)
+        yield from (line for line in lines if line)
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()
+
+
+def save_trajectory(args, agent) -> None:
+    """Save the trajectory of the agent's last task if --record was given."""
+    if not args.record or agent.trajectory is None:
+        return
+    trajectory = agent.trajectory
+    trajectory.save(args.record)
+    replayed = sum(step.replayed for step in trajectory.steps)
+    print(
+        f"Trajectory: {len(trajectory.steps)} steps ({replayed} replayed) "
+        f"saved to {args.record}"
+    )
+
+
+def report_trace(args, agent=None) -> None:
+    """
+    Print the latency breakdown of the last task and export the trace.
+
+    Args:
+        args: Parsed command line arguments.
+        agent: Agent that ran the task; its breakdown is printed unless quiet.
+    """
+    if isinstance(agent, PhoneAgent) and not args.quiet:
+        summary = agent.trace_summary()
+        if summary:
+            print("\nLatency breakdown:")
+            print(format_summary(summary))
+    if args.trace:
+        count = get_tracer().export_chrome_trace(args.trace)
+        print(f"Trace: {count} spans written to {args.trace}")
+
+
+def run_fleet(args, device_type: DeviceType, model_config: ModelConfig) -> None:
+    """
+    Run a task file or a batch on one or more devices (fleet mode).
+
+    Args:
+        args: Parsed command line arguments.
+        device_type: ADB or HDC.
+        model_config: Model configuration shared by all devices.
+    """
+    if device_type == DeviceType.IOS:
+        print("Error: Fleet mode supports ADB and HDC devices only")
+        sys.exit(1)
+
+    if not args.devices:
+        # A batch without --devices runs on the selected or first device
+        if args.device_id:
+            device_ids = [args.device_id]
+        else:
+            device_ids = discover_devices(device_type)[:1]
+    elif args.devices.strip().lower() == "all":
+        device_ids = discover_devices(device_type)
+    else:
+        device_ids = [d.strip() for d in args.devices.split(",") if d.strip()]
+    if not device_ids:
+        print("Error: No devices for fleet mode")
+        sys.exit(1)
+
+    if args.batch:
+        tasks = None
+    elif args.task_file:
+        tasks = read_task_file(args.task_file)
+    elif args.task:
+        tasks = iter([args.task])
+    else:
+        print("Error: Fleet mode needs --batch, --task-file or a task")
+        sys.exit(1)
+
+    # Output of several devices would interleave, so report one line per task
+    agent_config = AgentConfig(
+        max_steps=args.max_steps,
+        verbose=False,
+        lang=args.lang,
+        watch_foreground_app=args.watch_app,
+        context_max_tokens=args.context_budget,
+        context_keep_turns=args.context_keep_turns,
+        stable_prompt_prefix=args.stable_prompt_prefix,
+    )
+    fleet = Fleet(device_ids, model_config, agent_config, device_type=device_type)
+
+    print("=" * 50)
+    print("Phone Agent - Fleet mode")
+    print("=" * 50)
+    print(f"Model: {model_config.model_name}")
+    print(f"Base URL: {', '.join(model_config.base_urls or [model_config.base_url])}")
+    print(f"Max Steps: {agent_config.max_steps}")
+    print(f"Device Type: {args.device_type.upper()}")
+    print(f"Devices ({len(device_ids)}): {', '.join(device_ids)}")
+    if args.batch:
+        results_path = args.results or (
+            f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+        )
+        print(f"Batch: {args.batch} -> {results_path}")
+    print("=" * 50)
+
+    def report(result: TaskResult) -> None:
+        status = "✅" if result.success else "❌"
+        outcome = result.error or result.message
+        print(
+            f"{status} [{result.device_id}] {result.task} -> {outcome} "
+            f"({result.steps} steps, {result.duration:.1f}s)"
+        )
+
+    try:
+        if args.batch:
+            stats = run_batch(
+                fleet, args.batch, results_path, args.retry_failed, on_result=report
+            )
+        else:
+            stats = fleet.run(tasks, on_result=report)
+    except KeyboardInterrupt:
+        print("\n\nInterrupted.")
+        stats = fleet.stats()
+
+    print("\n" + "=" * 50)
+    print(
+        f"Tasks: {stats['tasks']} ({stats['failures']} failed) in "
+        f"{stats['elapsed'] / 60:.1f} min, {stats['tasks_per_hour']:.1f} tasks/hour"
+    )
+    if "skipped" in stats:
+        print(f"Skipped (already done): {stats['skipped']}")
+    print(f"Utilisation: {stats['utilisation']:.0%}")
+    for device in stats["devices"]:
+        line = (
+            f"  {device['device_id']}: {device['tasks']} tasks, "
+            f"{device['failures']} failed, {device['utilisation']:.0%} busy"
+        )
+        if device["retired"]:
+            line += f", retired ({device['retired']})"
+        print(line)
+    print("=" * 50)
+    report_trace(args)
+
+
 def main():
     """Main entry point."""
     args = parse_args()
@@ -740,18 +1088,50 @@ def main():
     ):
         sys.exit(1)
 
-    # Check model API connectivity and model availability
-    if not check_model_api(args.base_url, args.model, args.apikey):
+    # Check model API connectivity and model availability; with several
+    # replicas, one that works is enough (failed ones are ejected at runtime)
+    base_urls = [url.strip() for url in args.base_url.split(",") if url.strip()]
+    checks = [check_model_api(url, args.model, args.apikey) for url in base_urls]
+    if not any(checks):
         sys.exit(1)
 
     # Create configurations and agent based on device type
     model_config = ModelConfig(
-        base_url=args.base_url,
+        base_url=base_urls[0],
+        base_urls=base_urls if len(base_urls) > 1 else [],
+        routing=args.routing,
+        hedge_percentile=args.hedge_percentile,
+        first_token_timeout=args.first_token_timeout,
+        total_timeout=args.model_timeout,
+        max_retries=args.model_retries,
         model_name=args.model,
         api_key=args.apikey,
         lang=args.lang,
+        image_max_long_edge=args.image_max_edge,
+        image_max_pixels=args.image_max_pixels,
+        image_format=args.image_format,
+        image_quality=args.image_quality,
+        image_grayscale=args.image_grayscale,
+        report_usage=args.report_usage,
     )
 
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port)
+        print(f"Metrics: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    if args.devices or args.batch:
+        run_fleet(args, device_type, model_config)
+        return
+
+    replay = None
+    if args.record or args.replay:
+        if device_type == DeviceType.IOS:
+            print("Error: --record and --replay support ADB and HDC devices only")
+            sys.exit(1)
+        if args.replay:
+            replay = Trajectory.load(args.replay)
+            args.task = args.task or replay.task
+
     if device_type == DeviceType.IOS:
         # Create iOS agent
         agent_config = IOSAgentConfig(
@@ -760,6 +1140,9 @@ def main():
             device_id=args.device_id,
             verbose=not args.quiet,
             lang=args.lang,
+            context_max_tokens=args.context_budget,
+            context_keep_turns=args.context_keep_turns,
+            stable_prompt_prefix=args.stable_prompt_prefix,
         )
 
         agent = IOSPhoneAgent(
@@ -773,6 +1156,11 @@ def main():
             device_id=args.device_id,
             verbose=not args.quiet,
             lang=args.lang,
+            watch_foreground_app=args.watch_app,
+            context_max_tokens=args.context_budget,
+            context_keep_turns=args.context_keep_turns,
+            stable_prompt_prefix=args.stable_prompt_prefix,
+            record_trajectory=bool(args.record),
         )
 
         agent = PhoneAgent(
@@ -788,7 +1176,7 @@ def main():
         print("Phone Agent - AI-powered phone automation")
     print("=" * 50)
     print(f"Model: {model_config.model_name}")
-    print(f"Base URL: {model_config.base_url}")
+    print(f"Base URL: {', '.join(base_urls)}")
     print(f"Max Steps: {agent_config.max_steps}")
     print(f"Language: {agent_config.lang}")
     print(f"Device Type: {args.device_type.upper()}")
@@ -820,8 +1208,13 @@ def main():
     # Run with provided task or enter interactive mode
     if args.task:
         print(f"\nTask: {args.task}\n")
-        result = agent.run(args.task)
+        if replay is not None:
+            result = agent.run(args.task, replay=replay)
+        else:
+            result = agent.run(args.task)
         print(f"\nResult: {result}")
+        report_trace(args, agent)
+        save_trajectory(args, agent)
     else:
         # Interactive mode
         print("\nEntering interactive mode. Type 'quit' to exit.\n")
@@ -839,7 +1232,10 @@ def main():
 
                 print()
                 result = agent.run(task)
-                print(f"\nResult: {result}\n")
+                print(f"\nResult: {result}")
+                report_trace(args, agent)
+                save_trajectory(args, agent)
+                print()
                 agent.reset()
 
             except KeyboardInterrupt:
@@ -1,5 +1,6 @@
 """Action handling module for Phone Agent."""
 
 from phone_agent.actions.handler import ActionHandler, ActionResult
+from phone_agent.actions.handler_async import AsyncActionHandler
 
-__all__ = ["ActionHandler", "ActionResult"]
+__all__ = ["ActionHandler", "AsyncActionHandler", "ActionResult"]
@@ -8,7 +8,9 @@ from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceFactory, get_device_factory
+from phone_agent.metrics import ACTION_LATENCY
+from phone_agent.tracing import span
 
 
 @dataclass
@@ -30,6 +32,7 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        device_factory: Device factory to act through; defaults to the global one.
     """
 
     def __init__(
@@ -37,8 +40,10 @@ class ActionHandler:
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.device_id = device_id
+        self.device_factory = device_factory or get_device_factory()
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
 
@@ -56,6 +61,23 @@ class ActionHandler:
         Returns:
             ActionResult indicating success and whether to finish.
         """
+        name = action.get("action") or action.get("_metadata")
+        start = time.perf_counter()
+        with span("action", action=name) as action_span:
+            result = self._execute(action, screen_width, screen_height)
+            action_span.set(success=result.success)
+
+        # Model-made names would give the metric unbounded label values
+        known = name == "finish" or self._get_handler(name) is not None
+        ACTION_LATENCY.observe(
+            time.perf_counter() - start, action=name if known else "unknown"
+        )
+        return result
+
+    def _execute(
+        self, action: dict[str, Any], screen_width: int, screen_height: int
+    ) -> ActionResult:
+        """Dispatch an action to its handler."""
         action_type = action.get("_metadata")
 
         if action_type == "finish":
@@ -110,7 +132,13 @@ class ActionHandler:
     def _convert_relative_to_absolute(
         self, element: list[int], screen_width: int, screen_height: int
     ) -> tuple[int, int]:
-        """Convert relative coordinates (0-1000) to absolute pixels."""
+        """
+        Convert relative coordinates (0-1000) to absolute pixels.
+
+        Relative coordinates do not depend on the resolution shown to the model,
+        so the size passed here must be the captured screen size, not the size
+        of a downscaled model-input image.
+        """
         x = int(element[0] / 1000 * screen_width)
         y = int(element[1] / 1000 * screen_height)
         return x, y
@@ -121,7 +149,7 @@ class ActionHandler:
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         success = device_factory.launch_app(app_name, self.device_id)
         if success:
             return ActionResult(True, False)
@@ -144,7 +172,7 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -152,23 +180,31 @@ class ActionHandler:
         """Handle text input action."""
         text = action.get("text", "")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
 
         # Switch to ADB keyboard
         original_ime = device_factory.detect_and_set_adb_keyboard(self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
+        device_factory.wait_for_settle(
+            TIMING_CONFIG.action.keyboard_switch_delay, self.device_id
+        )
 
         # Clear existing text and type new text
         device_factory.clear_text(self.device_id)
-        time.sleep(TIMING_CONFIG.action.text_clear_delay)
+        device_factory.wait_for_settle(
+            TIMING_CONFIG.action.text_clear_delay, self.device_id
+        )
 
         # Handle multiline text by splitting on newlines
         device_factory.type_text(text, self.device_id)
-        time.sleep(TIMING_CONFIG.action.text_input_delay)
+        device_factory.wait_for_settle(
+            TIMING_CONFIG.action.text_input_delay, self.device_id
+        )
 
         # Restore original keyboard
         device_factory.restore_keyboard(original_ime, self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_restore_delay)
+        device_factory.wait_for_settle(
+            TIMING_CONFIG.action.keyboard_restore_delay, self.device_id
+        )
 
         return ActionResult(True, False)
 
@@ -183,19 +219,19 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.back(self.device_id)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.home(self.device_id)
         return ActionResult(True, False)
 
@@ -206,7 +242,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.double_tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -217,7 +253,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.long_press(x, y, device_id=self.device_id)
         return ActionResult(True, False)
 
@@ -230,12 +266,16 @@ class ActionHandler:
             duration = 1.0
 
         time.sleep(duration)
+        # Loading screens may have handed over to another app meanwhile
+        self.device_factory.invalidate_current_app(self.device_id)
         return ActionResult(True, False)
 
     def _handle_takeover(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle takeover request (login, captcha, etc.)."""
         message = action.get("message", "User intervention required")
         self.takeover_callback(message)
+        # The user may have switched apps while in control
+        self.device_factory.invalidate_current_app(self.device_id)
         return ActionResult(True, False)
 
     def _handle_note(self, action: dict, width: int, height: int) -> ActionResult:
@@ -257,10 +297,10 @@ class ActionHandler:
 
     def _send_keyevent(self, keycode: str) -> None:
         """Send a keyevent to the device."""
-        from phone_agent.device_factory import DeviceType, get_device_factory
+        from phone_agent.device_factory import DeviceType
         from phone_agent.hdc.connection import _run_hdc_command
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
 
         # Handle HDC devices with HarmonyOS-specific keyEvent command
         if device_factory.device_type == DeviceType.HDC:
@@ -0,0 +1,303 @@
+"""Asyncio action handler driving an AsyncDeviceFactory."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from phone_agent.actions.handler import ActionHandler, ActionResult
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import AsyncDeviceFactory
+from phone_agent.metrics import ACTION_LATENCY
+
+
+class AsyncActionHandler:
+    """
+    Executes model actions on a device without blocking the event loop.
+
+    Mirrors ActionHandler. Confirmation and takeover callbacks may block
+    (e.g. wait for console input); they run on a worker thread.
+
+    Args:
+        device_factory: Async device factory used for all device calls.
+        device_id: Optional device ID for multi-device setups.
+        confirmation_callback: Optional callback for sensitive action confirmation.
+            Should return True to proceed, False to cancel.
+        takeover_callback: Optional callback for takeover requests (login, captcha).
+    """
+
+    def __init__(
+        self,
+        device_factory: AsyncDeviceFactory,
+        device_id: str | None = None,
+        confirmation_callback: Callable[[str], bool] | None = None,
+        takeover_callback: Callable[[str], None] | None = None,
+    ):
+        self.device_factory = device_factory
+        self.device_id = device_id
+        self.confirmation_callback = (
+            confirmation_callback or ActionHandler._default_confirmation
+        )
+        self.takeover_callback = takeover_callback or ActionHandler._default_takeover
+
+        # Original IME while the ADB keyboard is kept active (see prepare_keyboard)
+        self._original_ime: str | None = None
+
+    @property
+    def keyboard_prepared(self) -> bool:
+        """Whether the ADB keyboard is already active for text input."""
+        return self._original_ime is not None
+
+    async def prepare_keyboard(self) -> None:
+        """
+        Switch to the ADB keyboard ahead of time, e.g. while the model streams.
+
+        Type actions then skip the per-action switch and restore. Call
+        restore_keyboard() when the task is over.
+        """
+        if self._original_ime is None:
+            self._original_ime = await self.device_factory.detect_and_set_adb_keyboard(
+                self.device_id
+            )
+
+    async def restore_keyboard(self) -> None:
+        """Restore the keyboard that was active before prepare_keyboard()."""
+        ime, self._original_ime = self._original_ime, None
+        if ime is not None:
+            await self.device_factory.restore_keyboard(ime, self.device_id)
+
+    async def execute(
+        self, action: dict[str, Any], screen_width: int, screen_height: int
+    ) -> ActionResult:
+        """
+        Execute an action from the AI model.
+
+        Args:
+            action: The action dictionary from the model.
+            screen_width: Current screen width in pixels.
+            screen_height: Current screen height in pixels.
+
+        Returns:
+            ActionResult indicating success and whether to finish.
+        """
+        name = action.get("action") or action.get("_metadata")
+        start = time.perf_counter()
+        result = await self._execute(action, screen_width, screen_height)
+
+        # Model-made names would give the metric unbounded label values
+        known = name == "finish" or self._get_handler(name) is not None
+        ACTION_LATENCY.observe(
+            time.perf_counter() - start, action=name if known else "unknown"
+        )
+        return result
+
+    async def _execute(
+        self, action: dict[str, Any], screen_width: int, screen_height: int
+    ) -> ActionResult:
+        """Dispatch an action to its handler."""
+        action_type = action.get("_metadata")
+
+        if action_type == "finish":
+            return ActionResult(
+                success=True, should_finish=True, message=action.get("message")
+            )
+
+        if action_type != "do":
+            return ActionResult(
+                success=False,
+                should_finish=True,
+                message=f"Unknown action type: {action_type}",
+            )
+
+        action_name = action.get("action")
+        handler_method = self._get_handler(action_name)
+
+        if handler_method is None:
+            return ActionResult(
+                success=False,
+                should_finish=False,
+                message=f"Unknown action: {action_name}",
+            )
+
+        try:
+            return await handler_method(action, screen_width, screen_height)
+        except Exception as e:
+            return ActionResult(
+                success=False, should_finish=False, message=f"Action failed: {e}"
+            )
+
+    def _get_handler(
+        self, action_name: str
+    ) -> Callable[[dict, int, int], Awaitable[ActionResult]] | None:
+        """Get the handler method for an action."""
+        handlers = {
+            "Launch": self._handle_launch,
+            "Tap": self._handle_tap,
+            "Type": self._handle_type,
+            "Type_Name": self._handle_type,
+            "Swipe": self._handle_swipe,
+            "Back": self._handle_back,
+            "Home": self._handle_home,
+            "Double Tap": self._handle_double_tap,
+            "Long Press": self._handle_long_press,
+            "Wait": self._handle_wait,
+            "Take_over": self._handle_takeover,
+            "Note": self._handle_noop,
+            "Call_API": self._handle_noop,
+            "Interact": self._handle_interact,
+        }
+        return handlers.get(action_name)
+
+    @staticmethod
+    def _to_absolute(element: list[int], width: int, height: int) -> tuple[int, int]:
+        """Convert relative coordinates (0-1000) to captured-screen pixels."""
+        return int(element[0] / 1000 * width), int(element[1] / 1000 * height)
+
+    async def _handle_launch(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle app launch action."""
+        app_name = action.get("app")
+        if not app_name:
+            return ActionResult(False, False, "No app name specified")
+
+        if await self.device_factory.launch_app(app_name, self.device_id):
+            return ActionResult(True, False)
+        return ActionResult(False, False, f"App not found: {app_name}")
+
+    async def _handle_tap(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle tap action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._to_absolute(element, width, height)
+
+        # Check for sensitive operation
+        if "message" in action:
+            confirmed = await asyncio.to_thread(
+                self.confirmation_callback, action["message"]
+            )
+            if not confirmed:
+                return ActionResult(
+                    success=False,
+                    should_finish=True,
+                    message="User cancelled sensitive operation",
+                )
+
+        await self.device_factory.tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle text input action."""
+        text = action.get("text", "")
+        factory = self.device_factory
+
+        prepared = self.keyboard_prepared
+        if not prepared:
+            original_ime = await factory.detect_and_set_adb_keyboard(self.device_id)
+            await factory.wait_for_settle(
+                TIMING_CONFIG.action.keyboard_switch_delay, self.device_id
+            )
+
+        await factory.clear_text(self.device_id)
+        await factory.wait_for_settle(
+            TIMING_CONFIG.action.text_clear_delay, self.device_id
+        )
+
+        await factory.type_text(text, self.device_id)
+        await factory.wait_for_settle(
+            TIMING_CONFIG.action.text_input_delay, self.device_id
+        )
+
+        if not prepared:
+            await factory.restore_keyboard(original_ime, self.device_id)
+            await factory.wait_for_settle(
+                TIMING_CONFIG.action.keyboard_restore_delay, self.device_id
+            )
+
+        return ActionResult(True, False)
+
+    async def _handle_swipe(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle swipe action."""
+        start = action.get("start")
+        end = action.get("end")
+
+        if not start or not end:
+            return ActionResult(False, False, "Missing swipe coordinates")
+
+        start_x, start_y = self._to_absolute(start, width, height)
+        end_x, end_y = self._to_absolute(end, width, height)
+
+        await self.device_factory.swipe(
+            start_x, start_y, end_x, end_y, device_id=self.device_id
+        )
+        return ActionResult(True, False)
+
+    async def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle back button action."""
+        await self.device_factory.back(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle home button action."""
+        await self.device_factory.home(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_double_tap(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle double tap action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._to_absolute(element, width, height)
+        await self.device_factory.double_tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_long_press(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle long press action."""
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+
+        x, y = self._to_absolute(element, width, height)
+        await self.device_factory.long_press(x, y, device_id=self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle wait action."""
+        duration_str = action.get("duration", "1 seconds")
+        try:
+            duration = float(duration_str.replace("seconds", "").strip())
+        except ValueError:
+            duration = 1.0
+
+        await asyncio.sleep(duration)
+        # Loading screens may have handed over to another app meanwhile
+        self.device_factory.invalidate_current_app(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_takeover(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle takeover request (login, captcha, etc.)."""
+        message = action.get("message", "User intervention required")
+        await asyncio.to_thread(self.takeover_callback, message)
+        # The user may have switched apps while in control
+        self.device_factory.invalidate_current_app(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_noop(self, action: dict, width: int, height: int) -> ActionResult:
+        """Handle Note and Call_API actions (placeholders, nothing to execute)."""
+        return ActionResult(True, False)
+
+    async def _handle_interact(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        """Handle interaction request (user choice needed)."""
+        return ActionResult(True, False, message="User interaction required")
@@ -4,6 +4,7 @@ import time
 from dataclasses import dataclass
 from typing import Any, Callable
 
+from phone_agent.settle import wait_for_settle
 from phone_agent.xctest import (
     back,
     double_tap,
@@ -14,6 +15,7 @@ from phone_agent.xctest import (
     tap,
 )
 from phone_agent.xctest.input import clear_text, hide_keyboard, type_text
+from phone_agent.xctest.screenshot import get_settle_frame
 
 
 @dataclass
@@ -164,14 +166,14 @@ class IOSActionHandler:
 
         # Clear existing text and type new text
         clear_text(wda_url=self.wda_url, session_id=self.session_id)
-        time.sleep(0.5)
+        wait_for_settle(0.5, lambda: get_settle_frame(self.wda_url, self.session_id))
 
         type_text(text, wda_url=self.wda_url, session_id=self.session_id)
-        time.sleep(0.5)
+        wait_for_settle(0.5, lambda: get_settle_frame(self.wda_url, self.session_id))
 
         # Hide keyboard after typing
         hide_keyboard(wda_url=self.wda_url, session_id=self.session_id)
-        time.sleep(0.5)
+        wait_for_settle(0.5, lambda: get_settle_frame(self.wda_url, self.session_id))
 
         return ActionResult(True, False)
 
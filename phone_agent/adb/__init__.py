@@ -12,6 +12,7 @@ from phone_agent.adb.device import (
     double_tap,
     get_current_app,
     home,
+    invalidate_current_app,
     launch_app,
     long_press,
     swipe,
@@ -23,11 +24,30 @@ from phone_agent.adb.input import (
     restore_keyboard,
     type_text,
 )
-from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.protocol import ADBServerClient, set_adb_transport
+from phone_agent.adb.screenshot import (
+    get_screenshot,
+    get_settle_frame,
+    mark_action,
+    set_screenshot_mode,
+    set_settle_source,
+)
+from phone_agent.adb.shell import close_sessions, run_shell, set_persistent_shell
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "get_settle_frame",
+    "mark_action",
+    "set_screenshot_mode",
+    "set_settle_source",
+    # Transport
+    "ADBServerClient",
+    "set_adb_transport",
+    # Shell
+    "run_shell",
+    "set_persistent_shell",
+    "close_sessions",
     # Input
     "type_text",
     "clear_text",
@@ -35,6 +55,7 @@ __all__ = [
     "restore_keyboard",
     # Device control
     "get_current_app",
+    "invalidate_current_app",
     "tap",
     "swipe",
     "back",
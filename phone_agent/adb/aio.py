@@ -0,0 +1,615 @@
+"""Asyncio counterparts of the ADB device functions.
+
+Every coroutine mirrors the synchronous function of the same name in
+phone_agent.adb and shares its command lines, parsers and current-app cache.
+With the socket transport (PHONE_AGENT_ADB_TRANSPORT=socket) commands go to the
+adb server over asyncio streams, which is the cheapest way to drive many
+devices from one event loop; otherwise each command runs an `adb` process.
+"""
+
+import asyncio
+import base64
+import os
+import subprocess
+import tempfile
+import uuid
+
+from PIL import Image
+
+from phone_agent.adb.device import (
+    _current_app_cache,
+    invalidate_current_app,
+    parse_current_app,
+    swipe_duration_ms,
+)
+from phone_agent.adb.protocol import (
+    SHELL_V2_HEADER_SIZE,
+    ADBProtocolError,
+    ADBRequestFailed,
+    ShellV2Output,
+    get_client,
+    use_socket_transport,
+)
+from phone_agent.adb.screenshot import (
+    CAPTURE_COMMANDS,
+    SETTLE_SAMPLE_COMMAND,
+    _capture_refused,
+    _create_fallback_screenshot,
+    capture_methods,
+    capture_supported,
+    decode_raw_frame,
+    parse_capture,
+    parse_settle_sample,
+    record_capture_failure,
+    record_capture_success,
+)
+from phone_agent.aio import decode, run_process
+from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.screenshot import Screenshot
+from phone_agent.settle import wait_for_settle_async
+
+
+async def run_shell(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run `adb shell` with the given arguments.
+
+    Args:
+        args: Command and arguments to run on the device.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with text output. With a legacy shell over the
+        socket, stderr is merged into stdout.
+    """
+    if use_socket_transport():
+        try:
+            returncode, stdout, stderr = await asyncio.wait_for(
+                _socket_shell(device_id, " ".join(args)), timeout
+            )
+            return subprocess.CompletedProcess(
+                args,
+                0 if returncode is None else returncode,
+                decode(stdout),
+                decode(stderr),
+            )
+        except ADBProtocolError as e:
+            return subprocess.CompletedProcess(args, 1, "", str(e))
+        except asyncio.TimeoutError as e:
+            raise subprocess.TimeoutExpired(args, timeout) from e
+        except ConnectionRefusedError:
+            # No adb server running; the binary below starts one
+            pass
+
+    result = await run_process(_get_adb_prefix(device_id) + ["shell"] + args, timeout)
+    return subprocess.CompletedProcess(
+        args, result.returncode, decode(result.stdout), decode(result.stderr)
+    )
+
+
+async def exec_out(
+    command: list[str], device_id: str | None = None, timeout: float | None = None
+) -> tuple[bytes, bytes]:
+    """
+    Run `adb exec-out` and return its binary (stdout, stderr).
+
+    Args:
+        command: Command and arguments to run on the device.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Tuple of (stdout, stderr) bytes.
+    """
+    if use_socket_transport():
+        try:
+            return await asyncio.wait_for(
+                _socket_exec_out(device_id, " ".join(command)), timeout
+            ), b""
+        except asyncio.TimeoutError as e:
+            raise subprocess.TimeoutExpired(command, timeout) from e
+        except ConnectionRefusedError:
+            pass
+
+    result = await run_process(
+        _get_adb_prefix(device_id) + ["exec-out"] + command, timeout
+    )
+    return result.stdout, result.stderr
+
+
+async def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+    """
+    Capture a screenshot from the connected Android device.
+
+    Follows the capture mode and per-device fallbacks of the synchronous
+    get_screenshot() (see phone_agent.adb.screenshot).
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for screenshot operations.
+
+    Returns:
+        Screenshot object, or a black fallback image if the capture failed.
+    """
+    for method in capture_methods(device_id):
+        try:
+            data, stderr = await exec_out(CAPTURE_COMMANDS[method], device_id, timeout)
+            # Host-side PNG encoding of raw frames releases the GIL; keep it
+            # off the loop
+            screenshot = await asyncio.to_thread(parse_capture, method, data, stderr)
+        except Exception as e:
+            # E.g. a timeout: fall back to pull for this call only
+            print(f"Screenshot error ({method}): {e}")
+            break
+        if screenshot is not None:
+            record_capture_success(method, device_id)
+            return screenshot
+        record_capture_failure(method, device_id)
+
+    return await _get_screenshot_pull(device_id, timeout)
+
+
+async def _get_screenshot_pull(device_id: str | None, timeout: int) -> Screenshot:
+    """Capture via a device-side temp file, for devices without a binary-safe exec-out."""
+    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
+
+    try:
+        result = await run_shell(
+            ["screencap", "-p", "/sdcard/tmp.png"], device_id, timeout
+        )
+        if _capture_refused(b"", (result.stdout + result.stderr).encode()):
+            return _create_fallback_screenshot(is_sensitive=True)
+
+        if use_socket_transport():
+            # Sync transfers are rare on this path; keep them off the loop
+            data = await asyncio.to_thread(
+                get_client().pull, device_id, "/sdcard/tmp.png"
+            )
+            return Screenshot.from_bytes(data)
+
+        await run_process(
+            _get_adb_prefix(device_id) + ["pull", "/sdcard/tmp.png", temp_path], 5
+        )
+        if not os.path.exists(temp_path):
+            return _create_fallback_screenshot(is_sensitive=False)
+
+        with open(temp_path, "rb") as f:
+            data = f.read()
+        os.remove(temp_path)
+
+        return Screenshot.from_bytes(data)
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+async def get_settle_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> Image.Image | None:
+    """
+    Capture a cheap frame for screen-settle detection.
+
+    Samples raw framebuffer rows on the device like
+    phone_agent.adb.get_settle_frame(), falling back to the whole frame on
+    devices where sampling fails.
+
+    Args:
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        PIL image covering the screen (possibly only some of its rows), or
+        None if it could not be captured.
+    """
+    sample_failed = False
+    if capture_supported("settle-sample", device_id):
+        try:
+            data, _ = await exec_out([SETTLE_SAMPLE_COMMAND], device_id, timeout)
+        except Exception:
+            return None
+        frame = parse_settle_sample(data)
+        if frame is not None:
+            record_capture_success("settle-sample", device_id)
+            return frame
+        sample_failed = True
+
+    if not capture_supported("raw", device_id):
+        return None
+    try:
+        data, _ = await exec_out(CAPTURE_COMMANDS["raw"], device_id, timeout)
+    except Exception:
+        return None
+    frame = decode_raw_frame(data)
+    if frame is not None and sample_failed:
+        record_capture_failure("settle-sample", device_id)
+    return frame
+
+
+async def get_current_app(device_id: str | None = None) -> str:
+    """
+    Get the currently focused app name.
+
+    Shares its per-device cache with phone_agent.adb.get_current_app().
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    cached = _current_app_cache.get(device_id)
+    if cached is not None:
+        return cached
+
+    app_name = await query_current_app(device_id)
+    _current_app_cache[device_id] = app_name
+    return app_name
+
+
+async def query_current_app(device_id: str | None = None) -> str:
+    """
+    Ask the device for the focused app, bypassing the cache.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    result = await run_shell(
+        ["dumpsys", "window", "|", "grep", "-E", "'mCurrentFocus|mFocusedApp'"],
+        device_id,
+    )
+    output = result.stdout
+    if not output:
+        # Devices without grep -E: fall back to the full dump
+        output = (await run_shell(["dumpsys", "window"], device_id)).stdout
+    if not output:
+        raise ValueError("No output from dumpsys window")
+
+    return parse_current_app(output)
+
+
+async def tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """
+    Tap at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after tap. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_tap_delay
+
+    await run_shell(["input", "tap", str(x), str(y)], device_id)
+    await _after_action(delay, device_id)
+
+
+async def double_tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """
+    Double tap at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after double tap. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_double_tap_delay
+
+    await run_shell(["input", "tap", str(x), str(y)], device_id)
+    await asyncio.sleep(TIMING_CONFIG.device.double_tap_interval)
+    await run_shell(["input", "tap", str(x), str(y)], device_id)
+    await _after_action(delay, device_id)
+
+
+async def long_press(
+    x: int,
+    y: int,
+    duration_ms: int = 3000,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """
+    Long press at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        duration_ms: Duration of press in milliseconds.
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after long press. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_long_press_delay
+
+    await run_shell(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+        device_id,
+    )
+    await _after_action(delay, device_id)
+
+
+async def swipe(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration_ms: int | None = None,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """
+    Swipe from start to end coordinates.
+
+    Args:
+        start_x: Starting X coordinate.
+        start_y: Starting Y coordinate.
+        end_x: Ending X coordinate.
+        end_y: Ending Y coordinate.
+        duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after swipe. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_swipe_delay
+
+    if duration_ms is None:
+        duration_ms = swipe_duration_ms(start_x, start_y, end_x, end_y)
+
+    await run_shell(
+        [
+            "input",
+            "swipe",
+            str(start_x),
+            str(start_y),
+            str(end_x),
+            str(end_y),
+            str(duration_ms),
+        ],
+        device_id,
+    )
+    await _after_action(delay, device_id)
+
+
+async def back(device_id: str | None = None, delay: float | None = None) -> None:
+    """
+    Press the back button.
+
+    Args:
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after pressing back. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_back_delay
+
+    await run_shell(["input", "keyevent", "4"], device_id)
+    await _after_action(delay, device_id)
+
+
+async def home(device_id: str | None = None, delay: float | None = None) -> None:
+    """
+    Press the home button.
+
+    Args:
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after pressing home. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_home_delay
+
+    await run_shell(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    await _after_action(delay, device_id)
+
+
+async def launch_app(
+    app_name: str, device_id: str | None = None, delay: float | None = None
+) -> bool:
+    """
+    Launch an app by name.
+
+    Args:
+        app_name: The app name (must be in APP_PACKAGES).
+        device_id: Optional ADB device ID.
+        delay: Delay in seconds after launching. If None, uses configured default.
+
+    Returns:
+        True if app was launched, False if app not found.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_launch_delay
+
+    if app_name not in APP_PACKAGES:
+        return False
+
+    await run_shell(
+        [
+            "monkey",
+            "-p",
+            APP_PACKAGES[app_name],
+            "-c",
+            "android.intent.category.LAUNCHER",
+            "1",
+        ],
+        device_id,
+    )
+    await _after_action(delay, device_id)
+    return True
+
+
+async def type_text(text: str, device_id: str | None = None) -> None:
+    """
+    Type text into the currently focused input field using ADB Keyboard.
+
+    Args:
+        text: The text to type.
+        device_id: Optional ADB device ID.
+    """
+    encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+    await run_shell(
+        ["am", "broadcast", "-a", "ADB_INPUT_B64", "--es", "msg", encoded_text],
+        device_id,
+    )
+
+
+async def clear_text(device_id: str | None = None) -> None:
+    """
+    Clear text in the currently focused input field.
+
+    Args:
+        device_id: Optional ADB device ID.
+    """
+    await run_shell(["am", "broadcast", "-a", "ADB_CLEAR_TEXT"], device_id)
+
+
+async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
+    """
+    Detect current keyboard and switch to ADB Keyboard if needed.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The original keyboard IME identifier for later restoration.
+    """
+    result = await run_shell(
+        ["settings", "get", "secure", "default_input_method"], device_id
+    )
+    current_ime = (result.stdout + result.stderr).strip()
+
+    if "com.android.adbkeyboard/.AdbIME" not in current_ime:
+        await run_shell(["ime", "set", "com.android.adbkeyboard/.AdbIME"], device_id)
+
+    # Warm up the keyboard
+    await type_text("", device_id)
+
+    return current_ime
+
+
+async def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """
+    Restore the original keyboard IME.
+
+    Args:
+        ime: The IME identifier to restore.
+        device_id: Optional ADB device ID.
+    """
+    await run_shell(["ime", "set", ime], device_id)
+
+
+async def _after_action(delay: float, device_id: str | None) -> None:
+    """Forget the cached app and wait for the screen to settle."""
+    invalidate_current_app(device_id)
+    await wait_for_settle_async(delay, lambda: get_settle_frame(device_id))
+
+
+async def _open_transport(
+    serial: str | None,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open an adb server connection routed to a device."""
+    client = get_client()
+    reader, writer = await asyncio.open_connection(client.host, client.port)
+    try:
+        if serial:
+            await _request(reader, writer, f"host:transport:{serial}")
+        else:
+            await _request(reader, writer, "host:transport-any")
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+async def _request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: str
+) -> None:
+    """Send a request and check for OKAY."""
+    payload = request.encode("utf-8")
+    writer.write(b"%04x" % len(payload) + payload)
+    await writer.drain()
+
+    status = await _read_exact(reader, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        length = int(await _read_exact(reader, 4), 16)
+        message = decode(await _read_exact(reader, length))
+        raise ADBRequestFailed(f"{request}: {message}")
+    raise ADBProtocolError(f"{request}: unexpected response {status!r}")
+
+
+async def _socket_shell(
+    serial: str | None, command: str
+) -> tuple[int | None, bytes, bytes]:
+    """Run a shell command through the adb server (see ADBServerClient.shell)."""
+    client = get_client()
+    if client.shell_v2_supported(serial):
+        reader, writer = await _open_transport(serial)
+        try:
+            try:
+                await _request(reader, writer, f"shell,v2,raw:{command}")
+            except ADBRequestFailed:
+                # The device refused the service: it has no shell v2
+                client.mark_shell_v2_unsupported(serial)
+            else:
+                return await _read_shell_v2(reader)
+        finally:
+            writer.close()
+
+    reader, writer = await _open_transport(serial)
+    try:
+        await _request(reader, writer, f"shell:{command}")
+        return None, await reader.read(), b""
+    finally:
+        writer.close()
+
+
+async def _socket_exec_out(serial: str | None, command: str) -> bytes:
+    """Run a command through the adb server and return its raw stdout."""
+    reader, writer = await _open_transport(serial)
+    try:
+        await _request(reader, writer, f"exec:{command}")
+        return await reader.read()
+    finally:
+        writer.close()
+
+
+async def _read_shell_v2(
+    reader: asyncio.StreamReader,
+) -> tuple[int | None, bytes, bytes]:
+    """Demultiplex shell v2 packets until the exit packet."""
+    output = ShellV2Output()
+    while not output.done:
+        try:
+            header = await _read_exact(reader, SHELL_V2_HEADER_SIZE)
+        except ADBProtocolError:
+            # Stream closed without an exit packet
+            break
+        output.add(header, await _read_exact(reader, output.packet_length(header)))
+    return output.result()
+
+
+async def _read_exact(reader: asyncio.StreamReader, size: int) -> bytes:
+    """Read exactly size bytes."""
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as e:
+        raise ADBProtocolError("Connection closed by adb server") from e
+
+
+def _get_adb_prefix(device_id: str | None) -> list:
+    """Get ADB command prefix with optional device specifier."""
+    if device_id:
+        return ["adb", "-s", device_id]
+    return ["adb"]
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from phone_agent.adb.protocol import get_client, use_socket_transport
 from phone_agent.config.timing import TIMING_CONFIG
 
 
@@ -125,15 +126,25 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            lines = None
+            if use_socket_transport():
+                try:
+                    # Same format as `adb devices -l`, without the header
+                    lines = get_client().host_command("host:devices-l").split("\n")
+                except ConnectionRefusedError:
+                    pass
+
+            if lines is None:
+                result = subprocess.run(
+                    [self.adb_path, "devices", "-l"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                lines = result.stdout.strip().split("\n")[1:]  # Skip header
 
             devices = []
-            for line in result.stdout.strip().split("\n")[1:]:  # Skip header
+            for line in lines:
                 if not line.strip():
                     continue
 
@@ -1,12 +1,26 @@
 """Device control utilities for Android automation."""
 
 import os
-import subprocess
+import re
 import time
 from typing import List, Optional, Tuple
 
+from phone_agent.adb.screenshot import get_settle_frame, mark_action
+from phone_agent.adb.shell import run_shell
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.settle import wait_for_settle
+
+# Package name -> app name; the first name listed for a package wins
+_PACKAGE_TO_APP: dict[str, str] = {}
+for _app_name, _package in APP_PACKAGES.items():
+    _PACKAGE_TO_APP.setdefault(_package, _app_name)
+
+# Component names such as "com.tencent.mm/.ui.LauncherUI" in focus lines
+COMPONENT_PATTERN = re.compile(r"([A-Za-z0-9_.]+)/")
+
+# Last detected foreground app per device, cleared by actions
+_current_app_cache: dict[str | None, str] = {}
 
 
 def get_current_app(device_id: str | None = None) -> str:
@@ -18,26 +32,90 @@ def get_current_app(device_id: str | None = None) -> str:
 
     Returns:
         The app name if recognized, otherwise "System Home".
+
+    Note:
+        Only the focus lines of `dumpsys window` are sent back by the device.
+        The result is cached per device until an action that can change the
+        foreground app is performed (see invalidate_current_app).
+    """
+    cached = _current_app_cache.get(device_id)
+    if cached is not None:
+        return cached
+
+    app_name = query_current_app(device_id)
+    _current_app_cache[device_id] = app_name
+    return app_name
+
+
+def query_current_app(device_id: str | None = None) -> str:
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    Ask the device for the focused app, bypassing the cache.
 
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True, encoding="utf-8"
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    result = run_shell(
+        ["dumpsys", "window", "|", "grep", "-E", "'mCurrentFocus|mFocusedApp'"],
+        device_id,
     )
     output = result.stdout
+    if not output:
+        # Devices without grep -E: fall back to the full dump
+        output = run_shell(["dumpsys", "window"], device_id).stdout
     if not output:
         raise ValueError("No output from dumpsys window")
 
-    # Parse window focus info
+    return parse_current_app(output)
+
+
+def app_name_for_package(package: str) -> str:
+    """
+    Map a package name to its app name.
+
+    Args:
+        package: Android package name.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    return _PACKAGE_TO_APP.get(package, "System Home")
+
+
+def parse_current_app(output: str) -> str:
+    """
+    Find the foreground app in `dumpsys window` output.
+
+    Args:
+        output: Full or filtered `dumpsys window` output.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
     for line in output.split("\n"):
         if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            for package in COMPONENT_PATTERN.findall(line):
+                if package in _PACKAGE_TO_APP:
+                    return _PACKAGE_TO_APP[package]
 
     return "System Home"
 
 
+def invalidate_current_app(device_id: str | None = None) -> None:
+    """
+    Forget the cached foreground app of a device.
+
+    Called by every action that can change the foreground app. Call it
+    after anything else that may have switched apps (e.g. a manual takeover).
+
+    Args:
+        device_id: Optional ADB device ID.
+    """
+    _current_app_cache.pop(device_id, None)
+
+
 def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
@@ -53,12 +131,9 @@ def tap(
     if delay is None:
         delay = TIMING_CONFIG.device.default_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "tap", str(x), str(y)], device_id)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def double_tap(
@@ -76,16 +151,11 @@ def double_tap(
     if delay is None:
         delay = TIMING_CONFIG.device.default_double_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
+    run_shell(["input", "tap", str(x), str(y)], device_id)
     time.sleep(TIMING_CONFIG.device.double_tap_interval)
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "tap", str(x), str(y)], device_id)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def long_press(
@@ -108,14 +178,12 @@ def long_press(
     if delay is None:
         delay = TIMING_CONFIG.device.default_long_press_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix
-        + ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
-        capture_output=True,
+    run_shell(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+        device_id,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def swipe(
@@ -142,18 +210,11 @@ def swipe(
     if delay is None:
         delay = TIMING_CONFIG.device.default_swipe_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
     if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
+        duration_ms = swipe_duration_ms(start_x, start_y, end_x, end_y)
+
+    run_shell(
+        [
             "input",
             "swipe",
             str(start_x),
@@ -162,9 +223,17 @@ def swipe(
             str(end_y),
             str(duration_ms),
         ],
-        capture_output=True,
+        device_id,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
+
+
+def swipe_duration_ms(start_x: int, start_y: int, end_x: int, end_y: int) -> int:
+    """Default swipe duration in milliseconds, based on the swipe distance."""
+    dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+    duration_ms = int(dist_sq / 1000)
+    return max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -178,12 +247,9 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
     if delay is None:
         delay = TIMING_CONFIG.device.default_back_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "4"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "keyevent", "4"], device_id)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -197,12 +263,9 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
     if delay is None:
         delay = TIMING_CONFIG.device.default_home_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_HOME"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def launch_app(
@@ -225,13 +288,10 @@ def launch_app(
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = _get_adb_prefix(device_id)
     package = APP_PACKAGES[app_name]
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
+    run_shell(
+        [
             "monkey",
             "-p",
             package,
@@ -239,9 +299,10 @@ def launch_app(
             "android.intent.category.LAUNCHER",
             "1",
         ],
-        capture_output=True,
+        device_id,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
     return True
 
 
@@ -250,3 +311,10 @@ def _get_adb_prefix(device_id: str | None) -> list:
     if device_id:
         return ["adb", "-s", device_id]
     return ["adb"]
+
+
+def _wait_for_settle(delay: float, device_id: str | None) -> None:
+    """Wait after an action, adaptively if screen-settle detection is enabled."""
+    # The action has been sent: frames streamed before now are stale
+    mark_action(device_id)
+    wait_for_settle(delay, lambda: get_settle_frame(device_id))
@@ -0,0 +1,416 @@
+"""Client for the adb server's smart-socket protocol.
+
+Instead of running the `adb` binary, commands can be sent straight to the
+local adb server (127.0.0.1:5037). Every request is a 4-digit hex length
+followed by the request string, answered with "OKAY" or "FAIL" plus a
+length-prefixed message:
+
+    host:devices-l              list devices
+    host:transport:<serial>     route the socket to a device
+    shell,v2,raw:<command>      run a command with exit status (shell v2)
+    shell:<command>             run a command (legacy devices)
+    exec:<command>              run a command with a binary-safe stdout
+    sync:                       file transfer, used for pulls
+
+A device service consumes its socket, so shell and exec open a new local TCP
+connection per command, which is far cheaper than a new adb process. Sync
+connections can run many transfers and are pooled per device.
+
+The socket transport is opt-in with PHONE_AGENT_ADB_TRANSPORT=socket. When the
+server cannot be reached, callers fall back to the adb binary, which also
+starts the server.
+"""
+
+import os
+import socket
+import struct
+import threading
+
+DEFAULT_HOST = os.getenv("ADB_SERVER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+
+# "binary" runs the adb executable, "socket" talks to the adb server directly
+_ADB_TRANSPORT = os.getenv("PHONE_AGENT_ADB_TRANSPORT", "binary").lower()
+
+# Shell protocol v2 packets: a 1-byte id and a little-endian 4-byte length,
+# followed by the payload
+SHELL_V2_HEADER_SIZE = 5
+SHELL_STDOUT = 1
+SHELL_STDERR = 2
+SHELL_EXIT = 3
+
+_SYNC_CHUNK = 64 * 1024
+
+
+class ADBProtocolError(Exception):
+    """Raised when the adb server rejects a request or the stream is malformed."""
+
+
+class ADBRequestFailed(ADBProtocolError):
+    """Raised when the adb server answers a request with FAIL."""
+
+
+class ADBSyncFailure(ADBProtocolError):
+    """Raised when the device reports a failed file transfer."""
+
+
+class ShellV2Output:
+    """
+    Collects the packets of a shell v2 stream.
+
+    The caller reads each SHELL_V2_HEADER_SIZE-byte header, passes it to
+    packet_length() and feeds the payload to add() until done is set.
+    """
+
+    def __init__(self):
+        self.stdout: list[bytes] = []
+        self.stderr: list[bytes] = []
+        self.returncode: int | None = None
+
+    @staticmethod
+    def packet_length(header: bytes) -> int:
+        """Payload length from a packet header."""
+        return struct.unpack_from("<I", header, 1)[0]
+
+    def add(self, header: bytes, data: bytes) -> None:
+        """Record a packet."""
+        packet_id = header[0]
+        if packet_id == SHELL_STDOUT:
+            self.stdout.append(data)
+        elif packet_id == SHELL_STDERR:
+            self.stderr.append(data)
+        elif packet_id == SHELL_EXIT:
+            self.returncode = data[0] if data else 0
+
+    @property
+    def done(self) -> bool:
+        """Whether the exit packet arrived."""
+        return self.returncode is not None
+
+    def result(self) -> tuple[int | None, bytes, bytes]:
+        """Tuple of (exit status, stdout, stderr)."""
+        return self.returncode, b"".join(self.stdout), b"".join(self.stderr)
+
+
+class ADBServerClient:
+    """
+    Minimal adb server client.
+
+    Args:
+        host: adb server host.
+        port: adb server port.
+        timeout: Socket timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sync_pool: dict[str | None, list[socket.socket]] = {}
+        self._pool_lock = threading.Lock()
+        self._shell_v2_unsupported: set[str | None] = set()
+
+    def host_command(self, request: str) -> str:
+        """
+        Run a host service that answers with a length-prefixed string.
+
+        Args:
+            request: Host request, e.g. "host:devices-l" or "host:version".
+
+        Returns:
+            The server's reply.
+        """
+        with self._connect() as sock:
+            self._request(sock, request)
+            return self._read_string(sock).decode("utf-8", errors="replace")
+
+    def devices(self) -> list[tuple[str, str, str]]:
+        """
+        List devices known to the server.
+
+        Returns:
+            List of (serial, state, details) tuples, as in `adb devices -l`.
+        """
+        devices = []
+        for line in self.host_command("host:devices-l").splitlines():
+            parts = line.split(None, 2)
+            if len(parts) >= 2:
+                devices.append((parts[0], parts[1], parts[2] if len(parts) > 2 else ""))
+        return devices
+
+    def shell(
+        self, serial: str | None, command: str, timeout: float | None = None
+    ) -> tuple[int | None, bytes, bytes]:
+        """
+        Run a shell command on a device.
+
+        Args:
+            serial: Device serial, or None for the only connected device.
+            command: Command line, run by the device shell.
+            timeout: Socket timeout in seconds (defaults to the client's).
+
+        Returns:
+            Tuple of (exit status, stdout, stderr). The exit status is None
+            and stderr is merged into stdout on devices without shell v2.
+        """
+        if self.shell_v2_supported(serial):
+            sock = self._open_transport(serial, timeout)
+            try:
+                self._request(sock, f"shell,v2,raw:{command}")
+            except ADBRequestFailed:
+                # The device refused the service: it has no shell v2
+                sock.close()
+                self.mark_shell_v2_unsupported(serial)
+            except ADBProtocolError:
+                # Dropped or garbled reply: the command may already be
+                # running, so it must not be sent again on the legacy shell
+                sock.close()
+                raise
+            else:
+                with sock:
+                    return self._read_shell_v2(sock)
+
+        with self._open_transport(serial, timeout) as sock:
+            self._request(sock, f"shell:{command}")
+            return None, self._read_all(sock), b""
+
+    def shell_v2_supported(self, serial: str | None) -> bool:
+        """
+        Check whether shell v2 is worth trying on a device.
+
+        Args:
+            serial: Device serial.
+
+        Returns:
+            False once the device refused the shell v2 service, True
+            otherwise.
+        """
+        return serial not in self._shell_v2_unsupported
+
+    def mark_shell_v2_unsupported(self, serial: str | None) -> None:
+        """
+        Run further shell commands on a device with the legacy shell service.
+
+        Args:
+            serial: Device serial.
+        """
+        self._shell_v2_unsupported.add(serial)
+
+    def exec_out(
+        self, serial: str | None, command: str, timeout: float | None = None
+    ) -> bytes:
+        """
+        Run a command and return its raw stdout, without any pty translation.
+
+        Args:
+            serial: Device serial, or None for the only connected device.
+            command: Command line.
+            timeout: Socket timeout in seconds (defaults to the client's).
+
+        Returns:
+            Command output bytes.
+        """
+        with self._open_transport(serial, timeout) as sock:
+            self._request(sock, f"exec:{command}")
+            return self._read_all(sock)
+
+    def pull(
+        self, serial: str | None, remote_path: str, timeout: float | None = None
+    ) -> bytes:
+        """
+        Read a file from the device with the sync protocol.
+
+        Args:
+            serial: Device serial, or None for the only connected device.
+            remote_path: Path of the file on the device.
+            timeout: Socket timeout in seconds (defaults to the client's).
+
+        Returns:
+            File contents.
+        """
+        sock, reused = self._acquire_sync(serial, timeout)
+        try:
+            data = self._recv_file(sock, remote_path)
+        except ADBSyncFailure:
+            # The device closes sync connections after a failure
+            sock.close()
+            raise
+        except (OSError, ADBProtocolError):
+            sock.close()
+            if not reused:
+                raise
+            # Pooled connection went stale (device or server restarted)
+            sock, _ = self._acquire_sync(serial, timeout, pooled=False)
+            try:
+                data = self._recv_file(sock, remote_path)
+            except BaseException:
+                sock.close()
+                raise
+
+        self._release_sync(serial, sock)
+        return data
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._pool_lock:
+            pools, self._sync_pool = self._sync_pool, {}
+        for sockets in pools.values():
+            for sock in sockets:
+                try:
+                    sock.sendall(b"QUIT" + struct.pack("<I", 0))
+                except OSError:
+                    pass
+                sock.close()
+
+    def _connect(self, timeout: float | None = None) -> socket.socket:
+        """Open a connection to the adb server."""
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=timeout or self.timeout
+        )
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _open_transport(
+        self, serial: str | None, timeout: float | None = None
+    ) -> socket.socket:
+        """Open a connection routed to a device."""
+        sock = self._connect(timeout)
+        try:
+            if serial:
+                self._request(sock, f"host:transport:{serial}")
+            else:
+                self._request(sock, "host:transport-any")
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _acquire_sync(
+        self, serial: str | None, timeout: float | None, pooled: bool = True
+    ) -> tuple[socket.socket, bool]:
+        """Take a pooled sync connection, or open a new one."""
+        if pooled:
+            with self._pool_lock:
+                pool = self._sync_pool.get(serial)
+                if pool:
+                    sock = pool.pop()
+                    sock.settimeout(timeout or self.timeout)
+                    return sock, True
+
+        sock = self._open_transport(serial, timeout)
+        try:
+            self._request(sock, "sync:")
+        except BaseException:
+            sock.close()
+            raise
+        return sock, False
+
+    def _release_sync(self, serial: str | None, sock: socket.socket) -> None:
+        """Return a sync connection to the pool."""
+        with self._pool_lock:
+            self._sync_pool.setdefault(serial, []).append(sock)
+
+    def _recv_file(self, sock: socket.socket, remote_path: str) -> bytes:
+        """Run one RECV transfer on a sync connection."""
+        path = remote_path.encode("utf-8")
+        sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+
+        chunks = []
+        while True:
+            header = self._read_exact(sock, 8)
+            tag, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if tag == b"DATA":
+                chunks.append(self._read_exact(sock, length))
+            elif tag == b"DONE":
+                return b"".join(chunks)
+            elif tag == b"FAIL":
+                message = self._read_exact(sock, length).decode("utf-8", "replace")
+                raise ADBSyncFailure(f"pull {remote_path}: {message}")
+            else:
+                raise ADBProtocolError(f"Unexpected sync response: {tag!r}")
+
+    def _request(self, sock: socket.socket, request: str) -> None:
+        """Send a request and check for OKAY."""
+        payload = request.encode("utf-8")
+        sock.sendall(b"%04x" % len(payload) + payload)
+
+        status = self._read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = self._read_string(sock).decode("utf-8", errors="replace")
+            raise ADBRequestFailed(f"{request}: {message}")
+        raise ADBProtocolError(f"{request}: unexpected response {status!r}")
+
+    def _read_string(self, sock: socket.socket) -> bytes:
+        """Read a 4-digit hex length-prefixed string."""
+        length = int(self._read_exact(sock, 4), 16)
+        return self._read_exact(sock, length)
+
+    def _read_shell_v2(self, sock: socket.socket) -> tuple[int | None, bytes, bytes]:
+        """Demultiplex shell v2 packets until the exit packet."""
+        output = ShellV2Output()
+        while not output.done:
+            try:
+                header = self._read_exact(sock, SHELL_V2_HEADER_SIZE)
+            except ADBProtocolError:
+                # Stream closed without an exit packet
+                break
+            output.add(header, self._read_exact(sock, output.packet_length(header)))
+        return output.result()
+
+    @staticmethod
+    def _read_exact(sock: socket.socket, size: int) -> bytes:
+        """Read exactly size bytes."""
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = sock.recv(size - len(buffer))
+            if not chunk:
+                raise ADBProtocolError("Connection closed by adb server")
+            buffer += chunk
+        return bytes(buffer)
+
+    @staticmethod
+    def _read_all(sock: socket.socket) -> bytes:
+        """Read until the device closes the stream."""
+        chunks = []
+        while True:
+            chunk = sock.recv(_SYNC_CHUNK)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+_client: ADBServerClient | None = None
+
+
+def set_adb_transport(transport: str) -> None:
+    """
+    Set how ADB commands reach the device globally.
+
+    Args:
+        transport: "binary" to run the adb executable, or "socket" to talk
+            to the adb server directly.
+    """
+    global _ADB_TRANSPORT
+    if transport not in ("binary", "socket"):
+        raise ValueError(f"Unknown ADB transport: {transport}")
+    _ADB_TRANSPORT = transport
+
+
+def use_socket_transport() -> bool:
+    """Whether ADB commands should go through the adb server socket."""
+    return _ADB_TRANSPORT == "socket"
+
+
+def get_client() -> ADBServerClient:
+    """Get the shared adb server client."""
+    global _client
+    if _client is None:
+        _client = ADBServerClient()
+    return _client
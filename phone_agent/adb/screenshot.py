@@ -1,25 +1,88 @@
 """Screenshot utilities for capturing Android device screen."""
 
-import base64
 import os
+import struct
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
-from io import BytesIO
-from typing import Tuple
+from typing import Callable, Tuple
 
 from PIL import Image
 
+from phone_agent.adb.protocol import get_client, use_socket_transport
+from phone_agent.adb.shell import run_shell
+from phone_agent.screenshot import Screenshot
+from phone_agent.tracing import span
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+# Raw screencap pixel formats (android.graphics.PixelFormat) with 4 bytes per pixel
+_RAW_FORMATS = {1: "RGBA", 2: "RGBX"}
+
+# Capture mode: "raw" streams the uncompressed framebuffer, "exec-out" streams
+# a device-encoded PNG, "pull" uses a device temp file
+_SCREENSHOT_MODE = os.getenv("PHONE_AGENT_SCREENSHOT_MODE", "exec-out").lower()
+
+# Device commands of the capture methods that stream into memory, fastest
+# first; "pull" (a device temp file) is the fallback that works everywhere
+CAPTURE_COMMANDS = {"raw": ["screencap"], "exec-out": ["screencap", "-p"]}
+
+# Consecutive unusable captures after which a method is dropped for a device;
+# a single bad capture (e.g. a truncated stream) only falls back for that call
+CAPTURE_FAILURE_LIMIT = 2
+
+# Capture methods that do not work per device: "exec-out" where the stream is
+# not binary-safe (e.g. LF -> CRLF translation), "raw" where the framebuffer
+# could not be parsed and "settle-sample" where the sampling script fails
+_UNSUPPORTED_CAPTURES: dict[str, set[str | None]] = {}
+
+# Consecutive unusable captures per (method, device)
+_CAPTURE_FAILURES: dict[tuple[str, str | None], int] = {}
+
+# Framebuffer rows sent per settle frame. The settle hash only needs a
+# thumbnail, so the rest of the frame (~10 MB at 1080p) never leaves the device
+SETTLE_SAMPLE_ROWS = 16
+
+# Device shell script that prints "width height format" and then
+# SETTLE_SAMPLE_ROWS evenly spaced raw rows (dd in 4-byte blocks, since the
+# 12- or 16-byte header leaves the rows unaligned to anything larger)
+SETTLE_SAMPLE_COMMAND = (
+    "f=${TMPDIR:-/data/local/tmp}/phone_agent_settle_$$; "
+    "screencap > $f || exit 1; "
+    "set -- $(od -An -tu4 -N12 $f); "
+    "[ $# -eq 3 ] || { rm -f $f; exit 1; }; "
+    "h=$(( $(wc -c < $f) - $1 * $2 * 4 )); "
+    "echo $1 $2 $3; "
+    "i=0; "
+    f"while [ $i -lt {SETTLE_SAMPLE_ROWS} ]; do "
+    "dd if=$f bs=4 "
+    f"skip=$(( h / 4 + ($i * 2 + 1) * $2 / {SETTLE_SAMPLE_ROWS * 2} * $1 )) "
+    "count=$1 2>/dev/null; "
+    "i=$((i + 1)); "
+    "done; "
+    "rm -f $f"
+)
+
+# Per-device settle frame providers, e.g. a screen stream's latest frame
+_SETTLE_SOURCES: dict[str | None, Callable[[], Image.Image | None]] = {}
+
+# Per-device callbacks run once an action has been sent (see mark_action)
+_ACTION_CALLBACKS: dict[str | None, Callable[[], None]] = {}
+
+
+def set_screenshot_mode(mode: str) -> None:
+    """
+    Set the ADB screenshot capture mode globally.
+
+    Args:
+        mode: "raw" to stream the uncompressed framebuffer and encode on the
+            host, "exec-out" to stream a device-encoded PNG into memory, or
+            "pull" to go through a device-side temp file and `adb pull`.
+    """
+    global _SCREENSHOT_MODE
+    if mode not in ("raw", "exec-out", "pull"):
+        raise ValueError(f"Unknown screenshot mode: {mode}")
+    _SCREENSHOT_MODE = mode
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -31,60 +94,395 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         timeout: Timeout in seconds for screenshot operations.
 
     Returns:
-        Screenshot object containing base64 data and dimensions.
+        Screenshot object containing the PNG data and dimensions.
 
     Note:
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
+
+        By default the image is streamed with `adb exec-out screencap -p`
+        without touching the filesystem. An unusable capture falls back to the
+        `screencap` + `pull` path for that call, as does an error such as a
+        timeout; devices that corrupt binary
+        output CAPTURE_FAILURE_LIMIT times in a row are switched to it for good.
+        In "raw" mode the device skips PNG compression entirely and the frame
+        is encoded once on the host; unparseable frames fall back to exec-out.
+    """
+    for method in capture_methods(device_id):
+        try:
+            data, stderr = _exec_out(device_id, CAPTURE_COMMANDS[method], timeout)
+            screenshot = parse_capture(method, data, stderr)
+        except Exception as e:
+            # E.g. a timeout, which says nothing about the method: fall back
+            # to pull for this call only
+            print(f"Screenshot error ({method}): {e}")
+            break
+        if screenshot is not None:
+            record_capture_success(method, device_id)
+            return screenshot
+        record_capture_failure(method, device_id)
+
+    return _get_screenshot_pull(device_id, timeout)
+
+
+def capture_methods(device_id: str | None = None) -> list[str]:
+    """
+    List the in-memory capture methods to try on a device before "pull".
+
+    Starts at the configured screenshot mode and skips the methods the device
+    is known not to support; shared by the sync and asyncio capture paths.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        CAPTURE_COMMANDS keys, in order.
+    """
+    methods = list(CAPTURE_COMMANDS)
+    if _SCREENSHOT_MODE not in methods:
+        return []
+    return [
+        method
+        for method in methods[methods.index(_SCREENSHOT_MODE) :]
+        if capture_supported(method, device_id)
+    ]
+
+
+def capture_supported(method: str, device_id: str | None = None) -> bool:
+    """
+    Check whether a capture method is worth trying on a device.
+
+    Args:
+        method: A CAPTURE_COMMANDS key or "settle-sample".
+        device_id: Optional ADB device ID.
+
+    Returns:
+        False once the method failed CAPTURE_FAILURE_LIMIT times in a row on
+        the device.
+    """
+    return device_id not in _UNSUPPORTED_CAPTURES.get(method, ())
+
+
+def record_capture_failure(method: str, device_id: str | None = None) -> None:
+    """
+    Count an unusable capture; the method is dropped for the device after
+    CAPTURE_FAILURE_LIMIT in a row.
+
+    Args:
+        method: A CAPTURE_COMMANDS key or "settle-sample".
+        device_id: Optional ADB device ID.
+    """
+    key = (method, device_id)
+    failures = _CAPTURE_FAILURES.get(key, 0) + 1
+    if failures >= CAPTURE_FAILURE_LIMIT:
+        _CAPTURE_FAILURES.pop(key, None)
+        _UNSUPPORTED_CAPTURES.setdefault(method, set()).add(device_id)
+    else:
+        _CAPTURE_FAILURES[key] = failures
+
+
+def record_capture_success(method: str, device_id: str | None = None) -> None:
+    """
+    Reset the failure count of a capture method after a usable capture.
+
+    Args:
+        method: A CAPTURE_COMMANDS key or "settle-sample".
+        device_id: Optional ADB device ID.
+    """
+    _CAPTURE_FAILURES.pop((method, device_id), None)
+
+
+def parse_capture(method: str, data: bytes, stderr: bytes) -> Screenshot | None:
+    """
+    Turn the output of a CAPTURE_COMMANDS command into a Screenshot.
+
+    Args:
+        method: "raw" or "exec-out".
+        data: Command stdout.
+        stderr: Command stderr.
+
+    Returns:
+        Screenshot object (a sensitive fallback if the device refused the
+        capture), or None if the output could not be parsed.
+    """
+    if method == "raw":
+        return parse_raw_capture(data, stderr)
+    return parse_png_capture(data, stderr)
+
+
+def parse_png_capture(data: bytes, stderr: bytes) -> Screenshot | None:
+    """
+    Turn the output of `screencap -p` into a Screenshot.
+
+    Args:
+        data: Command stdout.
+        stderr: Command stderr.
+
+    Returns:
+        Screenshot object (a sensitive fallback if the device refused the
+        capture), or None if the output is not a PNG.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        if _capture_refused(data, stderr):
+            return _create_fallback_screenshot(is_sensitive=True)
+        return None
+
+    return Screenshot.from_bytes(data)
+
+
+def parse_raw_capture(data: bytes, stderr: bytes) -> Screenshot | None:
+    """
+    Turn the output of `screencap` without `-p` into a Screenshot.
+
+    Args:
+        data: Command stdout.
+        stderr: Command stderr.
+
+    Returns:
+        Screenshot object (a sensitive fallback if the device refused the
+        capture), or None if the raw frame could not be parsed.
+    """
+    img = decode_raw_frame(data)
+    if img is None:
+        if _capture_refused(data, stderr):
+            return _create_fallback_screenshot(is_sensitive=True)
+        return None
+
+    return Screenshot.from_image(img)
+
+
+def _capture_refused(data: bytes, stderr: bytes) -> bool:
+    """Check for screenshot failure (sensitive screen) in screencap output."""
+    output = (data[:256] + stderr).decode("utf-8", errors="ignore")
+    return "Status: -1" in output or "Failed" in output
+
+
+def decode_raw_frame(data: bytes) -> Image.Image | None:
+    """
+    Decode the output of `screencap` without `-p`.
+
+    The output is a little-endian header of width, height and pixel format,
+    followed by a colorspace word on Android 9+ (12 or 16 bytes in total), and
+    then the uncompressed pixels. The payload is wrapped in a NumPy array when
+    NumPy is installed, otherwise handed to PIL directly; neither copies it.
+
+    Args:
+        data: Raw screencap output.
+
+    Returns:
+        PIL image backed by the payload, or None if the frame is not valid.
+    """
+    if len(data) < 12:
+        return None
+
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    mode = _RAW_FORMATS.get(pixel_format)
+    size = width * height * 4
+    header_size = len(data) - size
+    if mode is None or width == 0 or header_size not in (12, 16):
+        return None
+
+    try:
+        import numpy as np
+
+        frame = np.frombuffer(data, dtype=np.uint8, count=size, offset=header_size)
+        return Image.fromarray(frame.reshape(height, width, 4))
+    except ImportError:
+        payload = memoryview(data)[header_size:]
+        return Image.frombuffer("RGBA", (width, height), payload, "raw", mode, 0, 1)
+
+
+def get_settle_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> Image.Image | None:
+    """
+    Capture a cheap frame for screen-settle detection.
+
+    Uses the frame source set with set_settle_source() (a screen stream) if it
+    has a frame; otherwise a few raw framebuffer rows sampled on the device
+    (see SETTLE_SAMPLE_COMMAND), and the whole raw framebuffer only on devices
+    where sampling fails.
+
+    Args:
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        PIL image covering the screen (possibly only some of its rows), or
+        None if it could not be captured.
+    """
+    source = _SETTLE_SOURCES.get(device_id)
+    if source is not None:
+        frame = source()
+        if frame is not None:
+            return frame
+
+    sample_failed = False
+    if capture_supported("settle-sample", device_id):
+        try:
+            data, _ = _exec_out(device_id, [SETTLE_SAMPLE_COMMAND], timeout)
+        except Exception:
+            return None
+        frame = parse_settle_sample(data)
+        if frame is not None:
+            record_capture_success("settle-sample", device_id)
+            return frame
+        sample_failed = True
+
+    if not capture_supported("raw", device_id):
+        return None
+    try:
+        data, _ = _exec_out(device_id, CAPTURE_COMMANDS["raw"], timeout)
+    except Exception:
+        return None
+    frame = decode_raw_frame(data)
+    if frame is not None and sample_failed:
+        # The device captures fine; it is the sampling script that fails
+        record_capture_failure("settle-sample", device_id)
+    return frame
+
+
+def parse_settle_sample(data: bytes) -> Image.Image | None:
+    """
+    Decode the output of SETTLE_SAMPLE_COMMAND.
+
+    Args:
+        data: Command stdout.
+
+    Returns:
+        PIL image of the sampled rows, or None if the output is not valid.
+    """
+    header, _, rows = data.partition(b"\n")
+    try:
+        width, _, pixel_format = (int(value) for value in header.split())
+    except ValueError:
+        return None
+
+    mode = _RAW_FORMATS.get(pixel_format)
+    if mode is None or width == 0 or len(rows) != width * SETTLE_SAMPLE_ROWS * 4:
+        return None
+    return Image.frombuffer(
+        "RGBA", (width, SETTLE_SAMPLE_ROWS), rows, "raw", mode, 0, 1
+    )
+
+
+def set_settle_source(
+    device_id: str | None,
+    source: Callable[[], Image.Image | None] | None,
+    on_action: Callable[[], None] | None = None,
+) -> None:
+    """
+    Serve a device's settle frames from another source, e.g. a screen stream.
+
+    Args:
+        device_id: ADB device ID.
+        source: Returns the current frame, or None to capture one instead;
+            None removes the source.
+        on_action: Called by mark_action() once an action has been sent,
+            e.g. so the source stops serving frames from before it.
+    """
+    if source is None:
+        _SETTLE_SOURCES.pop(device_id, None)
+    else:
+        _SETTLE_SOURCES[device_id] = source
+    if source is None or on_action is None:
+        _ACTION_CALLBACKS.pop(device_id, None)
+    else:
+        _ACTION_CALLBACKS[device_id] = on_action
+
+
+def mark_action(device_id: str | None = None) -> None:
+    """
+    Tell the device's settle source that an action has just been sent.
+
+    Args:
+        device_id: ADB device ID.
+    """
+    callback = _ACTION_CALLBACKS.get(device_id)
+    if callback is not None:
+        callback()
+
+
+def _get_screenshot_pull(device_id: str | None, timeout: int) -> Screenshot:
+    """
+    Capture a screenshot via a device-side temp file and `adb pull`.
+
+    Args:
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Screenshot object.
     """
     temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
     adb_prefix = _get_adb_prefix(device_id)
 
     try:
         # Execute screenshot command
-        result = subprocess.run(
-            adb_prefix + ["shell", "screencap", "-p", "/sdcard/tmp.png"],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        result = run_shell(["screencap", "-p", "/sdcard/tmp.png"], device_id, timeout)
 
         # Check for screenshot failure (sensitive screen)
         output = result.stdout + result.stderr
         if "Status: -1" in output or "Failed" in output:
             return _create_fallback_screenshot(is_sensitive=True)
 
-        # Pull screenshot to local temp path
-        subprocess.run(
-            adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
+        with span("adb pull", "device", device=device_id):
+            if use_socket_transport():
+                data = get_client().pull(device_id, "/sdcard/tmp.png")
+                return Screenshot.from_bytes(data)
+
+            # Pull screenshot to local temp path
+            subprocess.run(
+                adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
 
         if not os.path.exists(temp_path):
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Read image as captured, without re-encoding
+        with open(temp_path, "rb") as f:
+            data = f.read()
 
         # Cleanup
         os.remove(temp_path)
 
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+        return Screenshot.from_bytes(data)
 
     except Exception as e:
         print(f"Screenshot error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def _exec_out(
+    device_id: str | None, command: list[str], timeout: int
+) -> tuple[bytes, bytes]:
+    """Run `adb exec-out` and return (stdout, stderr) bytes."""
+    with span("adb exec-out", "device", device=device_id, cmd=command[0]):
+        return _run_exec_out(device_id, command, timeout)
+
+
+def _run_exec_out(
+    device_id: str | None, command: list[str], timeout: int
+) -> tuple[bytes, bytes]:
+    """Run `adb exec-out` over the best available transport."""
+    if use_socket_transport():
+        try:
+            return get_client().exec_out(device_id, " ".join(command), timeout), b""
+        except ConnectionRefusedError:
+            # No adb server running; the binary below starts one
+            pass
+
+    result = subprocess.run(
+        _get_adb_prefix(device_id) + ["exec-out"] + command,
+        capture_output=True,
+        timeout=timeout,
+    )
+    return result.stdout, result.stderr
+
+
 def _get_adb_prefix(device_id: str | None) -> list:
     """Get ADB command prefix with optional device specifier."""
     if device_id:
@@ -96,14 +494,4 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
     default_width, default_height = 1080, 2400
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return Screenshot.blank(default_width, default_height, is_sensitive)
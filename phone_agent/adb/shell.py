@@ -0,0 +1,308 @@
+"""Persistent ADB shell sessions shared by the device control functions.
+
+Running `adb shell <cmd>` for every tap spawns a new adb client process and a
+new connection to the device each time. A ShellSession keeps one `adb shell`
+open per device and writes commands to its stdin instead. Every command is
+followed by a `printf` of a random sentinel and the command's exit status, so
+the output can be split back into one result per command.
+
+Devices whose shell does not frame output cleanly (e.g. old adb versions that
+always allocate a pty and echo input) are detected when the session starts and
+go back to one subprocess per command.
+"""
+
+import os
+import socket
+import subprocess
+import threading
+import uuid
+
+from phone_agent.adb.protocol import ADBProtocolError, get_client, use_socket_transport
+from phone_agent.tracing import span
+
+# Route shell commands through persistent sessions (set to "false" to disable)
+_PERSISTENT_SHELL = os.getenv("PHONE_AGENT_ADB_PERSISTENT_SHELL", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Seconds to wait for a new session to answer its first command
+_START_TIMEOUT = 10
+
+# Devices whose shell output could not be framed
+_SESSION_UNSUPPORTED: set[str | None] = set()
+
+_sessions: dict[str | None, "ShellSession"] = {}
+_sessions_lock = threading.Lock()
+
+
+class ShellSessionError(Exception):
+    """Raised when a shell session cannot be started or has died."""
+
+
+class _PipeClosed(ShellSessionError):
+    """The command could not be sent because the shell pipe is closed."""
+
+
+class ShellSession:
+    """
+    A long-lived `adb shell` process that runs commands one at a time.
+
+    Commands are serialized with a lock, so a session can be shared between
+    threads. The process is restarted automatically if it exits.
+
+    Args:
+        device_id: Optional ADB device ID.
+    """
+
+    def __init__(self, device_id: str | None = None):
+        self.device_id = device_id
+        self._sentinel = f"__PHONE_AGENT_{uuid.uuid4().hex}__".encode()
+        self._process: subprocess.Popen | None = None
+        self._reader: threading.Thread | None = None
+        self._buffer = bytearray()
+        self._eof = False
+        self._cond = threading.Condition()
+        self._lock = threading.Lock()
+        self.unsupported = False
+
+    def start(self) -> None:
+        """Start the shell process and check that output framing works."""
+        adb_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
+        self._process = subprocess.Popen(
+            adb_prefix + ["shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        with self._cond:
+            self._buffer.clear()
+            self._eof = False
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(self._process,), daemon=True
+        )
+        self._reader.start()
+
+        try:
+            returncode, output = self._execute("echo ready", _START_TIMEOUT)
+        except subprocess.TimeoutExpired as e:
+            # The session is closed already; callers fall back to `adb shell`
+            raise ShellSessionError(
+                f"Shell of {self.device_id or 'default device'} did not answer"
+            ) from e
+        if returncode != 0 or output != b"ready\n":
+            self.unsupported = True
+            self.close()
+            raise ShellSessionError(
+                f"Shell output of {self.device_id or 'default device'} cannot be framed"
+            )
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.write(b"exit\n")
+            process.stdin.flush()
+            process.wait(timeout=1)
+        except Exception:
+            process.kill()
+            process.wait()
+
+    def run(self, command: str, timeout: float | None = None) -> tuple[int, bytes]:
+        """
+        Run a command in the session.
+
+        Args:
+            command: Shell command line. stdin is redirected from /dev/null
+                and stderr is merged into stdout.
+            timeout: Seconds to wait for the command to finish. On timeout
+                the session is closed, since the command is still running.
+
+        Returns:
+            Tuple of (exit status, output bytes).
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time.
+            ShellSessionError: If the shell died and could not be restarted.
+        """
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self.close()
+                self.start()
+            try:
+                return self._execute(command, timeout)
+            except _PipeClosed:
+                # The command was never sent, so it is safe to reconnect and retry
+                self.close()
+                self.start()
+                return self._execute(command, timeout)
+
+    def _execute(self, command: str, timeout: float | None) -> tuple[int, bytes]:
+        """Send one framed command and wait for its sentinel."""
+        with self._cond:
+            self._buffer.clear()
+
+        sentinel = self._sentinel.decode()
+        line = f"{{ {command}\n}} </dev/null 2>&1; printf '\\n%s %d\\n' {sentinel} $?\n"
+        try:
+            self._process.stdin.write(line.encode("utf-8"))
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise _PipeClosed(f"Shell pipe closed: {e}") from e
+
+        marker = b"\n" + self._sentinel + b" "
+        with self._cond:
+            found = self._cond.wait_for(
+                lambda: self._eof or self._frame_end(marker) is not None, timeout
+            )
+            if not found:
+                self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+            end = self._frame_end(marker)
+            if end is None:
+                raise ShellSessionError("Shell exited before the command finished")
+
+            start = self._buffer.rindex(marker)
+            output = bytes(self._buffer[:start])
+            returncode = int(self._buffer[start + len(marker) : end])
+            del self._buffer[: end + 1]
+        return returncode, output
+
+    def _frame_end(self, marker: bytes) -> int | None:
+        """Index of the newline closing the sentinel line, if it has arrived."""
+        start = self._buffer.rfind(marker)
+        if start < 0:
+            return None
+        end = self._buffer.find(b"\n", start + len(marker))
+        return end if end >= 0 else None
+
+    def _read_loop(self, process: subprocess.Popen) -> None:
+        """Collect shell output on a background thread."""
+        while True:
+            chunk = process.stdout.read1(65536)
+            with self._cond:
+                if process is not self._process:
+                    # The session was restarted; this process is gone
+                    return
+                if not chunk:
+                    self._eof = True
+                    self._cond.notify_all()
+                    return
+                self._buffer += chunk
+                self._cond.notify_all()
+
+
+def set_persistent_shell(enabled: bool) -> None:
+    """
+    Enable or disable persistent shell sessions globally.
+
+    Args:
+        enabled: True to reuse one `adb shell` per device, False to spawn a
+            new `adb shell` process for every command.
+    """
+    global _PERSISTENT_SHELL
+    _PERSISTENT_SHELL = enabled
+    if not enabled:
+        close_sessions()
+
+
+def get_session(device_id: str | None = None) -> ShellSession:
+    """
+    Get the shared shell session of a device, creating it if needed.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The device's ShellSession.
+    """
+    with _sessions_lock:
+        session = _sessions.get(device_id)
+        if session is None:
+            session = ShellSession(device_id)
+            _sessions[device_id] = session
+    return session
+
+
+def close_sessions() -> None:
+    """Close all persistent shell sessions."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def run_shell(
+    args: list[str], device_id: str | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run `adb shell` with the given arguments.
+
+    Arguments are joined with spaces, exactly as `adb shell` itself does. With
+    the socket transport the command goes straight to the adb server; else the
+    device's persistent session is used when enabled and supported, and a new
+    `adb shell` process is spawned as a last resort.
+
+    Args:
+        args: Command and arguments to run on the device.
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with text output. With a persistent session or a
+        legacy shell over the socket, stderr is merged into stdout.
+    """
+    with span("adb shell", "device", device=device_id, cmd=args[0] if args else ""):
+        return _run_shell(args, device_id, timeout)
+
+
+def _run_shell(
+    args: list[str], device_id: str | None, timeout: float | None
+) -> subprocess.CompletedProcess:
+    """Run a shell command over the best available transport."""
+    if use_socket_transport():
+        try:
+            returncode, stdout, stderr = get_client().shell(
+                device_id, " ".join(args), timeout
+            )
+            return subprocess.CompletedProcess(
+                args,
+                0 if returncode is None else returncode,
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"),
+            )
+        except ADBProtocolError as e:
+            return subprocess.CompletedProcess(args, 1, "", str(e))
+        except socket.timeout as e:
+            raise subprocess.TimeoutExpired(args, timeout) from e
+        except ConnectionRefusedError:
+            # No adb server running; the binary below starts one
+            pass
+
+    if _PERSISTENT_SHELL and device_id not in _SESSION_UNSUPPORTED:
+        session = get_session(device_id)
+        try:
+            returncode, output = session.run(" ".join(args), timeout)
+            return subprocess.CompletedProcess(
+                args, returncode, output.decode("utf-8", errors="replace"), ""
+            )
+        except ShellSessionError:
+            if session.unsupported:
+                _SESSION_UNSUPPORTED.add(device_id)
+        except OSError:
+            # adb could not be started; let subprocess report it the usual way
+            pass
+
+    adb_prefix = ["adb", "-s", device_id] if device_id else ["adb"]
+    return subprocess.run(
+        adb_prefix + ["shell"] + args,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+    )
@@ -1,16 +1,33 @@
 """Main PhoneAgent class for orchestrating phone automation."""
 
 import json
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.actions import ActionHandler
 from phone_agent.actions.handler import do, finish, parse_action
-from phone_agent.config import get_messages, get_system_prompt
-from phone_agent.device_factory import get_device_factory
+from phone_agent.config import get_date_prompt, get_messages, get_system_prompt
+from phone_agent.device_factory import DeviceFactory, get_device_factory
+from phone_agent.metrics import (
+    ACTIVE_AGENTS,
+    SCREENSHOT_LATENCY,
+    STEP_LATENCY,
+    STEPS,
+    TASK_FAILURES,
+    TASKS,
+)
 from phone_agent.model import ModelClient, ModelConfig
-from phone_agent.model.client import MessageBuilder
+from phone_agent.model.client import MessageBuilder, ModelResponse
+from phone_agent.model.context import ContextManager
+from phone_agent.observation import Observation, observe
+from phone_agent.screenshot import Screenshot
+from phone_agent.settle import hash_distance
+from phone_agent.tracing import get_tracer, span, summarize
+from phone_agent.trajectory import Trajectory, TrajectoryStep, screen_hash
 
 
 @dataclass
@@ -22,10 +39,22 @@ class AgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    watch_foreground_app: bool = False  # Track the current app in the background
+    # Prompt token budget; older turns are summarized to stay within it
+    context_max_tokens: int | None = None
+    context_keep_turns: int = 4  # Recent turns always sent verbatim
+    # Keep the date out of the system prompt (it goes into the task message)
+    # so the prompt prefix is byte-identical across days and processes
+    stable_prompt_prefix: bool = False
+    record_trajectory: bool = False  # Keep a replayable Trajectory of each task
+    # Max differing screen-hash bits for a replayed step to match its recording
+    replay_hash_threshold: int = 6
 
     def __post_init__(self):
         if self.system_prompt is None:
-            self.system_prompt = get_system_prompt(self.lang)
+            self.system_prompt = get_system_prompt(
+                self.lang, include_date=not self.stable_prompt_prefix
+            )
 
 
 @dataclass
@@ -37,6 +66,11 @@ class StepResult:
     action: dict[str, Any] | None
     thinking: str
     message: str | None = None
+    observation: Observation | None = None  # Screen state and capture timings
+    prompt_tokens: int | None = None  # Estimated size of the prompt sent
+    # Wall-clock seconds per phase: screenshot, current_app, observe, prompt,
+    # model and action
+    timings: dict[str, float] | None = None
 
 
 class PhoneAgent:
@@ -51,6 +85,11 @@ class PhoneAgent:
         agent_config: Configuration for the agent behavior.
         confirmation_callback: Optional callback for sensitive action confirmation.
         takeover_callback: Optional callback for takeover requests.
+        model_client: Client to use, e.g. one ModelClient shared by the agents
+            of several devices.
+        device_factory: Device factory to act through; give each agent its own
+            to drive several devices from one process. Defaults to the global
+            DeviceFactory.
 
     Example:
         >>> from phone_agent import PhoneAgent
@@ -67,33 +106,80 @@ class PhoneAgent:
         agent_config: AgentConfig | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        model_client: ModelClient | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.model_config = model_config or ModelConfig()
         self.agent_config = agent_config or AgentConfig()
 
-        self.model_client = ModelClient(self.model_config)
+        self.model_client = model_client or ModelClient(self.model_config)
+        self.device_factory = device_factory or get_device_factory()
         self.action_handler = ActionHandler(
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
             takeover_callback=takeover_callback,
+            device_factory=self.device_factory,
         )
 
         self._context: list[dict[str, Any]] = []
         self._step_count = 0
+        self._last_result: StepResult | None = None
+        self._timings: dict[str, float] = {}
+        self._trajectory: Trajectory | None = None
+        self._replay: list[TrajectoryStep] | None = None
+        self._context_manager = ContextManager(
+            max_tokens=self.agent_config.context_max_tokens,
+            keep_turns=self.agent_config.context_keep_turns,
+        )
+        # Threads whose spans belong to this agent, and when the task started
+        self._trace_threads: set[int] = set()
+        self._trace_start: int | None = None
+        # Runs the app query while the screenshot is captured
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, initializer=self._register_trace_thread
+        )
 
-    def run(self, task: str) -> str:
+        if self.agent_config.watch_foreground_app:
+            self.device_factory.enable_app_watcher(self.agent_config.device_id)
+
+    def run(self, task: str, replay: Trajectory | None = None) -> str:
         """
         Run the agent to complete a task.
 
         Args:
             task: Natural language description of the task.
+            replay: Recorded trajectory of the task to follow. Its actions are
+                executed without the model while the screen and app match the
+                recording; from the first step that does not, the model takes
+                over. A new trajectory is recorded either way.
 
         Returns:
             Final message from the agent.
         """
-        self._context = []
-        self._step_count = 0
-
+        self.reset()
+        if self.agent_config.record_trajectory or replay is not None:
+            self._trajectory = Trajectory(task, device_id=self.agent_config.device_id)
+        if replay is not None:
+            self._replay = list(replay.steps)
+        self._register_trace_thread()
+        self._trace_start = time.perf_counter_ns()
+
+        ACTIVE_AGENTS.inc()
+        succeeded = False
+        try:
+            with span("task", task=task):
+                message = self._run_task(task)
+            last = self._last_result
+            succeeded = last is not None and last.finished and last.success
+            return message
+        finally:
+            ACTIVE_AGENTS.dec()
+            TASKS.inc()
+            if not succeeded:
+                TASK_FAILURES.inc()
+
+    def _run_task(self, task: str) -> str:
+        """Step until the task is finished or max steps is reached."""
         # First step with user prompt
         result = self._execute_step(task, is_first=True)
 
@@ -126,23 +212,87 @@ class PhoneAgent:
         if is_first and not task:
             raise ValueError("Task is required for the first step")
 
+        if is_first and self.agent_config.record_trajectory:
+            self._trajectory = Trajectory(task, device_id=self.agent_config.device_id)
         return self._execute_step(task, is_first)
 
     def reset(self) -> None:
         """Reset the agent state for a new task."""
         self._context = []
         self._step_count = 0
+        self._last_result = None
+        self._timings = {}
+        self._trajectory = None
+        self._replay = None
+        # The app may have changed by hand since the last task's actions
+        self.device_factory.invalidate_current_app(self.agent_config.device_id)
+
+    def close(self) -> None:
+        """
+        Stop the agent's worker thread and its device's app watcher and
+        screen stream. The agent cannot run tasks afterwards.
+        """
+        self._executor.shutdown()
+        self.device_factory.disable_app_watcher(self.agent_config.device_id)
+        self.device_factory.disable_streaming(self.agent_config.device_id)
+
+    def __enter__(self) -> "PhoneAgent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
     ) -> StepResult:
         """Execute a single step of the agent loop."""
+        start = time.perf_counter()
+        with span("step", step=self._step_count + 1):
+            result = self._run_step(user_prompt, is_first)
+        STEP_LATENCY.observe(time.perf_counter() - start)
+        STEPS.inc()
+        self._last_result = result
+        for phase, seconds in (result.timings or {}).items():
+            self._timings[phase] = self._timings.get(phase, 0.0) + seconds
+        return result
+
+    def _run_step(self, user_prompt: str | None, is_first: bool) -> StepResult:
+        """Observe, ask the model and act, timing each phase."""
         self._step_count += 1
 
-        # Capture current screen state
-        device_factory = get_device_factory()
-        screenshot = device_factory.get_screenshot(self.agent_config.device_id)
-        current_app = device_factory.get_current_app(self.agent_config.device_id)
+        # Capture screen and app state concurrently
+        device_factory = self.device_factory
+        device_id = self.agent_config.device_id
+
+        def get_screenshot():
+            with span("screenshot"):
+                return device_factory.get_screenshot(device_id)
+
+        def get_current_app():
+            with span("current_app"):
+                return device_factory.get_current_app(device_id)
+
+        with span("observe"):
+            observation = observe(get_screenshot, get_current_app, self._executor)
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+        SCREENSHOT_LATENCY.observe(observation.screenshot_time)
+        timings = {
+            "screenshot": observation.screenshot_time,
+            "current_app": observation.app_time,
+            "observe": observation.total_time,
+        }
+        screen = None
+        if self._trajectory is not None:
+            with span("screen_hash"):
+                screen = screen_hash(screenshot)
+        recorded = self._match_recorded(screenshot, screen, current_app)
+        phase_start = time.perf_counter()
+
+        # Downscale/re-encode for upload; actions still use the captured size.
+        # A replayed step needs no image: it is dropped from the context
+        # after the step anyway
+        image = None if recorded else self.model_client.prepare_image(screenshot)
 
         # Build messages
         if is_first:
@@ -152,30 +302,55 @@ class PhoneAgent:
 
             screen_info = MessageBuilder.build_screen_info(current_app)
             text_content = f"{user_prompt}\n\n{screen_info}"
+            if self.agent_config.stable_prompt_prefix:
+                text_content = (
+                    f"{get_date_prompt(self.agent_config.lang)}\n{text_content}"
+                )
 
             self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+                MessageBuilder.create_user_message(text=text_content, image=image)
             )
         else:
             screen_info = MessageBuilder.build_screen_info(current_app)
             text_content = f"** Screen Info **\n\n{screen_info}"
 
             self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+                MessageBuilder.create_user_message(text=text_content, image=image)
             )
 
         # Get model response
-        try:
-            msgs = get_messages(self.agent_config.lang)
+        verbose = self.agent_config.verbose
+        msgs = get_messages(self.agent_config.lang)
+        if recorded is not None:
+            if verbose:
+                print(f"\n⏩ {msgs['replayed_step']}: {recorded.answer}")
+            return self._act(
+                recorded.action,
+                ModelResponse(
+                    thinking=recorded.thinking,
+                    action=recorded.answer,
+                    raw_content=recorded.raw_output,
+                ),
+                observation,
+                screen,
+                timings,
+                replayed=True,
+            )
+        if verbose:
             print("\n" + "=" * 50)
             print(f"💭 {msgs['thinking']}:")
             print("-" * 50)
-            response = self.model_client.request(self._context)
+        try:
+            messages = self._context_manager.fit(self._context)
+            timings["prompt"] = self._end_phase("prompt", phase_start)
+            phase_start = time.perf_counter()
+            with span("model") as model_span:
+                response = self.model_client.request(messages, echo=verbose)
+                model_span.set(
+                    ttft=response.time_to_first_token, endpoint=response.endpoint
+                )
         except Exception as e:
+            timings["model"] = time.perf_counter() - phase_start
             if self.agent_config.verbose:
                 traceback.print_exc()
             return StepResult(
@@ -184,7 +359,11 @@ class PhoneAgent:
                 action=None,
                 thinking="",
                 message=f"Model error: {e}",
+                observation=observation,
+                prompt_tokens=self._context_manager.last_tokens,
+                timings=timings,
             )
+        timings["model"] = time.perf_counter() - phase_start
 
         # Parse action from response
         try:
@@ -197,14 +376,64 @@ class PhoneAgent:
         if self.agent_config.verbose:
             # Print thinking process
             print("-" * 50)
+            print(
+                f"📏 {msgs['prompt_size']}: ~{self._context_manager.last_tokens} tokens, "
+                f"{len(messages)} messages"
+            )
             print(f"🎯 {msgs['action']}:")
             print(json.dumps(action, ensure_ascii=False, indent=2))
             print("=" * 50 + "\n")
 
+        return self._act(action, response, observation, screen, timings)
+
+    def _match_recorded(
+        self, screenshot: Screenshot, screen: int | None, current_app: str
+    ) -> TrajectoryStep | None:
+        """
+        Get the recorded step to replay for the current screen, if any.
+
+        The replay stops at the first step whose screen or app differs from
+        the recording (or after its last step); the model decides the rest.
+        Blank screenshots (sensitive screens) never match, since every one of
+        them hashes the same.
+        """
+        if not self._replay:
+            return None
+
+        index = self._step_count - 1
+        step = self._replay[index] if index < len(self._replay) else None
+        if (
+            step is not None
+            and screen is not None
+            and not screenshot.is_sensitive
+            and step.current_app == current_app
+            and hash_distance(screen, step.screen_hash)
+            <= self.agent_config.replay_hash_threshold
+        ):
+            return step
+
+        self._replay = None
+        if self.agent_config.verbose:
+            print(f"\n🔀 {get_messages(self.agent_config.lang)['replay_diverged']}")
+        return None
+
+    def _act(
+        self,
+        action: dict[str, Any],
+        response: ModelResponse,
+        observation: Observation,
+        screen: int | None,
+        timings: dict[str, float],
+        replayed: bool = False,
+    ) -> StepResult:
+        """Execute the step's action and record it."""
+        screenshot = observation.screenshot
+
         # Remove image from context to save space
         self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
 
         # Execute action
+        phase_start = time.perf_counter()
         try:
             result = self.action_handler.execute(
                 action, screenshot.width, screenshot.height
@@ -216,6 +445,22 @@ class PhoneAgent:
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
 
+        timings["action"] = time.perf_counter() - phase_start
+
+        if self._trajectory is not None:
+            self._trajectory.steps.append(
+                TrajectoryStep(
+                    screen_hash=screen,
+                    current_app=observation.current_app,
+                    raw_output=response.raw_content,
+                    thinking=response.thinking,
+                    answer=response.action,
+                    action=action,
+                    timings=timings,
+                    replayed=replayed,
+                )
+            )
+
         # Add assistant response to context
         self._context.append(
             MessageBuilder.create_assistant_message(
@@ -240,6 +485,9 @@ class PhoneAgent:
             action=action,
             thinking=response.thinking,
             message=result.message or action.get("message"),
+            observation=observation,
+            prompt_tokens=self._context_manager.last_tokens,
+            timings=timings,
         )
 
     @property
@@ -251,3 +499,47 @@ class PhoneAgent:
     def step_count(self) -> int:
         """Get the current step count."""
         return self._step_count
+
+    def trace_summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Summarize the traced spans of the current or last task.
+
+        Returns:
+            Per span name, the count, latency percentiles and histogram (see
+            phone_agent.tracing.summarize()); empty before the first run().
+        """
+        if self._trace_start is None:
+            return {}
+        spans = get_tracer().spans(self._trace_start, self._trace_threads)
+        return summarize(spans)
+
+    def _register_trace_thread(self) -> None:
+        """Attribute spans recorded on the calling thread to this agent."""
+        self._trace_threads.add(threading.get_ident())
+
+    @staticmethod
+    def _end_phase(name: str, start: float) -> float:
+        """Record a step phase that started at perf_counter() `start` as a span."""
+        end = time.perf_counter()
+        get_tracer().record(name, "agent", int(start * 1e9), int((end - start) * 1e9))
+        return end - start
+
+    @property
+    def last_result(self) -> StepResult | None:
+        """Get the result of the latest step of the current task."""
+        return self._last_result
+
+    @property
+    def trajectory(self) -> Trajectory | None:
+        """
+        Get the trajectory of the current or last task.
+
+        Recorded when AgentConfig.record_trajectory is set or a trajectory is
+        replayed; save it with Trajectory.save() to replay it later.
+        """
+        return self._trajectory
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """Get the seconds spent in each step phase, summed over the current task."""
+        return dict(self._timings)
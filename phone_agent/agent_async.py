@@ -0,0 +1,295 @@
+"""Asyncio PhoneAgent for running many agents on one event loop."""
+
+import asyncio
+import json
+import time
+import traceback
+from typing import Any, Callable
+
+from phone_agent.actions.handler import finish, parse_action
+from phone_agent.actions.handler_async import AsyncActionHandler
+from phone_agent.agent import AgentConfig, StepResult
+from phone_agent.config import get_date_prompt, get_messages
+from phone_agent.device_factory import AsyncDeviceFactory, get_device_factory
+from phone_agent.metrics import (
+    ACTIVE_AGENTS,
+    SCREENSHOT_LATENCY,
+    STEP_LATENCY,
+    STEPS,
+    TASK_FAILURES,
+    TASKS,
+)
+from phone_agent.model import AsyncModelClient, ModelConfig
+from phone_agent.model.client import MessageBuilder
+from phone_agent.model.context import ContextManager
+from phone_agent.observation import observe_async
+
+
+class AsyncPhoneAgent:
+    """
+    Asyncio counterpart of PhoneAgent.
+
+    Device I/O and model streaming never block the event loop, so one loop
+    can run many agents. While the model streams its answer, device-side work
+    that does not depend on it runs concurrently: the ADB keyboard is switched
+    on at the first step, so Type actions do not pay for it.
+
+    Args:
+        model_config: Configuration for the AI model.
+        agent_config: Configuration for the agent behavior.
+        confirmation_callback: Optional callback for sensitive action confirmation.
+        takeover_callback: Optional callback for takeover requests.
+        model_client: Client to use, e.g. one AsyncModelClient shared by all
+            agents to bound the number of concurrent requests.
+        device_factory: Async device factory; defaults to the device type of
+            the global DeviceFactory.
+        prepare_keyboard: Keep the ADB keyboard active for the whole task.
+
+    Example:
+        >>> client = AsyncModelClient(ModelConfig(), max_concurrency=4)
+        >>> agents = [
+        ...     AsyncPhoneAgent(agent_config=AgentConfig(device_id=d, verbose=False),
+        ...                     model_client=client)
+        ...     for d in device_ids
+        ... ]
+        >>> results = await asyncio.gather(*(a.run(task) for a in agents))
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig | None = None,
+        agent_config: AgentConfig | None = None,
+        confirmation_callback: Callable[[str], bool] | None = None,
+        takeover_callback: Callable[[str], None] | None = None,
+        model_client: AsyncModelClient | None = None,
+        device_factory: AsyncDeviceFactory | None = None,
+        prepare_keyboard: bool = True,
+    ):
+        self.model_config = model_config or ModelConfig()
+        self.agent_config = agent_config or AgentConfig()
+        self.prepare_keyboard = prepare_keyboard
+
+        self.model_client = model_client or AsyncModelClient(self.model_config)
+        self.device_factory = device_factory or AsyncDeviceFactory(
+            get_device_factory().device_type
+        )
+        self.action_handler = AsyncActionHandler(
+            self.device_factory,
+            device_id=self.agent_config.device_id,
+            confirmation_callback=confirmation_callback,
+            takeover_callback=takeover_callback,
+        )
+
+        self._context: list[dict[str, Any]] = []
+        self._step_count = 0
+        self._context_manager = ContextManager(
+            max_tokens=self.agent_config.context_max_tokens,
+            keep_turns=self.agent_config.context_keep_turns,
+        )
+
+    async def run(self, task: str) -> str:
+        """
+        Run the agent to complete a task.
+
+        Args:
+            task: Natural language description of the task.
+
+        Returns:
+            Final message from the agent.
+        """
+        self.reset()
+        ACTIVE_AGENTS.inc()
+        succeeded = False
+        try:
+            result = await self._execute_step(task, is_first=True)
+
+            while not result.finished:
+                if self._step_count >= self.agent_config.max_steps:
+                    return "Max steps reached"
+                result = await self._execute_step(is_first=False)
+
+            succeeded = result.success
+            return result.message or "Task completed"
+        finally:
+            ACTIVE_AGENTS.dec()
+            TASKS.inc()
+            if not succeeded:
+                TASK_FAILURES.inc()
+            await self.action_handler.restore_keyboard()
+
+    async def step(self, task: str | None = None) -> StepResult:
+        """
+        Execute a single step of the agent.
+
+        Call restore_keyboard() after the last step.
+
+        Args:
+            task: Task description (only needed for first step).
+
+        Returns:
+            StepResult with step details.
+        """
+        is_first = len(self._context) == 0
+
+        if is_first and not task:
+            raise ValueError("Task is required for the first step")
+
+        return await self._execute_step(task, is_first)
+
+    async def restore_keyboard(self) -> None:
+        """Restore the keyboard switched by a stepped task."""
+        await self.action_handler.restore_keyboard()
+
+    def reset(self) -> None:
+        """Reset the agent state for a new task."""
+        self._context = []
+        self._step_count = 0
+        # The app may have changed by hand since the last task's actions
+        self.device_factory.invalidate_current_app(self.agent_config.device_id)
+
+    async def _execute_step(
+        self, user_prompt: str | None = None, is_first: bool = False
+    ) -> StepResult:
+        """Execute a single step of the agent loop."""
+        start = time.perf_counter()
+        result = await self._run_step(user_prompt, is_first)
+        STEP_LATENCY.observe(time.perf_counter() - start)
+        STEPS.inc()
+        return result
+
+    async def _run_step(self, user_prompt: str | None, is_first: bool) -> StepResult:
+        """Observe, ask the model and act."""
+        self._step_count += 1
+        verbose = self.agent_config.verbose
+        device_id = self.agent_config.device_id
+
+        observation = await observe_async(
+            lambda: self.device_factory.get_screenshot(device_id),
+            lambda: self.device_factory.get_current_app(device_id),
+        )
+        screenshot = observation.screenshot
+        SCREENSHOT_LATENCY.observe(observation.screenshot_time)
+
+        # Preprocessing is CPU-bound; keep it off the loop
+        image = await asyncio.to_thread(self.model_client.prepare_image, screenshot)
+
+        screen_info = MessageBuilder.build_screen_info(observation.current_app)
+        if is_first:
+            self._context.append(
+                MessageBuilder.create_system_message(self.agent_config.system_prompt)
+            )
+            text_content = f"{user_prompt}\n\n{screen_info}"
+            if self.agent_config.stable_prompt_prefix:
+                text_content = (
+                    f"{get_date_prompt(self.agent_config.lang)}\n{text_content}"
+                )
+        else:
+            text_content = f"** Screen Info **\n\n{screen_info}"
+        self._context.append(
+            MessageBuilder.create_user_message(text=text_content, image=image)
+        )
+
+        msgs = get_messages(self.agent_config.lang)
+        if verbose:
+            print("\n" + "=" * 50)
+            print(f"💭 {msgs['thinking']}:")
+            print("-" * 50)
+
+        # Device work that does not depend on the answer overlaps the stream
+        prefetch = asyncio.create_task(self._prefetch())
+        try:
+            messages = self._context_manager.fit(self._context)
+            response = await self.model_client.request(messages, echo=verbose)
+        except Exception as e:
+            if verbose:
+                traceback.print_exc()
+            await self._join(prefetch)
+            return StepResult(
+                success=False,
+                finished=True,
+                action=None,
+                thinking="",
+                message=f"Model error: {e}",
+                observation=observation,
+                prompt_tokens=self._context_manager.last_tokens,
+            )
+        await self._join(prefetch)
+
+        try:
+            action = parse_action(response.action)
+        except ValueError:
+            if verbose:
+                traceback.print_exc()
+            action = finish(message=response.action)
+
+        if verbose:
+            print("-" * 50)
+            print(
+                f"📏 {msgs['prompt_size']}: ~{self._context_manager.last_tokens} tokens, "
+                f"{len(messages)} messages"
+            )
+            print(f"🎯 {msgs['action']}:")
+            print(json.dumps(action, ensure_ascii=False, indent=2))
+            print("=" * 50 + "\n")
+
+        # Remove image from context to save space
+        self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
+
+        try:
+            result = await self.action_handler.execute(
+                action, screenshot.width, screenshot.height
+            )
+        except Exception as e:
+            if verbose:
+                traceback.print_exc()
+            result = await self.action_handler.execute(
+                finish(message=str(e)), screenshot.width, screenshot.height
+            )
+
+        self._context.append(
+            MessageBuilder.create_assistant_message(
+                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
+            )
+        )
+
+        finished = action.get("_metadata") == "finish" or result.should_finish
+
+        if finished and verbose:
+            print("\n" + "🎉 " + "=" * 48)
+            print(
+                f"✅ {msgs['task_completed']}: {result.message or action.get('message', msgs['done'])}"
+            )
+            print("=" * 50 + "\n")
+
+        return StepResult(
+            success=result.success,
+            finished=finished,
+            action=action,
+            thinking=response.thinking,
+            message=result.message or action.get("message"),
+            observation=observation,
+            prompt_tokens=self._context_manager.last_tokens,
+        )
+
+    async def _prefetch(self) -> None:
+        """Device work run while the model is generating."""
+        if self.prepare_keyboard:
+            await self.action_handler.prepare_keyboard()
+
+    async def _join(self, task: asyncio.Task) -> None:
+        """Wait for a prefetch task; its failures only cost the optimization."""
+        try:
+            await task
+        except Exception as e:
+            if self.agent_config.verbose:
+                print(f"Prefetch failed: {e}")
+
+    @property
+    def context(self) -> list[dict[str, Any]]:
+        """Get the current conversation context."""
+        return self._context.copy()
+
+    @property
+    def step_count(self) -> int:
+        """Get the current step count."""
+        return self._step_count
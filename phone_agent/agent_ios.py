@@ -2,14 +2,18 @@
 
 import json
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.actions.handler import do, finish, parse_action
 from phone_agent.actions.handler_ios import IOSActionHandler
-from phone_agent.config import get_messages, get_system_prompt
+from phone_agent.config import get_date_prompt, get_messages, get_system_prompt
 from phone_agent.model import ModelClient, ModelConfig
 from phone_agent.model.client import MessageBuilder
+from phone_agent.model.context import ContextManager
+from phone_agent.observation import Observation, observe
+from phone_agent.streaming import MJPEGFrameSource
 from phone_agent.xctest import XCTestConnection, get_current_app, get_screenshot
 
 
@@ -21,13 +25,22 @@ class IOSAgentConfig:
     wda_url: str = "http://localhost:8100"
     session_id: str | None = None
     device_id: str | None = None  # iOS device UDID
+    mjpeg_url: str | None = None  # WDA MJPEG stream, e.g. http://localhost:9100
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    # Prompt token budget; older turns are summarized to stay within it
+    context_max_tokens: int | None = None
+    context_keep_turns: int = 4  # Recent turns always sent verbatim
+    # Keep the date out of the system prompt (it goes into the task message)
+    # so the prompt prefix is byte-identical across days and processes
+    stable_prompt_prefix: bool = False
 
     def __post_init__(self):
         if self.system_prompt is None:
-            self.system_prompt = get_system_prompt(self.lang)
+            self.system_prompt = get_system_prompt(
+                self.lang, include_date=not self.stable_prompt_prefix
+            )
 
 
 @dataclass
@@ -39,6 +52,8 @@ class StepResult:
     action: dict[str, Any] | None
     thinking: str
     message: str | None = None
+    observation: Observation | None = None  # Screen state and capture timings
+    prompt_tokens: int | None = None  # Estimated size of the prompt sent
 
 
 class IOSPhoneAgent:
@@ -96,8 +111,20 @@ class IOSPhoneAgent:
             takeover_callback=takeover_callback,
         )
 
+        # Optional persistent MJPEG stream for fast screenshots
+        self._frame_source: MJPEGFrameSource | None = None
+        if self.agent_config.mjpeg_url:
+            self._frame_source = MJPEGFrameSource(self.agent_config.mjpeg_url)
+            self._frame_source.start()
+
         self._context: list[dict[str, Any]] = []
         self._step_count = 0
+        self._context_manager = ContextManager(
+            max_tokens=self.agent_config.context_max_tokens,
+            keep_turns=self.agent_config.context_keep_turns,
+        )
+        # Runs the app query while the screenshot is captured
+        self._executor = ThreadPoolExecutor(max_workers=1)
 
     def run(self, task: str) -> str:
         """
@@ -151,21 +178,42 @@ class IOSPhoneAgent:
         self._context = []
         self._step_count = 0
 
+    def close(self) -> None:
+        """
+        Stop the agent's worker thread and MJPEG stream. The agent cannot run
+        tasks afterwards.
+        """
+        self._executor.shutdown()
+        if self._frame_source is not None:
+            self._frame_source.stop()
+            self._frame_source = None
+
+    def __enter__(self) -> "IOSPhoneAgent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
     ) -> StepResult:
         """Execute a single step of the agent loop."""
         self._step_count += 1
 
-        # Capture current screen state
-        screenshot = get_screenshot(
-            wda_url=self.agent_config.wda_url,
-            session_id=self.agent_config.session_id,
-            device_id=self.agent_config.device_id,
-        )
-        current_app = get_current_app(
-            wda_url=self.agent_config.wda_url, session_id=self.agent_config.session_id
+        # Capture screen and app state concurrently
+        observation = observe(
+            self._get_screenshot,
+            lambda: get_current_app(
+                wda_url=self.agent_config.wda_url,
+                session_id=self.agent_config.session_id,
+            ),
+            self._executor,
         )
+        screenshot = observation.screenshot
+        current_app = observation.current_app
+
+        # Downscale/re-encode for upload; actions still use the captured size
+        image = self.model_client.prepare_image(screenshot)
 
         # Build messages
         if is_first:
@@ -175,25 +223,26 @@ class IOSPhoneAgent:
 
             screen_info = MessageBuilder.build_screen_info(current_app)
             text_content = f"{user_prompt}\n\n{screen_info}"
+            if self.agent_config.stable_prompt_prefix:
+                text_content = (
+                    f"{get_date_prompt(self.agent_config.lang)}\n{text_content}"
+                )
 
             self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+                MessageBuilder.create_user_message(text=text_content, image=image)
             )
         else:
             screen_info = MessageBuilder.build_screen_info(current_app)
             text_content = f"** Screen Info **\n\n{screen_info}"
 
             self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+                MessageBuilder.create_user_message(text=text_content, image=image)
             )
 
         # Get model response
         try:
-            response = self.model_client.request(self._context)
+            messages = self._context_manager.fit(self._context)
+            response = self.model_client.request(messages)
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -203,6 +252,8 @@ class IOSPhoneAgent:
                 action=None,
                 thinking="",
                 message=f"Model error: {e}",
+                observation=observation,
+                prompt_tokens=self._context_manager.last_tokens,
             )
 
         # Parse action from response
@@ -221,6 +272,10 @@ class IOSPhoneAgent:
             print("-" * 50)
             print(response.thinking)
             print("-" * 50)
+            print(
+                f"📏 {msgs['prompt_size']}: ~{self._context_manager.last_tokens} tokens, "
+                f"{len(messages)} messages"
+            )
             print(f"🎯 {msgs['action']}:")
             print(json.dumps(action, ensure_ascii=False, indent=2))
             print("=" * 50 + "\n")
@@ -239,6 +294,9 @@ class IOSPhoneAgent:
             result = self.action_handler.execute(
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
+        # Settle detection polls WDA, not the stream, so mark once it is done
+        if self._frame_source is not None:
+            self._frame_source.mark_action()
 
         # Add assistant response to context
         self._context.append(
@@ -264,6 +322,21 @@ class IOSPhoneAgent:
             action=action,
             thinking=response.thinking,
             message=result.message or action.get("message"),
+            observation=observation,
+            prompt_tokens=self._context_manager.last_tokens,
+        )
+
+    def _get_screenshot(self):
+        """Get a fresh streamed frame if available, otherwise capture one."""
+        if self._frame_source is not None:
+            frame = self._frame_source.latest()
+            if frame is not None:
+                return frame.to_screenshot()
+
+        return get_screenshot(
+            wda_url=self.agent_config.wda_url,
+            session_id=self.agent_config.session_id,
+            device_id=self.agent_config.device_id,
         )
 
     @property
@@ -0,0 +1,55 @@
+"""Asyncio building blocks for the async device layer.
+
+The async device modules (phone_agent.adb.aio, phone_agent.hdc.aio and
+phone_agent.xctest.aio) mirror the synchronous device API as coroutines, so a
+single event loop can drive many phones at once: while one device runs a
+command or settles after an action, the loop serves the others instead of
+parking a thread per device.
+
+Both APIs share command construction, output parsing, app indexes and the
+per-device current-app caches; only the I/O differs.
+"""
+
+import asyncio
+import subprocess
+
+
+async def run_process(
+    args: list[str], timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a command without blocking the event loop.
+
+    Args:
+        args: Command line.
+        timeout: Seconds before the process is killed.
+
+    Returns:
+        CompletedProcess with stdout and stderr as bytes.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(args, timeout)
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def decode(data: bytes) -> str:
+    """Decode command output as UTF-8, replacing invalid bytes."""
+    return data.decode("utf-8", errors="replace")
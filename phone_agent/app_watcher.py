@@ -0,0 +1,217 @@
+"""Background tracking of the foreground app.
+
+An app watcher follows the device's activity changes on a background thread
+and keeps the current foreground app in memory, so reading it costs nothing
+during an agent step. Listeners are notified whenever the app changes, and
+`changed_since()` tells whether a switch happened after a point in time (e.g.
+since an action was sent).
+
+On ADB the watcher tails activity events from `logcat -b events`. HDC has no
+equivalent stable event stream, so its watcher polls `aa dump -l` instead,
+which still moves the query off the agent's critical path.
+"""
+
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from phone_agent.adb.device import (
+    COMPONENT_PATTERN,
+    app_name_for_package,
+    query_current_app,
+)
+
+# Event log tags emitted when an activity comes to the foreground
+# (am_focused_activity up to Android 9, *_set_resumed_activity afterwards)
+FOREGROUND_EVENT_TAGS = (
+    "am_focused_activity",
+    "am_set_resumed_activity",
+    "wm_set_resumed_activity",
+)
+
+
+class AppWatcher(ABC):
+    """
+    Base class for background foreground-app watchers.
+
+    Subclasses implement `_watch()`, which blocks while following the device
+    and calls `_publish()` with the current app name. It is restarted
+    automatically whenever it returns or raises.
+
+    Args:
+        reconnect_delay: Seconds to wait before restarting a dropped watch.
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.reconnect_delay = reconnect_delay
+
+        self._current_app: str | None = None
+        self._last_change = 0.0
+        self._listeners: list[Callable[[str | None, str], None]] = []
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def current_app(self) -> str | None:
+        """The current foreground app, or None until it is known."""
+        return self._current_app
+
+    @property
+    def last_change(self) -> float:
+        """Monotonic time of the last app change."""
+        return self._last_change
+
+    def start(self) -> None:
+        """Start watching on a background thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._running = False
+        self._close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def add_listener(self, callback: Callable[[str | None, str], None]) -> None:
+        """
+        Register a callback for app changes.
+
+        Args:
+            callback: Called on the watcher thread with (previous app, new app).
+        """
+        self._listeners.append(callback)
+
+    def changed_since(self, timestamp: float) -> bool:
+        """Whether the foreground app changed after a monotonic timestamp."""
+        return self._last_change > timestamp
+
+    def wait_for_change(self, since: float, timeout: float) -> bool:
+        """
+        Wait until the foreground app changes after a point in time.
+
+        Args:
+            since: Monotonic timestamp, e.g. when an action was sent.
+            timeout: Seconds to wait.
+
+        Returns:
+            True if the app changed, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._last_change > since, timeout=timeout
+            )
+
+    def _publish(self, app_name: str) -> None:
+        """Record the current app and notify listeners if it changed."""
+        with self._condition:
+            previous = self._current_app
+            if app_name == previous:
+                return
+            self._current_app = app_name
+            self._last_change = time.monotonic()
+            self._condition.notify_all()
+
+        for callback in self._listeners:
+            try:
+                callback(previous, app_name)
+            except Exception as e:
+                print(f"App change listener error: {e}")
+
+    def _run(self) -> None:
+        """Keep watching until stopped."""
+        while self._running:
+            try:
+                self._watch()
+            except Exception as e:
+                if self._running:
+                    print(f"App watcher error: {e}")
+            finally:
+                self._close()
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+    @abstractmethod
+    def _watch(self) -> None:
+        """Follow the device and publish the foreground app."""
+
+    def _close(self) -> None:
+        """Release the resources of the current watch."""
+
+
+class LogcatAppWatcher(AppWatcher):
+    """
+    App watcher for Android devices backed by the `logcat` events buffer.
+
+    Args:
+        device_id: Optional ADB device ID.
+        **kwargs: Passed to AppWatcher.
+    """
+
+    def __init__(self, device_id: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.device_id = device_id
+        self._process: subprocess.Popen | None = None
+
+    def _watch(self) -> None:
+        """Tail foreground-activity events."""
+        adb_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
+        filters = [f"{tag}:I" for tag in FOREGROUND_EVENT_TAGS] + ["*:S"]
+        # -T 1 replays only the latest matching event instead of the whole log
+        self._process = subprocess.Popen(
+            adb_prefix + ["logcat", "-b", "events", "-v", "brief", "-T", "1"] + filters,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+
+        # Events only report changes, so start from the focus window state
+        self._publish(query_current_app(self.device_id))
+
+        for line in self._process.stdout:
+            if not self._running:
+                break
+            if not any(tag in line for tag in FOREGROUND_EVENT_TAGS):
+                continue
+            # e.g. "I/wm_set_resumed_activity( 1234): [0,com.tencent.mm/.ui.LauncherUI,...]"
+            match = COMPONENT_PATTERN.search(line.partition("[")[2])
+            if match:
+                self._publish(app_name_for_package(match.group(1)))
+
+    def _close(self) -> None:
+        """Stop the logcat process."""
+        process, self._process = self._process, None
+        if process is not None:
+            process.kill()
+            process.wait()
+
+
+class PollingAppWatcher(AppWatcher):
+    """
+    App watcher that polls a query function at a fixed interval.
+
+    Args:
+        query: Returns the current foreground app name.
+        interval: Seconds between queries.
+        **kwargs: Passed to AppWatcher.
+    """
+
+    def __init__(self, query: Callable[[], str], interval: float = 0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.query = query
+        self.interval = interval
+
+    def _watch(self) -> None:
+        """Poll until stopped."""
+        while self._running:
+            self._publish(self.query())
+            time.sleep(self.interval)
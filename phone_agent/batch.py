@@ -0,0 +1,180 @@
+"""Batch runs of tasks from a JSONL file, with a resumable results file."""
+
+import json
+import os
+from dataclasses import asdict
+from typing import Any, Callable, Iterator
+
+from phone_agent.fleet import Fleet, TaskResult
+
+
+def read_tasks(path: str) -> Iterator[tuple[str, str]]:
+    """
+    Stream the tasks of a JSONL file, one line at a time.
+
+    Each line is an object with a "task" and an optional "id", or a bare
+    JSON string. Tasks without an id are identified by their line number
+    ("line-3"), so resuming relies on the file not being reordered. Blank
+    lines are skipped; malformed lines and repeated ids are reported and
+    skipped.
+
+    Args:
+        path: Task file.
+
+    Yields:
+        (task_id, task) pairs.
+    """
+    seen_ids: set[str] = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"{path}:{line_number}: invalid JSON ({e}), skipped")
+                continue
+
+            if isinstance(record, str):
+                record = {"task": record}
+            task = record.get("task") if isinstance(record, dict) else None
+            if not isinstance(task, str) or not task.strip():
+                print(f"{path}:{line_number}: no task, skipped")
+                continue
+
+            task_id = str(record.get("id", f"line-{line_number}"))
+            if task_id in seen_ids:
+                print(f"{path}:{line_number}: duplicate id {task_id!r}, skipped")
+                continue
+            seen_ids.add(task_id)
+            yield task_id, task
+
+
+class ResultStore:
+    """
+    Append-only JSONL file of task results.
+
+    Every result is flushed to disk as soon as its task ends, so a crash
+    loses at most the tasks in flight. A line torn by a crash is ignored
+    when the file is read back.
+
+    Args:
+        path: Results file; created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def done_ids(self, retry_failed: bool = False) -> set[str]:
+        """
+        Get the IDs of the tasks that already have a result.
+
+        Only the IDs are kept in memory, not the records.
+
+        Args:
+            retry_failed: Leave out tasks whose latest result failed, so
+                they run again.
+
+        Returns:
+            Task IDs to skip.
+        """
+        done: set[str] = set()
+        if not os.path.exists(self.path):
+            return done
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    task_id = str(record["id"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+                if retry_failed and not record.get("success"):
+                    done.discard(task_id)
+                else:
+                    done.add(task_id)
+        return done
+
+    def append(self, result: TaskResult) -> None:
+        """
+        Write the record of a finished task.
+
+        Args:
+            result: Result from the fleet.
+        """
+        if self._file is None:
+            torn = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                # Start on a fresh line after a record torn by a crash
+                self._file.write("\n")
+
+        record = asdict(result)
+        record = {"id": record.pop("task_id"), **record}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the results file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_batch(
+    fleet: Fleet,
+    tasks_path: str,
+    results_path: str,
+    retry_failed: bool = False,
+    on_result: Callable[[TaskResult], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Run the tasks of a JSONL file on a fleet, skipping those already done.
+
+    Tasks are read as devices free up and every result is appended to the
+    results file when its task ends, so memory does not grow with the size
+    of the task file (only the IDs of finished tasks are kept). Run it
+    again after a crash to pick up where it stopped.
+
+    Args:
+        fleet: Devices to run the tasks on.
+        tasks_path: Task file (see read_tasks()).
+        results_path: Results file (see ResultStore).
+        retry_failed: Run tasks whose recorded result failed again.
+        on_result: Called with every TaskResult after it is stored.
+
+    Returns:
+        The fleet stats, plus "skipped": tasks already done.
+    """
+    with ResultStore(results_path) as store:
+        done = store.done_ids(retry_failed)
+        skipped = 0
+
+        def pending() -> Iterator[tuple[str, str]]:
+            nonlocal skipped
+            for task_id, task in read_tasks(tasks_path):
+                if task_id in done:
+                    skipped += 1
+                    continue
+                yield task_id, task
+
+        def record(result: TaskResult) -> None:
+            store.append(result)
+            if on_result is not None:
+                on_result(result)
+
+        stats = fleet.run(pending(), on_result=record)
+    stats["skipped"] = skipped
+    return stats
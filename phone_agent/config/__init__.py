@@ -1,5 +1,6 @@
 """Configuration module for Phone Agent."""
 
+from phone_agent.config import prompts_en, prompts_zh
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS
 from phone_agent.config.i18n import get_message, get_messages
@@ -10,25 +11,43 @@ from phone_agent.config.timing import (
     ActionTimingConfig,
     ConnectionTimingConfig,
     DeviceTimingConfig,
+    SettleTimingConfig,
     TimingConfig,
     get_timing_config,
     update_timing_config,
 )
 
 
-def get_system_prompt(lang: str = "cn") -> str:
+def get_system_prompt(lang: str = "cn", include_date: bool = True) -> str:
     """
     Get system prompt by language.
 
     Args:
         lang: Language code, 'cn' for Chinese, 'en' for English.
+        include_date: Start the prompt with today's date. Without it the
+            prompt is identical every day; send get_date_prompt() elsewhere.
 
     Returns:
         System prompt string.
     """
-    if lang == "en":
-        return SYSTEM_PROMPT_EN
-    return SYSTEM_PROMPT_ZH
+    prompts = prompts_en if lang == "en" else prompts_zh
+    if include_date:
+        return prompts.SYSTEM_PROMPT
+    return prompts.SYSTEM_PROMPT_BODY
+
+
+def get_date_prompt(lang: str = "cn") -> str:
+    """
+    Get the line telling the model today's date.
+
+    Args:
+        lang: Language code, 'cn' for Chinese, 'en' for English.
+
+    Returns:
+        Date line of the system prompt.
+    """
+    prompts = prompts_en if lang == "en" else prompts_zh
+    return prompts.DATE_PROMPT
 
 
 # Default to Chinese for backward compatibility
@@ -41,6 +60,7 @@ __all__ = [
     "SYSTEM_PROMPT_ZH",
     "SYSTEM_PROMPT_EN",
     "get_system_prompt",
+    "get_date_prompt",
     "get_messages",
     "get_message",
     "TIMING_CONFIG",
@@ -48,6 +68,7 @@ __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "get_timing_config",
     "update_timing_config",
 ]
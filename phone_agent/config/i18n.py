@@ -23,6 +23,19 @@ MESSAGES_ZH = {
     "time_to_first_token": "首 Token 延迟 (TTFT)",
     "time_to_thinking_end": "思考完成延迟",
     "total_inference_time": "总推理时间",
+    "time_to_action_end": "动作完成延迟",
+    "generation_after_action": "动作后生成耗时",
+    "generation_stopped_early": "动作完成后已停止生成",
+    "prompt_size": "提示长度",
+    "prompt_tokens": "提示 Token 数",
+    "prompt_cache_hits": "缓存命中",
+    "model_endpoint": "模型端点",
+    "model_endpoint_failover": "模型端点失败，切换到其他端点重试",
+    "model_retry": "模型请求失败，稍后重试",
+    "hedging": "对冲请求",
+    "hedge_wins": "副本胜出",
+    "replayed_step": "回放录制步骤",
+    "replay_diverged": "屏幕与录制不一致，由模型接管",
 }
 
 # English messages
@@ -48,6 +61,19 @@ MESSAGES_EN = {
     "time_to_first_token": "Time to First Token (TTFT)",
     "time_to_thinking_end": "Time to Thinking End",
     "total_inference_time": "Total Inference Time",
+    "time_to_action_end": "Time to Action End",
+    "generation_after_action": "Generation After Action",
+    "generation_stopped_early": "Generation stopped once the action was complete",
+    "prompt_size": "Prompt Size",
+    "prompt_tokens": "Prompt Tokens",
+    "prompt_cache_hits": "cached",
+    "model_endpoint": "Model endpoint",
+    "model_endpoint_failover": "Model endpoint failed, retrying on another one",
+    "model_retry": "Model request failed, retrying",
+    "hedging": "Hedged requests",
+    "hedge_wins": "duplicate won",
+    "replayed_step": "Replayed recorded step",
+    "replay_diverged": "Screen differs from the recording, the model takes over",
 }
 
 
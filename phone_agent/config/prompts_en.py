@@ -5,11 +5,10 @@ from datetime import datetime
 today = datetime.today()
 formatted_date = today.strftime("%Y-%m-%d, %A")
 
-SYSTEM_PROMPT = (
-    "The current date: "
-    + formatted_date
-    + """
-# Setup
+DATE_PROMPT = "The current date: " + formatted_date
+
+# Everything but the date, so it stays byte-identical from day to day
+SYSTEM_PROMPT_BODY = """# Setup
 You are a professional Android operation agent assistant that can fulfill the user's high-level instructions. Given a screenshot of the Android interface at each step, you first analyze the situation, then plan the best course of action using Python-style pseudo-code.
 
 # More details about the code
@@ -76,4 +75,5 @@ REMEMBER:
 - Only ONE LINE of action in <answer> part per response: Each step must contain exactly one line of executable code.
 - Generate execution code strictly according to format requirements.
 """
-)
+
+SYSTEM_PROMPT = DATE_PROMPT + "\n" + SYSTEM_PROMPT_BODY
@@ -96,6 +96,40 @@ class ConnectionTimingConfig:
         )
 
 
+@dataclass
+class SettleTimingConfig:
+    """Configuration for adaptive screen-settle detection after actions."""
+
+    # When enabled, post-action delays end as soon as the screen stops changing
+    enabled: bool = False
+    min_delay: float = 0.3  # Always wait at least this long after an action
+    max_delay: float = 3.0  # Never wait longer than this
+    poll_interval: float = 0.1  # Pause between frame polls
+    stable_frames: int = 2  # Consecutive matching frames that count as settled
+    hash_threshold: int = 2  # Max differing perceptual-hash bits for a match
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.enabled = os.getenv(
+            "PHONE_AGENT_ADAPTIVE_SETTLE", str(self.enabled)
+        ).lower() in ("true", "1", "yes")
+        self.min_delay = float(
+            os.getenv("PHONE_AGENT_SETTLE_MIN_DELAY", self.min_delay)
+        )
+        self.max_delay = float(
+            os.getenv("PHONE_AGENT_SETTLE_MAX_DELAY", self.max_delay)
+        )
+        self.poll_interval = float(
+            os.getenv("PHONE_AGENT_SETTLE_POLL_INTERVAL", self.poll_interval)
+        )
+        self.stable_frames = int(
+            os.getenv("PHONE_AGENT_SETTLE_STABLE_FRAMES", self.stable_frames)
+        )
+        self.hash_threshold = int(
+            os.getenv("PHONE_AGENT_SETTLE_HASH_THRESHOLD", self.hash_threshold)
+        )
+
+
 @dataclass
 class TimingConfig:
     """Master timing configuration combining all timing settings."""
@@ -103,12 +137,14 @@ class TimingConfig:
     action: ActionTimingConfig
     device: DeviceTimingConfig
     connection: ConnectionTimingConfig
+    settle: SettleTimingConfig
 
     def __init__(self):
         """Initialize all timing configurations."""
         self.action = ActionTimingConfig()
         self.device = DeviceTimingConfig()
         self.connection = ConnectionTimingConfig()
+        self.settle = SettleTimingConfig()
 
 
 # Global timing configuration instance
@@ -130,6 +166,7 @@ def update_timing_config(
     action: ActionTimingConfig | None = None,
     device: DeviceTimingConfig | None = None,
     connection: ConnectionTimingConfig | None = None,
+    settle: SettleTimingConfig | None = None,
 ) -> None:
     """
     Update the global timing configuration.
@@ -138,6 +175,7 @@ def update_timing_config(
         action: New action timing configuration.
         device: New device timing configuration.
         connection: New connection timing configuration.
+        settle: New screen-settle configuration.
 
     Example:
         >>> from phone_agent.config.timing import update_timing_config, ActionTimingConfig
@@ -154,12 +192,15 @@ def update_timing_config(
         TIMING_CONFIG.device = device
     if connection is not None:
         TIMING_CONFIG.connection = connection
+    if settle is not None:
+        TIMING_CONFIG.settle = settle
 
 
 __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "TimingConfig",
     "TIMING_CONFIG",
     "get_timing_config",
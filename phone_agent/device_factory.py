@@ -1,5 +1,6 @@
 """Device factory for selecting ADB or HDC based on device type."""
 
+import asyncio
 from enum import Enum
 from typing import Any
 
@@ -28,6 +29,8 @@ class DeviceFactory:
         """
         self.device_type = device_type
         self._module = None
+        self._frame_sources = {}
+        self._app_watchers = {}
 
     @property
     def module(self):
@@ -45,14 +48,111 @@ class DeviceFactory:
                 raise ValueError(f"Unknown device type: {self.device_type}")
         return self._module
 
+    def enable_streaming(self, device_id: str | None = None, **kwargs) -> None:
+        """
+        Serve screenshots from a persistent screen stream instead of cold captures.
+
+        Args:
+            device_id: Device ID to stream.
+            **kwargs: Passed to the frame source (see phone_agent.streaming).
+        """
+        if device_id in self._frame_sources:
+            return
+        if self.device_type != DeviceType.ADB:
+            raise ValueError(
+                f"Screen streaming is not supported for {self.device_type.value}"
+            )
+
+        from phone_agent.streaming import ScreenrecordFrameSource
+
+        source = ScreenrecordFrameSource(device_id, **kwargs)
+        source.start()
+        self._frame_sources[device_id] = source
+        self.module.set_settle_source(
+            device_id, source.latest_image, on_action=source.mark_action
+        )
+
+    def disable_streaming(self, device_id: str | None = None) -> None:
+        """Stop the screen stream of a device, if any."""
+        source = self._frame_sources.pop(device_id, None)
+        if source is not None:
+            self.module.set_settle_source(device_id, None)
+            source.stop()
+
     def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
         """Get screenshot from device."""
+        source = self._frame_sources.get(device_id)
+        if source is not None:
+            frame = source.latest()
+            if frame is not None:
+                return frame.to_screenshot()
         return self.module.get_screenshot(device_id, timeout)
 
+    def _mark_action(self, device_id: str | None) -> None:
+        """Invalidate streamed frames that predate an action just sent."""
+        source = self._frame_sources.get(device_id)
+        if source is not None:
+            source.mark_action()
+
+    def wait_for_settle(self, delay: float, device_id: str | None = None) -> float:
+        """Wait for the screen to settle, falling back to a static delay."""
+        from phone_agent.settle import wait_for_settle
+
+        return wait_for_settle(delay, lambda: self.module.get_settle_frame(device_id))
+
+    def enable_app_watcher(self, device_id: str | None = None, **kwargs):
+        """
+        Track the foreground app in the background instead of querying it.
+
+        Args:
+            device_id: Device ID to watch.
+            **kwargs: Passed to the watcher (see phone_agent.app_watcher).
+
+        Returns:
+            The AppWatcher, e.g. to register app-change listeners.
+        """
+        watcher = self._app_watchers.get(device_id)
+        if watcher is not None:
+            return watcher
+
+        from phone_agent.app_watcher import LogcatAppWatcher, PollingAppWatcher
+
+        if self.device_type == DeviceType.ADB:
+            watcher = LogcatAppWatcher(device_id, **kwargs)
+        elif self.device_type == DeviceType.HDC:
+            from phone_agent.hdc.device import query_current_app
+
+            watcher = PollingAppWatcher(lambda: query_current_app(device_id), **kwargs)
+        else:
+            raise ValueError(
+                f"App watching is not supported for {self.device_type.value}"
+            )
+
+        watcher.start()
+        self._app_watchers[device_id] = watcher
+        return watcher
+
+    def disable_app_watcher(self, device_id: str | None = None) -> None:
+        """Stop watching the foreground app of a device, if watched."""
+        watcher = self._app_watchers.pop(device_id, None)
+        if watcher is not None:
+            watcher.stop()
+
+    def get_app_watcher(self, device_id: str | None = None):
+        """Get the app watcher of a device, or None if not watched."""
+        return self._app_watchers.get(device_id)
+
     def get_current_app(self, device_id: str | None = None) -> str:
         """Get current app name."""
+        watcher = self._app_watchers.get(device_id)
+        if watcher is not None and watcher.current_app is not None:
+            return watcher.current_app
         return self.module.get_current_app(device_id)
 
+    def invalidate_current_app(self, device_id: str | None = None):
+        """Forget the cached current app, e.g. after a manual takeover."""
+        return self.module.invalidate_current_app(device_id)
+
     def tap(
         self, x: int, y: int, device_id: str | None = None, delay: float | None = None
     ):
@@ -107,19 +207,27 @@ class DeviceFactory:
 
     def type_text(self, text: str, device_id: str | None = None):
         """Type text."""
-        return self.module.type_text(text, device_id)
+        result = self.module.type_text(text, device_id)
+        self._mark_action(device_id)
+        return result
 
     def clear_text(self, device_id: str | None = None):
         """Clear text."""
-        return self.module.clear_text(device_id)
+        result = self.module.clear_text(device_id)
+        self._mark_action(device_id)
+        return result
 
     def detect_and_set_adb_keyboard(self, device_id: str | None = None) -> str:
         """Detect and set keyboard."""
-        return self.module.detect_and_set_adb_keyboard(device_id)
+        result = self.module.detect_and_set_adb_keyboard(device_id)
+        self._mark_action(device_id)
+        return result
 
     def restore_keyboard(self, ime: str, device_id: str | None = None):
         """Restore keyboard."""
-        return self.module.restore_keyboard(ime, device_id)
+        result = self.module.restore_keyboard(ime, device_id)
+        self._mark_action(device_id)
+        return result
 
     def list_devices(self):
         """List connected devices."""
@@ -165,3 +273,218 @@ def get_device_factory() -> DeviceFactory:
     if _device_factory is None:
         _device_factory = DeviceFactory(DeviceType.ADB)  # Default to ADB
     return _device_factory
+
+
+class AsyncDeviceFactory:
+    """
+    Asyncio counterpart of DeviceFactory.
+
+    Exposes the same methods as coroutines, so one event loop can drive many
+    devices concurrently. ADB and HDC devices are addressed by device ID; iOS
+    devices are registered with their WebDriverAgent URL via register_wda().
+    """
+
+    def __init__(self, device_type: DeviceType = DeviceType.ADB):
+        """
+        Initialize the async device factory.
+
+        Args:
+            device_type: The type of device to use (ADB, HDC or IOS).
+        """
+        self.device_type = device_type
+        self._module = None
+        self._wda_clients = {}
+
+    @property
+    def module(self):
+        """Get the appropriate async device module (adb or hdc)."""
+        if self._module is None:
+            if self.device_type == DeviceType.ADB:
+                from phone_agent.adb import aio
+
+                self._module = aio
+            elif self.device_type == DeviceType.HDC:
+                from phone_agent.hdc import aio
+
+                self._module = aio
+            else:
+                raise ValueError(f"Unknown device type: {self.device_type}")
+        return self._module
+
+    def register_wda(
+        self,
+        device_id: str | None = None,
+        wda_url: str = "http://localhost:8100",
+        session_id: str | None = None,
+    ):
+        """
+        Register the WebDriverAgent of an iOS device.
+
+        Args:
+            device_id: Device ID used in later calls.
+            wda_url: WebDriverAgent URL of the device.
+            session_id: Optional WDA session ID.
+
+        Returns:
+            The AsyncWDAClient of the device.
+        """
+        from phone_agent.xctest.aio import AsyncWDAClient
+
+        client = AsyncWDAClient(wda_url, session_id, device_id)
+        self._wda_clients[device_id] = client
+        return client
+
+    def _wda(self, device_id: str | None):
+        """Get the WDA client of an iOS device, registering the default URL."""
+        client = self._wda_clients.get(device_id)
+        if client is None:
+            client = self.register_wda(device_id)
+        return client
+
+    @property
+    def _is_ios(self) -> bool:
+        """Whether devices are driven through WebDriverAgent."""
+        return self.device_type == DeviceType.IOS
+
+    async def aclose(self) -> None:
+        """Close the connections held for iOS devices."""
+        clients, self._wda_clients = self._wda_clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    async def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
+        """Get screenshot from device."""
+        if self._is_ios:
+            return await self._wda(device_id).get_screenshot(timeout)
+        return await self.module.get_screenshot(device_id, timeout)
+
+    async def wait_for_settle(
+        self, delay: float, device_id: str | None = None
+    ) -> float:
+        """Wait for the screen to settle, falling back to a static delay."""
+        from phone_agent.settle import wait_for_settle_async
+
+        if self._is_ios:
+            capture = self._wda(device_id).get_settle_frame
+        else:
+            capture = lambda: self.module.get_settle_frame(device_id)  # noqa: E731
+        return await wait_for_settle_async(delay, capture)
+
+    async def get_current_app(self, device_id: str | None = None) -> str:
+        """Get current app name."""
+        if self._is_ios:
+            return await self._wda(device_id).get_current_app()
+        return await self.module.get_current_app(device_id)
+
+    def invalidate_current_app(self, device_id: str | None = None):
+        """Forget the cached current app, e.g. after a manual takeover."""
+        if not self._is_ios:
+            self.module.invalidate_current_app(device_id)
+
+    async def tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Tap at coordinates."""
+        if self._is_ios:
+            return await self._wda(device_id).tap(x, y, *_ios_delay(delay))
+        return await self.module.tap(x, y, device_id, delay)
+
+    async def double_tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Double tap at coordinates."""
+        if self._is_ios:
+            return await self._wda(device_id).double_tap(x, y, *_ios_delay(delay))
+        return await self.module.double_tap(x, y, device_id, delay)
+
+    async def long_press(
+        self,
+        x: int,
+        y: int,
+        duration_ms: int = 3000,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Long press at coordinates."""
+        if self._is_ios:
+            return await self._wda(device_id).long_press(
+                x, y, duration_ms / 1000, *_ios_delay(delay)
+            )
+        return await self.module.long_press(x, y, duration_ms, device_id, delay)
+
+    async def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration_ms: int | None = None,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Swipe from start to end."""
+        if self._is_ios:
+            duration = duration_ms / 1000 if duration_ms is not None else None
+            return await self._wda(device_id).swipe(
+                start_x, start_y, end_x, end_y, duration, *_ios_delay(delay)
+            )
+        return await self.module.swipe(
+            start_x, start_y, end_x, end_y, duration_ms, device_id, delay
+        )
+
+    async def back(self, device_id: str | None = None, delay: float | None = None):
+        """Press back button."""
+        if self._is_ios:
+            return await self._wda(device_id).back(*_ios_delay(delay))
+        return await self.module.back(device_id, delay)
+
+    async def home(self, device_id: str | None = None, delay: float | None = None):
+        """Press home button."""
+        if self._is_ios:
+            return await self._wda(device_id).home(*_ios_delay(delay))
+        return await self.module.home(device_id, delay)
+
+    async def launch_app(
+        self, app_name: str, device_id: str | None = None, delay: float | None = None
+    ) -> bool:
+        """Launch an app."""
+        if self._is_ios:
+            return await self._wda(device_id).launch_app(app_name, *_ios_delay(delay))
+        return await self.module.launch_app(app_name, device_id, delay)
+
+    async def type_text(self, text: str, device_id: str | None = None):
+        """Type text."""
+        if self._is_ios:
+            return await self._wda(device_id).type_text(text)
+        return await self.module.type_text(text, device_id)
+
+    async def clear_text(self, device_id: str | None = None):
+        """Clear text."""
+        if self._is_ios:
+            return await self._wda(device_id).clear_text()
+        return await self.module.clear_text(device_id)
+
+    async def detect_and_set_adb_keyboard(self, device_id: str | None = None) -> str:
+        """Detect and set keyboard."""
+        if self._is_ios:
+            return ""
+        return await self.module.detect_and_set_adb_keyboard(device_id)
+
+    async def restore_keyboard(self, ime: str, device_id: str | None = None):
+        """Restore keyboard."""
+        if self._is_ios:
+            return None
+        return await self.module.restore_keyboard(ime, device_id)
+
+    async def list_devices(self):
+        """List connected devices."""
+        if self._is_ios:
+            from phone_agent.xctest import list_devices
+        else:
+            list_devices = DeviceFactory(self.device_type).list_devices
+        return await asyncio.to_thread(list_devices)
+
+
+def _ios_delay(delay: float | None) -> tuple:
+    """Pass a delay to the WDA client only when one was given."""
+    return () if delay is None else (delay,)
@@ -0,0 +1,298 @@
+"""Run a queue of tasks on a fleet of devices, one agent per device."""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Iterable
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.model import ModelClient, ModelConfig
+
+# Seconds between checks for live workers while the task queue is full
+_PUT_POLL = 0.5
+
+
+def discover_devices(device_type: DeviceType = DeviceType.ADB) -> list[str]:
+    """
+    List the connected devices that are ready to take tasks.
+
+    Args:
+        device_type: ADB or HDC.
+
+    Returns:
+        Device IDs, as reported by ADBConnection/HDCConnection.list_devices().
+    """
+    connection = DeviceFactory(device_type).get_connection_class()()
+    return [d.device_id for d in connection.list_devices() if d.status == "device"]
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one task run by the fleet."""
+
+    task: str
+    device_id: str
+    success: bool  # The agent finished the task and reported success
+    message: str  # Final message of the agent
+    steps: int
+    started_at: float  # time.time() when the task started
+    duration: float  # Seconds
+    timings: dict[str, float] = field(default_factory=dict)  # Seconds per phase
+    error: str | None = None  # Exception that ended the task, if any
+    task_id: str | None = None
+
+
+@dataclass
+class DeviceStats:
+    """Work done by one device of the fleet."""
+
+    device_id: str
+    tasks: int = 0
+    failures: int = 0  # Tasks that did not succeed
+    busy: float = 0.0  # Seconds spent running tasks
+    retired: str | None = None  # Why the device stopped taking tasks
+
+
+class Fleet:
+    """
+    Runs tasks from one queue on several devices concurrently.
+
+    Every device gets a worker thread with its own PhoneAgent and its own
+    DeviceFactory, so no device state goes through the global factory, and
+    mixed ADB and HDC fleets can be built from several Fleet objects. Idle
+    devices take the next task, so fast devices are not held up by slow
+    ones. A device whose tasks keep raising (e.g. it was unplugged) is
+    retired without stopping the others; tasks that merely do not succeed
+    (e.g. max steps reached) do not count against it.
+
+    The agents share one ModelClient, so the requests of all devices are
+    load balanced, hedged and retried together (see ModelConfig.base_urls).
+
+    Args:
+        device_ids: Devices to run tasks on (see discover_devices()).
+        model_config: Configuration for the AI model.
+        agent_config: Template for every agent; device_id is set per device.
+            Verbose output of several devices interleaves, so it defaults to
+            off.
+        device_type: ADB or HDC.
+        model_client: Client shared by all agents; built from model_config
+            if not given.
+        confirmation_callback: Passed to every agent.
+        takeover_callback: Passed to every agent.
+        max_device_failures: Tasks in a row that raised after which a device
+            is retired.
+
+    Example:
+        >>> fleet = Fleet(discover_devices(), ModelConfig())
+        >>> stats = fleet.run(["Open Settings", "Open WeChat"], on_result=print)
+        >>> stats["tasks_per_hour"]
+    """
+
+    def __init__(
+        self,
+        device_ids: list[str],
+        model_config: ModelConfig | None = None,
+        agent_config: AgentConfig | None = None,
+        device_type: DeviceType = DeviceType.ADB,
+        model_client: ModelClient | None = None,
+        confirmation_callback: Callable[[str], bool] | None = None,
+        takeover_callback: Callable[[str], None] | None = None,
+        max_device_failures: int = 3,
+    ):
+        if not device_ids:
+            raise ValueError("At least one device is required")
+        if len(set(device_ids)) != len(device_ids):
+            raise ValueError("Device IDs must be unique")
+        if device_type == DeviceType.IOS:
+            raise ValueError("Fleets of iOS devices are not supported")
+
+        self.model_config = model_config or ModelConfig()
+        self.agent_config = agent_config or AgentConfig(verbose=False)
+        self.device_type = device_type
+        self.model_client = model_client or ModelClient(self.model_config)
+        self.confirmation_callback = confirmation_callback
+        self.takeover_callback = takeover_callback
+        self.max_device_failures = max(1, max_device_failures)
+
+        self.devices = {d: DeviceStats(d) for d in device_ids}
+        self._lock = threading.Lock()
+        self._started: float | None = None
+        self._finished: float | None = None
+
+    def run(
+        self,
+        tasks: Iterable[str | tuple[str, str]],
+        on_result: Callable[[TaskResult], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run tasks until the queue is drained or every device is retired.
+
+        Tasks are pulled from the iterable as devices free up, so it can be
+        a generator over a large file.
+
+        Args:
+            tasks: Natural language tasks, or (task_id, task) pairs to tag
+                the results with.
+            on_result: Called with every TaskResult as it finishes; calls
+                are serialized.
+
+        Returns:
+            The fleet stats (see stats()).
+        """
+        # A small buffer keeps every device busy without reading ahead
+        pending: queue.Queue[Any] = queue.Queue(maxsize=len(self.devices))
+        workers = [
+            threading.Thread(
+                target=self._work,
+                args=(device_id, pending, on_result),
+                name=f"fleet-{device_id}",
+                daemon=True,
+            )
+            for device_id in self.devices
+        ]
+
+        self._started = time.monotonic()
+        self._finished = None
+        for worker in workers:
+            worker.start()
+
+        for task in tasks:
+            if not self._put(pending, task, workers):
+                print("Fleet: all devices retired, remaining tasks not run")
+                break
+        for _ in workers:
+            self._put(pending, None, workers)
+        for worker in workers:
+            worker.join()
+        self._finished = time.monotonic()
+        return self.stats()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the throughput of the fleet and the utilisation of each device.
+
+        Utilisation is the share of the run a device spent on tasks rather
+        than waiting for one (or being retired).
+
+        Returns:
+            Dict with the totals, tasks_per_hour and one dict per device.
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.monotonic()) - self._started
+
+        with self._lock:
+            devices = [
+                {
+                    "device_id": d.device_id,
+                    "tasks": d.tasks,
+                    "failures": d.failures,
+                    "busy": d.busy,
+                    "utilisation": d.busy / elapsed if elapsed else 0.0,
+                    "retired": d.retired,
+                }
+                for d in self.devices.values()
+            ]
+
+        tasks = sum(d["tasks"] for d in devices)
+        return {
+            "elapsed": elapsed,
+            "tasks": tasks,
+            "failures": sum(d["failures"] for d in devices),
+            "tasks_per_hour": tasks / elapsed * 3600 if elapsed else 0.0,
+            "utilisation": sum(d["utilisation"] for d in devices) / len(devices),
+            "devices": devices,
+        }
+
+    def _work(
+        self,
+        device_id: str,
+        pending: "queue.Queue[Any]",
+        on_result: Callable[[TaskResult], None] | None,
+    ) -> None:
+        """Worker thread of one device: run tasks until told to stop."""
+        stats = self.devices[device_id]
+        device_factory = DeviceFactory(self.device_type)
+        try:
+            agent = PhoneAgent(
+                model_config=self.model_config,
+                agent_config=replace(self.agent_config, device_id=device_id),
+                confirmation_callback=self.confirmation_callback,
+                takeover_callback=self.takeover_callback,
+                model_client=self.model_client,
+                device_factory=device_factory,
+            )
+        except Exception as e:
+            self._retire(stats, e)
+            return
+
+        failures_in_row = 0
+        try:
+            while (item := pending.get()) is not None:
+                task_id, task = item if isinstance(item, tuple) else (None, item)
+                result = self._run_task(agent, device_id, task, task_id)
+                with self._lock:
+                    stats.tasks += 1
+                    stats.busy += result.duration
+                    stats.failures += not result.success
+                    if on_result is not None:
+                        on_result(result)
+
+                failures_in_row = 0 if result.error is None else failures_in_row + 1
+                if failures_in_row >= self.max_device_failures:
+                    self._retire(stats, result.error)
+                    return
+        finally:
+            agent.close()
+
+    @staticmethod
+    def _run_task(
+        agent: PhoneAgent, device_id: str, task: str, task_id: str | None
+    ) -> TaskResult:
+        """Run one task on a device, turning exceptions into a failed result."""
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            message = agent.run(task)
+            error = None
+        except Exception as e:
+            message = ""
+            error = f"{type(e).__name__}: {e}"
+        last = agent.last_result
+        finished = last is not None and last.finished and last.success
+        return TaskResult(
+            task=task,
+            device_id=device_id,
+            success=error is None and finished,
+            message=message,
+            steps=agent.step_count,
+            started_at=started_at,
+            duration=time.perf_counter() - start,
+            timings=agent.timings,
+            error=error,
+            task_id=task_id,
+        )
+
+    def _retire(self, stats: DeviceStats, error: Any) -> None:
+        """Stop giving tasks to a failing device."""
+        with self._lock:
+            stats.retired = str(error)
+        print(f"Fleet: device {stats.device_id} retired ({error})")
+
+    @staticmethod
+    def _put(
+        pending: "queue.Queue[Any]",
+        item: Any,
+        workers: list[threading.Thread],
+    ) -> bool:
+        """Queue an item unless no worker is left to take it."""
+        while any(worker.is_alive() for worker in workers):
+            try:
+                pending.put(item, timeout=_PUT_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
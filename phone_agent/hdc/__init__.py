@@ -13,6 +13,7 @@ from phone_agent.hdc.device import (
     double_tap,
     get_current_app,
     home,
+    invalidate_current_app,
     launch_app,
     long_press,
     swipe,
@@ -24,11 +25,12 @@ from phone_agent.hdc.input import (
     restore_keyboard,
     type_text,
 )
-from phone_agent.hdc.screenshot import get_screenshot
+from phone_agent.hdc.screenshot import get_screenshot, get_settle_frame
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "get_settle_frame",
     # Input
     "type_text",
     "clear_text",
@@ -36,6 +38,7 @@ __all__ = [
     "restore_keyboard",
     # Device control
     "get_current_app",
+    "invalidate_current_app",
     "tap",
     "swipe",
     "back",
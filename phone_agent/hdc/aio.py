@@ -0,0 +1,410 @@
+"""Asyncio counterparts of the HDC device functions.
+
+Every coroutine mirrors the synchronous function of the same name in
+phone_agent.hdc and shares its command lines, parsers and current-app cache.
+"""
+
+import os
+import subprocess
+import tempfile
+import uuid
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.aio import decode, run_process
+from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.hdc import connection as _connection
+from phone_agent.hdc.device import (
+    _current_app_cache,
+    invalidate_current_app,
+    parse_current_app,
+    swipe_duration_ms,
+)
+from phone_agent.hdc.screenshot import _create_fallback_screenshot
+from phone_agent.screenshot import Screenshot
+from phone_agent.settle import wait_for_settle_async
+
+
+async def run_hdc_command(
+    cmd: list[str], timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run an HDC command with optional verbose output.
+
+    Args:
+        cmd: Command list to execute.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with text output.
+    """
+    if _connection._HDC_VERBOSE:
+        print(f"[HDC] Running command: {' '.join(cmd)}")
+
+    result = await run_process(cmd, timeout)
+    result = subprocess.CompletedProcess(
+        cmd, result.returncode, decode(result.stdout), decode(result.stderr)
+    )
+
+    if _connection._HDC_VERBOSE and result.returncode != 0:
+        print(f"[HDC] Command failed with return code {result.returncode}")
+        if result.stderr:
+            print(f"[HDC] Error: {result.stderr}")
+
+    return result
+
+
+async def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+    """
+    Capture a screenshot from the connected HarmonyOS device.
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+        timeout: Timeout in seconds for screenshot operations.
+
+    Returns:
+        Screenshot object containing the JPEG data and dimensions, or a black
+        fallback image if the capture failed.
+    """
+    temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
+    hdc_prefix = _get_hdc_prefix(device_id)
+    remote_path = "/data/local/tmp/tmp_screenshot.jpeg"
+
+    try:
+        result = await run_hdc_command(
+            hdc_prefix + ["shell", "screenshot", remote_path], timeout
+        )
+        output = (result.stdout + result.stderr).lower()
+        if "fail" in output or "error" in output or "not found" in output:
+            # Older versions or different devices
+            result = await run_hdc_command(
+                hdc_prefix + ["shell", "snapshot_display", "-f", remote_path], timeout
+            )
+            output = (result.stdout + result.stderr).lower()
+            if "fail" in output or "error" in output:
+                return _create_fallback_screenshot(is_sensitive=True)
+
+        await run_hdc_command(hdc_prefix + ["file", "recv", remote_path, temp_path], 5)
+        if not os.path.exists(temp_path):
+            return _create_fallback_screenshot(is_sensitive=False)
+
+        with open(temp_path, "rb") as f:
+            data = f.read()
+        os.remove(temp_path)
+
+        return Screenshot.from_bytes(data)
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+async def get_settle_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> Image.Image | None:
+    """
+    Capture a small grayscale frame for screen-settle detection.
+
+    Args:
+        device_id: Optional HDC device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        PIL image of the screen, or None if it could not be captured.
+    """
+    screenshot = await get_screenshot(device_id, timeout)
+    # Fallback images are black PNGs and would always look settled
+    if screenshot.is_sensitive or screenshot.mime_type != "image/jpeg":
+        return None
+
+    img = Image.open(BytesIO(screenshot.data))
+    img.draft("L", (screenshot.width // 8, screenshot.height // 8))
+    return img
+
+
+async def get_current_app(device_id: str | None = None) -> str:
+    """
+    Get the currently focused app name.
+
+    Shares its per-device cache with phone_agent.hdc.get_current_app().
+
+    Args:
+        device_id: Optional HDC device ID.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    cached = _current_app_cache.get(device_id)
+    if cached is not None:
+        return cached
+
+    app_name = await query_current_app(device_id)
+    _current_app_cache[device_id] = app_name
+    return app_name
+
+
+async def query_current_app(device_id: str | None = None) -> str:
+    """Ask the device for the foreground app with `aa dump -l`."""
+    result = await run_hdc_command(
+        _get_hdc_prefix(device_id) + ["shell", "aa", "dump", "-l"]
+    )
+    if not result.stdout:
+        raise ValueError("No output from aa dump")
+
+    return parse_current_app(result.stdout)
+
+
+async def tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """
+    Tap at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after tap. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_tap_delay
+
+    await _ui_input(device_id, "click", str(x), str(y))
+    await _after_action(delay, device_id)
+
+
+async def double_tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """
+    Double tap at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after double tap. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_double_tap_delay
+
+    await _ui_input(device_id, "doubleClick", str(x), str(y))
+    await _after_action(delay, device_id)
+
+
+async def long_press(
+    x: int,
+    y: int,
+    duration_ms: int = 3000,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """
+    Long press at the specified coordinates.
+
+    Args:
+        x: X coordinate.
+        y: Y coordinate.
+        duration_ms: Duration of press in milliseconds (longClick uses a fixed duration).
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after long press. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_long_press_delay
+
+    await _ui_input(device_id, "longClick", str(x), str(y))
+    await _after_action(delay, device_id)
+
+
+async def swipe(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration_ms: int | None = None,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """
+    Swipe from start to end coordinates.
+
+    Args:
+        start_x: Starting X coordinate.
+        start_y: Starting Y coordinate.
+        end_x: Ending X coordinate.
+        end_y: Ending Y coordinate.
+        duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after swipe. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_swipe_delay
+
+    if duration_ms is None:
+        duration_ms = swipe_duration_ms(start_x, start_y, end_x, end_y)
+
+    await _ui_input(
+        device_id,
+        "swipe",
+        str(start_x),
+        str(start_y),
+        str(end_x),
+        str(end_y),
+        str(duration_ms),
+    )
+    await _after_action(delay, device_id)
+
+
+async def back(device_id: str | None = None, delay: float | None = None) -> None:
+    """
+    Press the back button.
+
+    Args:
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after pressing back. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_back_delay
+
+    await _ui_input(device_id, "keyEvent", "Back")
+    await _after_action(delay, device_id)
+
+
+async def home(device_id: str | None = None, delay: float | None = None) -> None:
+    """
+    Press the home button.
+
+    Args:
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after pressing home. If None, uses configured default.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_home_delay
+
+    await _ui_input(device_id, "keyEvent", "Home")
+    await _after_action(delay, device_id)
+
+
+async def launch_app(
+    app_name: str, device_id: str | None = None, delay: float | None = None
+) -> bool:
+    """
+    Launch an app by name.
+
+    Args:
+        app_name: The app name (must be in APP_PACKAGES).
+        device_id: Optional HDC device ID.
+        delay: Delay in seconds after launching. If None, uses configured default.
+
+    Returns:
+        True if app was launched, False if app not found.
+    """
+    if delay is None:
+        delay = TIMING_CONFIG.device.default_launch_delay
+
+    if app_name not in APP_PACKAGES:
+        print(f"[HDC] App '{app_name}' not found in HarmonyOS app list")
+        return False
+
+    bundle = APP_PACKAGES[app_name]
+    ability = APP_ABILITIES.get(bundle, "EntryAbility")
+
+    await run_hdc_command(
+        _get_hdc_prefix(device_id)
+        + ["shell", "aa", "start", "-b", bundle, "-a", ability]
+    )
+    await _after_action(delay, device_id)
+    return True
+
+
+async def type_text(text: str, device_id: str | None = None) -> None:
+    """
+    Type text into the currently focused input field.
+
+    Args:
+        text: The text to type. Newlines are sent as ENTER key events.
+        device_id: Optional HDC device ID.
+    """
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line or len(lines) == 1:
+            escaped = line.replace('"', '\\"').replace("$", "\\$")
+            await _ui_input(device_id, "text", escaped)
+
+        # ENTER (key code 2054) after each line except the last one
+        if i < len(lines) - 1:
+            try:
+                await _ui_input(device_id, "keyEvent", "2054")
+            except Exception as e:
+                print(f"[HDC] ENTER keyEvent failed: {e}")
+
+
+async def clear_text(device_id: str | None = None) -> None:
+    """
+    Clear text in the currently focused input field.
+
+    Args:
+        device_id: Optional HDC device ID.
+    """
+    # Ctrl+A to select all (key code 2072 for Ctrl, 2017 for A), then delete
+    await _ui_input(device_id, "keyEvent", "2072", "2017")
+    await _ui_input(device_id, "keyEvent", "2055")
+
+
+async def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
+    """
+    Get the current keyboard IME for later restoration.
+
+    Args:
+        device_id: Optional HDC device ID.
+
+    Returns:
+        The original keyboard IME identifier, or "" if unavailable.
+    """
+    try:
+        result = await run_hdc_command(
+            _get_hdc_prefix(device_id)
+            + ["shell", "settings", "get", "secure", "default_input_method"]
+        )
+        return (result.stdout + result.stderr).strip()
+    except Exception:
+        return ""
+
+
+async def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """
+    Restore the original keyboard IME.
+
+    Args:
+        ime: The IME identifier to restore.
+        device_id: Optional HDC device ID.
+    """
+    if not ime:
+        return
+
+    try:
+        await run_hdc_command(_get_hdc_prefix(device_id) + ["shell", "ime", "set", ime])
+    except Exception:
+        pass
+
+
+async def _ui_input(device_id: str | None, *args: str) -> None:
+    """Run `uitest uiInput` with the given arguments."""
+    await run_hdc_command(
+        _get_hdc_prefix(device_id) + ["shell", "uitest", "uiInput", *args]
+    )
+
+
+async def _after_action(delay: float, device_id: str | None) -> None:
+    """Forget the cached app and wait for the screen to settle."""
+    invalidate_current_app(device_id)
+    await wait_for_settle_async(delay, lambda: get_settle_frame(device_id))
+
+
+def _get_hdc_prefix(device_id: str | None) -> list:
+    """Get HDC command prefix with optional device specifier."""
+    if device_id:
+        return ["hdc", "-t", device_id]
+    return ["hdc"]
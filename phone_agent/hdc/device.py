@@ -1,14 +1,34 @@
 """Device control utilities for HarmonyOS automation."""
 
 import os
+import re
 import subprocess
-import time
 from typing import List, Optional, Tuple
 
 from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
 from phone_agent.hdc.connection import _run_hdc_command
-import re
+from phone_agent.hdc.screenshot import get_settle_frame
+from phone_agent.settle import wait_for_settle
+
+# Bundle name -> app name; the first name listed for a bundle wins
+_PACKAGE_TO_APP: dict[str, str] = {}
+for _app_name, _package in APP_PACKAGES.items():
+    _PACKAGE_TO_APP.setdefault(_package, _app_name)
+
+# Last detected foreground app per device, cleared by actions
+_current_app_cache: dict[str | None, str] = {}
+
+
+def invalidate_current_app(device_id: str | None = None) -> None:
+    """
+    Forget the cached foreground app of a device.
+
+    Args:
+        device_id: Optional HDC device ID.
+    """
+    _current_app_cache.pop(device_id, None)
+
 
 def get_current_app(device_id: str | None = None) -> str:
     """
@@ -19,7 +39,22 @@ def get_current_app(device_id: str | None = None) -> str:
 
     Returns:
         The app name if recognized, otherwise "System Home".
+
+    Note:
+        The result is cached per device until an action that can change the
+        foreground app is performed.
     """
+    cached = _current_app_cache.get(device_id)
+    if cached is not None:
+        return cached
+
+    app_name = query_current_app(device_id)
+    _current_app_cache[device_id] = app_name
+    return app_name
+
+
+def query_current_app(device_id: str | None) -> str:
+    """Ask the device for the foreground app with `aa dump -l`."""
     hdc_prefix = _get_hdc_prefix(device_id)
 
     # Use 'aa dump -l' to list running abilities
@@ -27,13 +62,27 @@ def get_current_app(device_id: str | None = None) -> str:
         hdc_prefix + ["shell", "aa", "dump", "-l"],
         capture_output=True,
         text=True,
-        encoding="utf-8"
+        encoding="utf-8",
     )
     output = result.stdout
     # print(output)
     if not output:
         raise ValueError("No output from aa dump")
 
+    return parse_current_app(output)
+
+
+def parse_current_app(output: str) -> str:
+    """
+    Find the foreground app in `aa dump -l` output.
+
+    Args:
+        output: Output of `aa dump -l`.
+
+    Returns:
+        The app name if recognized, the bundle name for unknown apps,
+        otherwise "System Home".
+    """
     # Parse missions and find the one with FOREGROUND state
     # Output format:
     # Mission ID #139
@@ -51,7 +100,7 @@ def get_current_app(device_id: str | None = None) -> str:
     for line in lines:
         # Track the current mission's bundle name
         if "app name [" in line:
-            match = re.search(r'\[([^\]]+)\]', line)
+            match = re.search(r"\[([^\]]+)\]", line)
             if match:
                 current_bundle = match.group(1)
 
@@ -67,13 +116,13 @@ def get_current_app(device_id: str | None = None) -> str:
 
     # Match against known apps
     if foreground_bundle:
-        for app_name, package in APP_PACKAGES.items():
-            if package == foreground_bundle:
-                return app_name
+        app_name = _PACKAGE_TO_APP.get(foreground_bundle)
+        if app_name is not None:
+            return app_name
         # If bundle is found but not in our known apps, return the bundle name
-        print(f'Bundle is found but not in our known apps: {foreground_bundle}')
+        print(f"Bundle is found but not in our known apps: {foreground_bundle}")
         return foreground_bundle
-    print(f'No bundle is found')
+    print(f"No bundle is found")
     return "System Home"
 
 
@@ -97,9 +146,10 @@ def tap(
     # HarmonyOS uses uitest uiInput click
     _run_hdc_command(
         hdc_prefix + ["shell", "uitest", "uiInput", "click", str(x), str(y)],
-        capture_output=True
+        capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def double_tap(
@@ -122,9 +172,10 @@ def double_tap(
     # HarmonyOS uses uitest uiInput doubleClick
     _run_hdc_command(
         hdc_prefix + ["shell", "uitest", "uiInput", "doubleClick", str(x), str(y)],
-        capture_output=True
+        capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def long_press(
@@ -155,7 +206,8 @@ def long_press(
         hdc_prefix + ["shell", "uitest", "uiInput", "longClick", str(x), str(y)],
         capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def swipe(
@@ -185,10 +237,7 @@ def swipe(
     hdc_prefix = _get_hdc_prefix(device_id)
 
     if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
+        duration_ms = swipe_duration_ms(start_x, start_y, end_x, end_y)
 
     # HarmonyOS uses uitest uiInput swipe
     # Format: swipe startX startY endX endY duration
@@ -207,7 +256,15 @@ def swipe(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
+
+
+def swipe_duration_ms(start_x: int, start_y: int, end_x: int, end_y: int) -> int:
+    """Default swipe duration in milliseconds, based on the swipe distance."""
+    dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+    duration_ms = int(dist_sq / 1000)
+    return max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -226,9 +283,10 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
     # HarmonyOS uses uitest uiInput keyEvent Back
     _run_hdc_command(
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Back"],
-        capture_output=True
+        capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -247,9 +305,10 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
     # HarmonyOS uses uitest uiInput keyEvent Home
     _run_hdc_command(
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Home"],
-        capture_output=True
+        capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
 
 
 def launch_app(
@@ -296,7 +355,8 @@ def launch_app(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    invalidate_current_app(device_id)
+    _wait_for_settle(delay, device_id)
     return True
 
 
@@ -306,5 +366,11 @@ def _get_hdc_prefix(device_id: str | None) -> list:
         return ["hdc", "-t", device_id]
     return ["hdc"]
 
+
+def _wait_for_settle(delay: float, device_id: str | None) -> None:
+    """Wait after an action, adaptively if screen-settle detection is enabled."""
+    wait_for_settle(delay, lambda: get_settle_frame(device_id))
+
+
 if __name__ == "__main__":
     print(get_current_app())
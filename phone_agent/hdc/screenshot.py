@@ -1,26 +1,16 @@
 """Screenshot utilities for capturing HarmonyOS device screen."""
 
-import base64
 import os
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 from typing import Tuple
 
 from PIL import Image
-from phone_agent.hdc.connection import _run_hdc_command
-
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.screenshot import Screenshot
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -32,7 +22,7 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         timeout: Timeout in seconds for screenshot operations.
 
     Returns:
-        Screenshot object containing base64 data and dimensions.
+        Screenshot object containing the JPEG data and dimensions.
 
     Note:
         If the screenshot fails (e.g., on sensitive screens like payment pages),
@@ -80,27 +70,47 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         if not os.path.exists(temp_path):
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read JPEG image and convert to PNG for model inference
-        # PIL automatically detects the image format from file content
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Pass the device JPEG through as-is; transcoding to PNG only makes
+        # the upload several times larger
+        with open(temp_path, "rb") as f:
+            data = f.read()
 
         # Cleanup
         os.remove(temp_path)
 
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+        return Screenshot.from_bytes(data)
 
     except Exception as e:
         print(f"Screenshot error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def get_settle_frame(
+    device_id: str | None = None, timeout: int = 5
+) -> Image.Image | None:
+    """
+    Capture a small grayscale frame for screen-settle detection.
+
+    HDC has no uncompressed capture path, so the device JPEG is decoded at a
+    reduced scale using the decoder's draft mode.
+
+    Args:
+        device_id: Optional HDC device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        PIL image of the screen, or None if it could not be captured.
+    """
+    screenshot = get_screenshot(device_id, timeout)
+    # Fallback images are black PNGs and would always look settled
+    if screenshot.is_sensitive or screenshot.mime_type != "image/jpeg":
+        return None
+
+    img = Image.open(BytesIO(screenshot.data))
+    img.draft("L", (screenshot.width // 8, screenshot.height // 8))
+    return img
+
+
 def _get_hdc_prefix(device_id: str | None) -> list:
     """Get HDC command prefix with optional device specifier."""
     if device_id:
@@ -112,14 +122,4 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
     default_width, default_height = 1080, 2400
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return Screenshot.blank(default_width, default_height, is_sensitive)
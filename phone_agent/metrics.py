@@ -0,0 +1,362 @@
+"""
+Metrics registry with a pull API and a Prometheus text endpoint.
+
+The agent, model client and device layers update the metrics of the global
+registry as they run; read them with get_registry().collect(), or serve
+them to a Prometheus scraper with start_metrics_server().
+
+Example:
+    >>> from phone_agent.metrics import get_registry, start_metrics_server
+    >>> start_metrics_server(9464)  # GET http://127.0.0.1:9464/metrics
+    >>> get_registry().collect()["phone_agent_steps_total"]
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# Latency buckets (seconds), from a fast device command to a long model call
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    """A named metric with one value per combination of label values."""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Export a zero before the first update, so rate() sees the start
+            self._values[()] = self._zero()
+
+    def _zero(self) -> Any:
+        """Initial value for a new label set."""
+        return 0.0
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        """Label values in labelnames order."""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. steps run."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add to the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Current values with their labels."""
+        with self._lock:
+            return [
+                {"labels": self._labels(key), "value": value}
+                for key, value in self._values.items()
+            ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. agents running a task."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Subtract from the gauge."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values, e.g. latencies, in cumulative buckets.
+
+    Args:
+        name: Metric name.
+        help: Description.
+        labelnames: Label names.
+        buckets: Upper bounds of the buckets; +Inf is added.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _zero(self) -> list:
+        # Per-bucket counts (the last one is +Inf), sum, count
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record a value."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._zero()
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Current count, sum and cumulative bucket counts with their labels."""
+        with self._lock:
+            states = [(key, list(s[0]), s[1], s[2]) for key, s in self._values.items()]
+
+        samples = []
+        for key, counts, total, count in states:
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                buckets[bound] = cumulative
+            samples.append(
+                {
+                    "labels": self._labels(key),
+                    "count": count,
+                    "sum": total,
+                    "buckets": buckets,
+                }
+            )
+        return samples
+
+
+class MetricsRegistry:
+    """Holds metrics by name; thread-safe."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already a {metric.type}")
+            return metric
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        """
+        Get the current value of every metric (the pull API).
+
+        Returns:
+            Dict of metric name to its type, help and samples. Counter and
+            gauge samples have "labels" and "value"; histogram samples have
+            "labels", "count", "sum" and cumulative "buckets" (upper bound
+            to count).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            m.name: {"type": m.type, "help": m.help, "samples": m.samples()}
+            for m in metrics
+        }
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text.
+        """
+        lines = []
+        for name, metric in self.collect().items():
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for sample in metric["samples"]:
+                labels = sample["labels"]
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(sample['value'])}")
+                    continue
+                for bound, count in sample["buckets"].items():
+                    le = {**labels, "le": _number(bound)}
+                    lines.append(f"{name}_bucket{_labels(le)} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(sample['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    """Format a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Format a label set, e.g. {action="Tap"}."""
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics."""
+
+    registry: MetricsRegistry
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Scrapes every few seconds would flood the agent output
+
+
+def start_metrics_server(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry | None = None
+) -> ThreadingHTTPServer:
+    """
+    Serve the metrics at http://host:port/metrics on a daemon thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one).
+        host: Interface to bind; local only by default.
+        registry: Registry to serve (default: the global one).
+
+    Returns:
+        The server; call shutdown() to stop it.
+    """
+    handler = type(
+        "MetricsHandler", (_MetricsHandler,), {"registry": registry or _registry}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Global registry instance
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Get the global metrics registry.
+
+    Returns:
+        The registry instance.
+    """
+    return _registry
+
+
+# Metrics updated by the library
+MODEL_TTFT = _registry.histogram(
+    "phone_agent_model_ttft_seconds", "Time to the first token of a model response"
+)
+MODEL_THINKING_END = _registry.histogram(
+    "phone_agent_model_thinking_end_seconds",
+    "Time until the model finished thinking and started the action",
+)
+MODEL_INFERENCE = _registry.histogram(
+    "phone_agent_model_inference_seconds", "Total time of a model request"
+)
+SCREENSHOT_LATENCY = _registry.histogram(
+    "phone_agent_screenshot_seconds", "Time to capture a screenshot"
+)
+ACTION_LATENCY = _registry.histogram(
+    "phone_agent_action_seconds",
+    "Time to execute an action, settle wait included",
+    ("action",),
+)
+STEP_LATENCY = _registry.histogram(
+    "phone_agent_step_seconds", "Time of an agent step (observe, model, act)"
+)
+STEPS = _registry.counter("phone_agent_steps_total", "Agent steps run")
+TASKS = _registry.counter("phone_agent_tasks_total", "Tasks run")
+TASK_FAILURES = _registry.counter(
+    "phone_agent_task_failures_total",
+    "Tasks that raised, hit the step limit or finished unsuccessfully",
+)
+FALLBACK_SCREENSHOTS = _registry.counter(
+    "phone_agent_fallback_screenshots_total",
+    "Black screenshots sent instead of a capture",
+    ("reason",),
+)
+ACTIVE_AGENTS = _registry.gauge(
+    "phone_agent_active_agents", "Agents currently running a task"
+)
@@ -1,5 +1,19 @@
 """Model client module for AI inference."""
 
-from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.client import AsyncModelClient, ModelClient, ModelConfig
+from phone_agent.model.context import ContextManager
+from phone_agent.model.pool import (
+    EndpointPool,
+    ModelTimeoutError,
+    ModelUnavailableError,
+)
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = [
+    "ModelClient",
+    "AsyncModelClient",
+    "ModelConfig",
+    "ContextManager",
+    "EndpointPool",
+    "ModelTimeoutError",
+    "ModelUnavailableError",
+]
@@ -1,13 +1,32 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
+import asyncio
 import json
+import queue
+import random
+import socket
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterator
 
-from openai import OpenAI
+from openai import APIStatusError, AsyncOpenAI, OpenAI, Timeout
 
 from phone_agent.config.i18n import get_message
+from phone_agent.metrics import MODEL_INFERENCE, MODEL_THINKING_END, MODEL_TTFT
+from phone_agent.model.image import preprocess_image
+from phone_agent.model.pool import (
+    Endpoint,
+    EndpointPool,
+    ModelTimeoutError,
+    is_endpoint_failure,
+)
+from phone_agent.screenshot import Screenshot
+
+HEDGE_WINDOW = 200  # Recent times to first token the hedge delay is taken from
+HEDGE_MIN_SAMPLES = 20  # No hedging until this many have been measured
+_END = object()  # Marks the end of a stream in an attempt's chunk queue
 
 
 @dataclass
@@ -23,6 +42,45 @@ class ModelConfig:
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
     lang: str = "cn"  # Language for UI messages: 'cn' or 'en'
+    # Screenshot preprocessing before upload (defaults send the capture as-is)
+    image_max_long_edge: int | None = None  # Downscale longer side to this size
+    image_max_pixels: int | None = None  # Downscale to at most this many pixels
+    image_format: str | None = None  # 'png', 'jpeg', 'webp'; None keeps capture
+    image_quality: int = 85  # JPEG/WebP quality
+    image_grayscale: bool = False  # Send a single luminance channel
+    # Close the stream once do(...)/finish(...) is complete instead of letting
+    # the server decode whatever it would emit after it
+    stop_at_action_end: bool = True
+    # Ask for token usage in the stream to report prompt cache hits. Per-chunk
+    # usage (continuous_usage_stats) is a vLLM/SGLang extension; it is what
+    # makes usage available when the stream is closed at the action end
+    report_usage: bool = False
+    # Replicas of the model (overrides base_url). Requests are balanced across
+    # them and retried on another replica if one fails before the first token
+    base_urls: list[str] = field(default_factory=list)
+    routing: str = "least_outstanding"  # 'least_outstanding' or 'ewma'
+    health_check_interval: float | None = None  # Seconds; None disables probes
+    # Timeouts in seconds (None for no limit). A timed-out stream counts as a
+    # failure of its endpoint and is retried
+    connect_timeout: float | None = 10.0
+    first_token_timeout: float | None = 120.0  # Includes queueing and prefill
+    inter_token_timeout: float | None = 30.0
+    total_timeout: float | None = 300.0  # Whole request, retries included
+    # Retries of requests that failed with a connection error, a timeout, 429
+    # or 5xx, after a random backoff of up to retry_backoff * 2^retry seconds
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+    retry_backoff_max: float = 8.0
+    # Circuit breaker per endpoint: after breaker_threshold failures in a row
+    # it gets no traffic for eject_seconds; with every circuit open, requests
+    # fail at once with ModelUnavailableError
+    breaker_threshold: int = 3
+    eject_seconds: float = 30.0
+    # Hedging (needs several base_urls): if no token has arrived within this
+    # percentile of recent times to first token, send a duplicate request to
+    # another replica and keep whichever stream starts first. None disables
+    hedge_percentile: float | None = None
+    hedge_min_delay: float = 0.05  # Lower bound of the hedge delay (seconds)
 
 
 @dataclass
@@ -35,7 +93,17 @@ class ModelResponse:
     # Performance metrics
     time_to_first_token: float | None = None  # Time to first token (seconds)
     time_to_thinking_end: float | None = None  # Time to thinking end (seconds)
+    time_to_action_end: float | None = None  # Time to action end (seconds)
     total_time: float | None = None  # Total inference time (seconds)
+    stopped_early: bool = False  # Stream closed at the end of the action
+    # Token usage, if the server reported it (see ModelConfig.report_usage)
+    prompt_tokens: int | None = None
+    cached_tokens: int | None = None  # Prompt tokens served from prefix cache
+    completion_tokens: int | None = None
+    endpoint: str | None = None  # Base URL of the replica that answered
+    attempts: int = 1  # Replicas tried, including the one that answered
+    hedged: bool = False  # A duplicate request was sent
+    hedge_won: bool = False  # The duplicate produced the first token
 
 
 class ModelClient:
@@ -48,104 +116,536 @@ class ModelClient:
 
     def __init__(self, config: ModelConfig | None = None):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+        self.pool = EndpointPool(
+            self.config.base_urls or [self.config.base_url],
+            self._create_client,
+            routing=self.config.routing,
+            eject_seconds=self.config.eject_seconds,
+            breaker_threshold=self.config.breaker_threshold,
+        )
+        self.client = self.pool.endpoints[0].client
+        if len(self.pool) > 1 and self.config.health_check_interval:
+            self.pool.start_health_checks(self.config.health_check_interval)
+        # Recent times to first token (hedge delay) and hedging counters
+        self._ttfts: deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def _create_client(self, base_url: str) -> Any:
+        """Create the OpenAI API client of one endpoint."""
+        # Retries are done by request(), across endpoints and with backoff
+        return OpenAI(base_url=base_url, api_key=self.config.api_key, max_retries=0)
+
+    def prepare_image(self, screenshot: Screenshot) -> Screenshot:
+        """
+        Apply the configured image preprocessing to a screenshot.
+
+        Args:
+            screenshot: Captured screenshot.
+
+        Returns:
+            Screenshot to upload. Keep using the captured one for coordinates.
+        """
+        return preprocess_image(
+            screenshot,
+            max_long_edge=self.config.image_max_long_edge,
+            max_pixels=self.config.image_max_pixels,
+            image_format=self.config.image_format,
+            quality=self.config.image_quality,
+            grayscale=self.config.image_grayscale,
+        )
 
-    def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+    def request(
+        self, messages: list[dict[str, Any]], echo: bool = True
+    ) -> ModelResponse:
         """
         Send a request to the model.
 
         Args:
             messages: List of message dictionaries in OpenAI format.
+            echo: Whether to print the thinking and metrics. Turn off when
+                several agents stream at once.
 
         Returns:
             ModelResponse containing thinking and action.
 
         Raises:
             ValueError: If the response cannot be parsed.
+            ModelTimeoutError: If the last attempt timed out.
+            ModelUnavailableError: If every endpoint's circuit is open.
+        """
+        deadline = self._deadline()
+        attempts = 0
+        retry = 0
+        while True:
+            splitter = _StreamSplitter(echo)
+            tried: set[str] = set()
+            try:
+                winner, hedge = self._race(messages, splitter, tried, deadline)
+                self._consume(winner, splitter, deadline)
+            except Exception as e:
+                attempts += len(tried)
+                if splitter.echo and splitter.time_to_first_token is not None:
+                    print()  # End the partly printed thinking
+                delay = self._retry_delay(e, retry, deadline)
+                if delay is None:
+                    raise
+                retry += 1
+                time.sleep(delay)
+                continue
+            attempts += len(tried)
+            return self._finish(
+                splitter,
+                winner.endpoint,
+                attempts,
+                hedged=hedge is not None,
+                hedge_won=winner is hedge,
+            )
+
+    def _race(
+        self,
+        messages: list[dict[str, Any]],
+        splitter: "_StreamSplitter",
+        tried: set[str],
+        deadline: float | None,
+    ) -> tuple["_Attempt", "_Attempt | None"]:
+        """
+        Start a request and wait for its first token.
+
+        Each attempt reads its stream on a worker thread. If no token has
+        arrived after the hedge delay, a duplicate goes to another healthy
+        endpoint; an attempt that fails fails over to an endpoint not tried
+        yet. The first attempt to produce a token wins and the others are
+        closed, which aborts their generation.
+
+        Args:
+            messages: Messages to send.
+            splitter: Stream state of the request; its start is the start of
+                the first-token timeout and the hedge delay.
+            tried: Base URLs tried so far; updated.
+            deadline: time.time() by which the whole request must finish.
+
+        Returns:
+            Tuple of (winning attempt, hedge attempt or None).
+        """
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            # Nothing to race: read on this thread, failing over in turn
+            return self._start_inline(messages, splitter, tried, deadline), None
+
+        events: queue.Queue = queue.Queue()
+        running: list[_Attempt] = []
+        hedge = None
+        lost_to = None  # Failure charged to the endpoints still running
+
+        def launch(healthy_only: bool = False) -> _Attempt | None:
+            endpoint = self.pool.acquire(tried, healthy_only=healthy_only)
+            if endpoint is None:
+                return None
+            tried.add(endpoint.base_url)
+            attempt = _Attempt(endpoint)
+            running.append(attempt)
+            threading.Thread(
+                target=self._read, args=(attempt, messages, events), daemon=True
+            ).start()
+            return attempt
+
+        launch()
+        try:
+            while True:
+                hedge_at = None
+                if hedge_delay is not None and len(tried) < len(self.pool):
+                    hedge_at = splitter.start_time + hedge_delay
+                timeout_at = self._first_token_deadline(splitter, deadline)
+                wake = min((t for t in (hedge_at, timeout_at) if t), default=None)
+                try:
+                    attempt, error = events.get(
+                        timeout=None if wake is None else max(0.0, wake - time.time())
+                    )
+                except queue.Empty:
+                    if hedge_at is not None and time.time() >= hedge_at:
+                        hedge_delay = None
+                        hedge = launch(healthy_only=True)
+                        continue
+                    lost_to = self._timeout_error(
+                        deadline,
+                        f"No first token within {self.config.first_token_timeout}s",
+                    )
+                    raise lost_to from None
+
+                running.remove(attempt)
+                if error is None:
+                    return attempt, hedge
+                if not self._release_failed(attempt.endpoint, error):
+                    raise error
+                if launch(healthy_only=True) is not None:
+                    print(get_message("model_endpoint_failover", self.config.lang))
+                elif not running:
+                    raise error
+        finally:
+            for loser in running:
+                loser.cancel()
+                self.pool.release(loser.endpoint, error=lost_to)
+
+    def _read(
+        self, attempt: "_Attempt", messages: list[dict[str, Any]], events: queue.Queue
+    ) -> None:
+        """Read an attempt's stream into its chunk queue (worker thread)."""
+        stream = None
+        try:
+            stream = attempt.endpoint.client.chat.completions.create(
+                messages=messages, stream=True, **self._request_params()
+            )
+            if not attempt.attach(stream):
+                return
+            for chunk in stream:
+                if attempt.cancelled:
+                    break
+                attempt.chunks.put(chunk)
+                if attempt.first_token(chunk):
+                    events.put((attempt, None))
+            attempt.chunks.put(_END)
+            if attempt.ttft is None:
+                events.put((attempt, None))
+        except Exception as e:
+            attempt.chunks.put(e)
+            if attempt.ttft is None:
+                events.put((attempt, e))
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def _start_inline(
+        self,
+        messages: list[dict[str, Any]],
+        splitter: "_StreamSplitter",
+        tried: set[str],
+        deadline: float | None,
+    ) -> "_Attempt":
+        """
+        Open a stream on this thread and read it up to the first token.
+
+        Used when there is no hedging, e.g. with a single endpoint. An
+        endpoint that fails before the first token fails over to one not
+        tried yet, like in _race().
+
+        Returns:
+            The attempt; _consume() reads the rest of its stream.
+        """
+        error: Exception | None = None
+        while True:
+            endpoint = self.pool.acquire(tried, healthy_only=error is not None)
+            if endpoint is None:
+                raise error
+            if error is not None:
+                print(get_message("model_endpoint_failover", self.config.lang))
+            tried.add(endpoint.base_url)
+            attempt = _Attempt(endpoint)
+            try:
+                self._read_first_token(attempt, messages, splitter, deadline)
+                return attempt
+            except Exception as e:
+                if attempt.stream is not None:
+                    attempt.stream.close()
+                failure = self._release_failed(endpoint, e)
+                if not failure or isinstance(e, ModelTimeoutError):
+                    raise
+                error = e
+
+    def _read_first_token(
+        self,
+        attempt: "_Attempt",
+        messages: list[dict[str, Any]],
+        splitter: "_StreamSplitter",
+        deadline: float | None,
+    ) -> None:
+        """Open an attempt's stream and queue its chunks up to the first token."""
+        _watchdog.arm(attempt, self._first_token_deadline(splitter, deadline))
+        try:
+            stream = attempt.endpoint.client.chat.completions.create(
+                messages=messages, stream=True, **self._request_params()
+            )
+            if not attempt.attach(stream):
+                raise ConnectionError("Stream opened after the first-token timeout")
+            attempt.iterator = iter(stream)
+            for chunk in attempt.iterator:
+                attempt.chunks.put(chunk)
+                if attempt.first_token(chunk):
+                    return
+            attempt.chunks.put(_END)
+        except Exception:
+            if attempt.cancelled:
+                raise self._timeout_error(
+                    deadline,
+                    f"No first token within {self.config.first_token_timeout}s",
+                ) from None
+            raise
+        finally:
+            _watchdog.arm(attempt, None)
+
+    def _next_chunk(self, attempt: "_Attempt", deadline: float | None) -> Any:
+        """Wait for the next item of a stream: a chunk, _END or an exception."""
+        wait = self._chunk_wait(deadline)
+        if attempt.iterator is None or not attempt.chunks.empty():
+            try:
+                return attempt.chunks.get(timeout=wait)
+            except queue.Empty:
+                raise self._timeout_error(
+                    deadline, f"No token for {self.config.inter_token_timeout}s"
+                ) from None
+
+        # Read on this thread; the watchdog aborts a read that blocks too long
+        _watchdog.arm(attempt, None if wait is None else time.time() + wait)
+        try:
+            return next(attempt.iterator, _END)
+        except Exception:
+            if attempt.cancelled:
+                raise self._timeout_error(
+                    deadline, f"No token for {self.config.inter_token_timeout}s"
+                ) from None
+            raise
+
+    def _consume(
+        self, attempt: "_Attempt", splitter: "_StreamSplitter", deadline: float | None
+    ) -> None:
+        """Feed the winning attempt's stream to the splitter, with timeouts."""
+        completed = False  # Read to the end
+        try:
+            while True:
+                item = self._next_chunk(attempt, deadline)
+                if item is _END:
+                    completed = True
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if self._feed(item, splitter):
+                    break
+        except Exception as e:
+            self._release_failed(attempt.endpoint, e)
+            raise
+        finally:
+            _watchdog.arm(attempt, None)
+            if not completed:
+                # Closing the connection aborts the generation server-side
+                attempt.cancel()
+            elif attempt.iterator is not None:
+                # Read to the end: the connection goes back to the pool
+                attempt.stream.close()
+        self.pool.release(attempt.endpoint, ttft=attempt.ttft, completed=True)
+
+    def _feed(self, chunk: Any, splitter: "_StreamSplitter") -> bool:
+        """Feed one stream chunk to the splitter; True once the stream can close."""
+        if chunk.usage is not None:
+            splitter.usage = chunk.usage
+        if len(chunk.choices) == 0:
+            return False
+        if chunk.choices[0].delta.content is not None:
+            splitter.feed(chunk.choices[0].delta.content)
+            if splitter.action_complete and self.config.stop_at_action_end:
+                splitter.stop()
+                return True
+        return False
+
+    def _release_failed(self, endpoint: Endpoint, error: Exception) -> bool:
+        """Release an endpoint after an error; True if it was the endpoint's fault."""
+        failure = is_endpoint_failure(error)
+        if failure:
+            self.pool.release(endpoint, error=error)
+        else:
+            # A client error (4xx) still means the endpoint answered
+            self.pool.release(endpoint, completed=isinstance(error, APIStatusError))
+        return failure
+
+    def _retry_delay(
+        self, error: Exception, retry: int, deadline: float | None
+    ) -> float | None:
+        """
+        Decide whether to retry a failed request.
+
+        Args:
+            error: The exception raised by the last attempt.
+            retry: Retries done so far.
+            deadline: time.time() by which the whole request must finish.
+
+        Returns:
+            Seconds to wait before retrying, or None to give up.
         """
-        # Start timing
-        start_time = time.time()
-        time_to_first_token = None
-        time_to_thinking_end = None
-
-        stream = self.client.chat.completions.create(
-            messages=messages,
-            model=self.config.model_name,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature,
-            top_p=self.config.top_p,
-            frequency_penalty=self.config.frequency_penalty,
-            extra_body=self.config.extra_body,
-            stream=True,
+        if not is_endpoint_failure(error) or retry >= self.config.max_retries:
+            return None
+        # Full jitter: clients retrying after the same outage do not line up
+        backoff = min(
+            self.config.retry_backoff_max, self.config.retry_backoff * 2**retry
+        )
+        delay = random.uniform(0, backoff)
+        if deadline is not None and time.time() + delay >= deadline:
+            return None
+        print(
+            f"{get_message('model_retry', self.config.lang)} "
+            f"({retry + 1}/{self.config.max_retries}, {delay:.1f}s): {error}"
         )
+        return delay
 
-        raw_content = ""
-        buffer = ""  # Buffer to hold content that might be part of a marker
-        action_markers = ["finish(message=", "do(action="]
-        in_action_phase = False  # Track if we've entered the action phase
-        first_token_received = False
+    def _deadline(self) -> float | None:
+        """time.time() by which a request starting now must finish."""
+        if self.config.total_timeout is None:
+            return None
+        return time.time() + self.config.total_timeout
 
-        for chunk in stream:
-            if len(chunk.choices) == 0:
-                continue
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                raw_content += content
-
-                # Record time to first token
-                if not first_token_received:
-                    time_to_first_token = time.time() - start_time
-                    first_token_received = True
-
-                if in_action_phase:
-                    # Already in action phase, just accumulate content without printing
-                    continue
-
-                buffer += content
-
-                # Check if any marker is fully present in buffer
-                marker_found = False
-                for marker in action_markers:
-                    if marker in buffer:
-                        # Marker found, print everything before it
-                        thinking_part = buffer.split(marker, 1)[0]
-                        print(thinking_part, end="", flush=True)
-                        print()  # Print newline after thinking is complete
-                        in_action_phase = True
-                        marker_found = True
-
-                        # Record time to thinking end
-                        if time_to_thinking_end is None:
-                            time_to_thinking_end = time.time() - start_time
-
-                        break
-
-                if marker_found:
-                    continue  # Continue to collect remaining content
-
-                # Check if buffer ends with a prefix of any marker
-                # If so, don't print yet (wait for more content)
-                is_potential_marker = False
-                for marker in action_markers:
-                    for i in range(1, len(marker)):
-                        if buffer.endswith(marker[:i]):
-                            is_potential_marker = True
-                            break
-                    if is_potential_marker:
-                        break
-
-                if not is_potential_marker:
-                    # Safe to print the buffer
-                    print(buffer, end="", flush=True)
-                    buffer = ""
+    def _first_token_deadline(
+        self, splitter: "_StreamSplitter", deadline: float | None
+    ) -> float | None:
+        """time.time() by which an attempt's first token must have arrived."""
+        if self.config.first_token_timeout is None:
+            return deadline
+        first_token = splitter.start_time + self.config.first_token_timeout
+        return first_token if deadline is None else min(first_token, deadline)
+
+    def _chunk_wait(self, deadline: float | None) -> float | None:
+        """Seconds to wait for the next chunk of a stream."""
+        waits = [self.config.inter_token_timeout]
+        if deadline is not None:
+            waits.append(max(0.0, deadline - time.time()))
+        return min((w for w in waits if w is not None), default=None)
+
+    def _timeout_error(self, deadline: float | None, message: str) -> ModelTimeoutError:
+        """The error for a stream that timed out, blaming the total timeout if due."""
+        if deadline is not None and time.time() >= deadline:
+            message = f"Model request exceeded {self.config.total_timeout}s"
+        return ModelTimeoutError(message)
 
+    def _request_params(self) -> dict[str, Any]:
+        """Sampling parameters sent with every request."""
+        params = {
+            "model": self.config.model_name,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "top_p": self.config.top_p,
+            "frequency_penalty": self.config.frequency_penalty,
+            "extra_body": self.config.extra_body,
+            # Bounds each socket read; first-token and inter-token timeouts
+            # are enforced separately, while reading the chunk queue
+            "timeout": Timeout(
+                None,
+                connect=self.config.connect_timeout,
+                read=self._read_timeout(),
+            ),
+        }
+        if self.config.report_usage:
+            params["stream_options"] = {
+                "include_usage": True,
+                "continuous_usage_stats": True,
+            }
+        return params
+
+    def _read_timeout(self) -> float | None:
+        """Socket read timeout: the longest a stream may legitimately be silent."""
+        first, inter = self.config.first_token_timeout, self.config.inter_token_timeout
+        if first is None or inter is None:
+            return self.config.total_timeout
+        return max(first, inter)
+
+    def _hedge_delay(self) -> float | None:
+        """Time to wait for a first token before hedging; None to not hedge."""
+        percentile = self.config.hedge_percentile
+        if percentile is None or len(self.pool) < 2:
+            return None
+        with self._stats_lock:
+            samples = sorted(self._ttfts)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return max(self.config.hedge_min_delay, samples[index])
+
+    def hedge_stats(self) -> dict[str, Any]:
+        """
+        Get the hedging counters of this client.
+
+        Returns:
+            Dict with the requests completed, the hedged ones, the duplicates
+            that won, the hedge rate (hedged / requests) and the win rate
+            (wins / hedged).
+        """
+        with self._stats_lock:
+            requests, hedged, wins = self._requests, self._hedged, self._hedge_wins
+        return {
+            "requests": requests,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_rate": hedged / requests if requests else 0.0,
+            "win_rate": wins / hedged if hedged else 0.0,
+        }
+
+    def _finish(
+        self,
+        splitter: "_StreamSplitter",
+        endpoint: Endpoint,
+        attempts: int,
+        hedged: bool = False,
+        hedge_won: bool = False,
+    ) -> ModelResponse:
+        """Parse a completed stream and report its performance metrics."""
         # Calculate total time
-        total_time = time.time() - start_time
+        total_time = time.time() - splitter.start_time
 
         # Parse thinking and action from response
-        thinking, action = self._parse_response(raw_content)
+        thinking, action = self._parse_response(splitter.raw_content)
+
+        with self._stats_lock:
+            if splitter.time_to_first_token is not None:
+                self._ttfts.append(splitter.time_to_first_token)
+            self._requests += 1
+            self._hedged += hedged
+            self._hedge_wins += hedge_won
+
+        if splitter.time_to_first_token is not None:
+            MODEL_TTFT.observe(splitter.time_to_first_token)
+        if splitter.time_to_thinking_end is not None:
+            MODEL_THINKING_END.observe(splitter.time_to_thinking_end)
+        MODEL_INFERENCE.observe(total_time)
+
+        if splitter.echo:
+            self._print_metrics(splitter, total_time)
+            if len(self.pool) > 1:
+                print(
+                    f"{get_message('model_endpoint', self.config.lang)}: "
+                    f"{endpoint.base_url} ({attempts})"
+                )
+            if self.config.hedge_percentile is not None and len(self.pool) > 1:
+                stats = self.hedge_stats()
+                print(
+                    f"{get_message('hedging', self.config.lang)}: "
+                    f"{stats['hedged']}/{stats['requests']} ({stats['hedge_rate']:.0%}), "
+                    f"{get_message('hedge_wins', self.config.lang)}: "
+                    f"{stats['hedge_wins']} ({stats['win_rate']:.0%})"
+                )
+
+        usage = splitter.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=splitter.raw_content,
+            time_to_first_token=splitter.time_to_first_token,
+            time_to_thinking_end=splitter.time_to_thinking_end,
+            time_to_action_end=splitter.time_to_action_end,
+            total_time=total_time,
+            stopped_early=splitter.stopped_early,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            cached_tokens=getattr(details, "cached_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            endpoint=endpoint.base_url,
+            attempts=attempts,
+            hedged=hedged,
+            hedge_won=hedge_won,
+        )
 
-        # Print performance metrics
+    def _print_metrics(self, splitter: "_StreamSplitter", total_time: float) -> None:
+        """Print performance metrics of a request."""
+        time_to_first_token = splitter.time_to_first_token
+        time_to_thinking_end = splitter.time_to_thinking_end
+        time_to_action_end = splitter.time_to_action_end
         lang = self.config.lang
         print()
         print("=" * 50)
@@ -159,20 +659,31 @@ class ModelClient:
             print(
                 f"{get_message('time_to_thinking_end', lang)}:        {time_to_thinking_end:.3f}s"
             )
+        if time_to_action_end is not None:
+            print(
+                f"{get_message('time_to_action_end', lang)}:          {time_to_action_end:.3f}s"
+            )
         print(
             f"{get_message('total_inference_time', lang)}:          {total_time:.3f}s"
         )
+        if splitter.usage is not None:
+            prompt_tokens = splitter.usage.prompt_tokens
+            details = getattr(splitter.usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None)
+            line = f"{get_message('prompt_tokens', lang)}:          {prompt_tokens}"
+            if cached_tokens is not None and prompt_tokens:
+                line += f" ({get_message('prompt_cache_hits', lang)}: {cached_tokens}, {cached_tokens / prompt_tokens:.0%})"
+            print(line)
+        if splitter.stopped_early:
+            print(get_message("generation_stopped_early", lang))
+        elif time_to_action_end is not None:
+            # What stopping at the action end would have saved
+            print(
+                f"{get_message('generation_after_action', lang)}:       "
+                f"{total_time - time_to_action_end:.3f}s"
+            )
         print("=" * 50)
 
-        return ModelResponse(
-            thinking=thinking,
-            action=action,
-            raw_content=raw_content,
-            time_to_first_token=time_to_first_token,
-            time_to_thinking_end=time_to_thinking_end,
-            total_time=total_time,
-        )
-
     def _parse_response(self, content: str) -> tuple[str, str]:
         """
         Parse the model response into thinking and action parts.
@@ -216,6 +727,492 @@ class ModelClient:
         return "", content
 
 
+class AsyncModelClient(ModelClient):
+    """
+    Asyncio client for OpenAI-compatible vision-language models.
+
+    Same configuration, streaming thinking/action split and metrics as
+    ModelClient, but request() is a coroutine, so an event loop can overlap
+    the generation with device work and serve many agents at once. Share one
+    client between agents to share its connection pool and concurrency limit.
+
+    Args:
+        config: Model configuration.
+        max_concurrency: Maximum number of requests in flight at once; extra
+            requests wait for a slot. None for no limit.
+    """
+
+    def __init__(
+        self, config: ModelConfig | None = None, max_concurrency: int | None = None
+    ):
+        super().__init__(config)
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self._readers: set[asyncio.Task] = set()  # Keeps reader tasks alive
+
+    def _create_client(self, base_url: str) -> Any:
+        """Create the async OpenAI API client of one endpoint."""
+        return AsyncOpenAI(
+            base_url=base_url, api_key=self.config.api_key, max_retries=0
+        )
+
+    async def request(
+        self, messages: list[dict[str, Any]], echo: bool = True
+    ) -> ModelResponse:
+        """
+        Send a request to the model.
+
+        Args:
+            messages: List of message dictionaries in OpenAI format.
+            echo: Whether to print the thinking and metrics. Turn off when
+                several agents stream at once.
+
+        Returns:
+            ModelResponse containing thinking and action. Timings start once
+            the request holds a concurrency slot.
+
+        Raises:
+            ValueError: If the response cannot be parsed.
+        """
+        if self._semaphore is None:
+            return await self._request(messages, echo)
+        async with self._semaphore:
+            return await self._request(messages, echo)
+
+    async def _request(
+        self, messages: list[dict[str, Any]], echo: bool
+    ) -> ModelResponse:
+        """Send a request, retrying and failing over between endpoints."""
+        deadline = self._deadline()
+        attempts = 0
+        retry = 0
+        while True:
+            splitter = _StreamSplitter(echo)
+            tried: set[str] = set()
+            try:
+                winner, hedge = await self._race(messages, splitter, tried, deadline)
+                await self._consume(winner, splitter, deadline)
+            except Exception as e:
+                attempts += len(tried)
+                if splitter.echo and splitter.time_to_first_token is not None:
+                    print()  # End the partly printed thinking
+                delay = self._retry_delay(e, retry, deadline)
+                if delay is None:
+                    raise
+                retry += 1
+                await asyncio.sleep(delay)
+                continue
+            attempts += len(tried)
+            return self._finish(
+                splitter,
+                winner.endpoint,
+                attempts,
+                hedged=hedge is not None,
+                hedge_won=winner is hedge,
+            )
+
+    async def _race(
+        self,
+        messages: list[dict[str, Any]],
+        splitter: "_StreamSplitter",
+        tried: set[str],
+        deadline: float | None,
+    ) -> tuple["_Attempt", "_Attempt | None"]:
+        """Start a request and wait for its first token (see ModelClient)."""
+        hedge_delay = self._hedge_delay()
+        events: asyncio.Queue = asyncio.Queue()
+        running: list[_Attempt] = []
+        hedge = None
+        lost_to = None
+
+        def launch(healthy_only: bool = False) -> _Attempt | None:
+            endpoint = self.pool.acquire(tried, healthy_only=healthy_only)
+            if endpoint is None:
+                return None
+            tried.add(endpoint.base_url)
+            attempt = _Attempt(endpoint, asyncio.Queue())
+            running.append(attempt)
+            attempt.task = asyncio.create_task(self._read(attempt, messages, events))
+            self._readers.add(attempt.task)
+            attempt.task.add_done_callback(self._readers.discard)
+            return attempt
+
+        launch()
+        try:
+            while True:
+                hedge_at = None
+                if hedge_delay is not None and len(tried) < len(self.pool):
+                    hedge_at = splitter.start_time + hedge_delay
+                timeout_at = self._first_token_deadline(splitter, deadline)
+                wake = min((t for t in (hedge_at, timeout_at) if t), default=None)
+                try:
+                    attempt, error = await asyncio.wait_for(
+                        events.get(),
+                        None if wake is None else max(0.0, wake - time.time()),
+                    )
+                except asyncio.TimeoutError:
+                    if hedge_at is not None and time.time() >= hedge_at:
+                        hedge_delay = None
+                        hedge = launch(healthy_only=True)
+                        continue
+                    lost_to = self._timeout_error(
+                        deadline,
+                        f"No first token within {self.config.first_token_timeout}s",
+                    )
+                    raise lost_to from None
+
+                running.remove(attempt)
+                if error is None:
+                    return attempt, hedge
+                if not self._release_failed(attempt.endpoint, error):
+                    raise error
+                if launch(healthy_only=True) is not None:
+                    print(get_message("model_endpoint_failover", self.config.lang))
+                elif not running:
+                    raise error
+        finally:
+            for loser in running:
+                loser.cancel()
+                self.pool.release(loser.endpoint, error=lost_to)
+
+    async def _read(
+        self,
+        attempt: "_Attempt",
+        messages: list[dict[str, Any]],
+        events: asyncio.Queue,
+    ) -> None:
+        """Read an attempt's stream into its chunk queue (reader task)."""
+        stream = None
+        try:
+            stream = await attempt.endpoint.client.chat.completions.create(
+                messages=messages, stream=True, **self._request_params()
+            )
+            async for chunk in stream:
+                attempt.chunks.put_nowait(chunk)
+                if attempt.first_token(chunk):
+                    events.put_nowait((attempt, None))
+            attempt.chunks.put_nowait(_END)
+            if attempt.ttft is None:
+                events.put_nowait((attempt, None))
+        except Exception as e:
+            attempt.chunks.put_nowait(e)
+            if attempt.ttft is None:
+                events.put_nowait((attempt, e))
+        finally:
+            # Also on cancellation: closing the stream aborts the generation
+            if stream is not None:
+                await stream.close()
+
+    async def _consume(
+        self, attempt: "_Attempt", splitter: "_StreamSplitter", deadline: float | None
+    ) -> None:
+        """Feed the winning attempt's stream to the splitter, with timeouts."""
+        completed = False  # Read to the end
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        attempt.chunks.get(), self._chunk_wait(deadline)
+                    )
+                except asyncio.TimeoutError:
+                    raise self._timeout_error(
+                        deadline, f"No token for {self.config.inter_token_timeout}s"
+                    ) from None
+                if item is _END:
+                    completed = True
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if self._feed(item, splitter):
+                    break
+        except Exception as e:
+            self._release_failed(attempt.endpoint, e)
+            raise
+        finally:
+            # A stream read to the end is closed by its reader, which keeps
+            # the connection for reuse
+            if not completed:
+                attempt.cancel()
+        self.pool.release(attempt.endpoint, ttft=attempt.ttft, completed=True)
+
+
+class _Attempt:
+    """
+    One request to one endpoint, read by a worker thread, a reader task or
+    the calling thread.
+
+    Args:
+        endpoint: Endpoint the request was sent to.
+        chunks: Queue the reader puts the stream's chunks into, then _END or
+            the exception that ended it; a queue.Queue by default.
+    """
+
+    def __init__(self, endpoint: Endpoint, chunks: Any = None):
+        self.endpoint = endpoint
+        self.chunks = chunks if chunks is not None else queue.Queue()
+        self.started = time.time()
+        self.ttft: float | None = None  # From this attempt's start
+        self.cancelled = False
+        self.task: asyncio.Task | None = None  # Reader task (async client)
+        self.stream: Any = None  # Open stream (sync client)
+        # Chunk iterator when the stream is read on the calling thread
+        self.iterator: Iterator[Any] | None = None
+        self._lock = threading.Lock()
+
+    def first_token(self, chunk: Any) -> bool:
+        """Record the time to first token; True if the chunk carries it."""
+        if self.ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            self.ttft = time.time() - self.started
+            return True
+        return False
+
+    def attach(self, stream: Any) -> bool:
+        """Keep the opened stream for cancel(); False if already cancelled."""
+        with self._lock:
+            self.stream = stream
+            return not self.cancelled
+
+    def cancel(self) -> None:
+        """
+        Stop reading and abort the request.
+
+        The sync stream is closed from the calling thread, so a reader blocked
+        on a replica that sends nothing returns at once instead of holding the
+        connection (and the server's generation) until the read timeout.
+        """
+        with self._lock:
+            self.cancelled = True
+            stream = self.stream
+        if self.task is not None:
+            self.task.cancel()
+        elif stream is not None:
+            _abort_response(stream.response)
+
+
+def _abort_response(response: Any) -> None:
+    """
+    Abort an HTTP response that another thread may be blocked reading.
+
+    Closing a socket does not wake a thread blocked in recv() on it, so the
+    connection is shut down first; the read then fails at once and the server
+    sees the disconnect.
+    """
+    network_stream = response.extensions.get("network_stream")
+    sock = network_stream.get_extra_info("socket") if network_stream else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already closed
+    try:
+        response.close()
+    except Exception:
+        pass  # The reader is closing it too
+
+
+class _Watchdog:
+    """
+    Cancels attempts whose deadline passed, from one shared thread.
+
+    A stream read on the calling thread blocks in recv() with nothing to
+    enforce the first-token and inter-token timeouts; cancelling the attempt
+    shuts its connection down, which fails the read at once. A stream whose
+    headers have not arrived yet cannot be aborted and relies on the read
+    timeout of the request.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._deadlines: dict[_Attempt, float] = {}
+        self._wake: float | None = None  # When the thread checks next
+        self._thread: threading.Thread | None = None
+
+    def arm(self, attempt: "_Attempt", deadline: float | None) -> None:
+        """Cancel an attempt at deadline (a time.time()); None disarms it."""
+        with self._cond:
+            if deadline is None:
+                self._deadlines.pop(attempt, None)
+                return
+            self._deadlines[attempt] = deadline
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            elif self._wake is None or deadline < self._wake:
+                # Deadlines mostly move later, so this rarely wakes the thread
+                self._cond.notify()
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                now = time.time()
+                for attempt, deadline in list(self._deadlines.items()):
+                    if deadline <= now:
+                        del self._deadlines[attempt]
+                        attempt.cancel()
+                self._wake = min(self._deadlines.values(), default=None)
+                self._cond.wait(None if self._wake is None else self._wake - now)
+
+
+_watchdog = _Watchdog()
+
+
+class _MarkerMatcher:
+    """
+    Finds the first of several markers in text that arrives in chunks.
+
+    The only state kept between chunks is the longest tail of the stream that
+    is a proper prefix of a marker (the state of a KMP/Aho-Corasick automaton
+    over the markers, stored as the text it stands for). Each chunk is searched
+    together with that tail, so the work is linear in the stream length.
+
+    Args:
+        markers: Strings to look for.
+    """
+
+    def __init__(self, markers: list[str]):
+        self.markers = markers
+        self._prefixes = {m[:i] for m in markers for i in range(1, len(m))}
+        self._max_prefix = max(len(m) for m in markers) - 1
+        self._pending = ""  # Tail that may be the start of a marker
+
+    def feed(self, chunk: str) -> tuple[str, str | None, str]:
+        """
+        Process one chunk.
+
+        Args:
+            chunk: Next piece of the stream.
+
+        Returns:
+            Tuple of (text, marker, rest). text is the stream up to the marker,
+            or the part that can no longer belong to one; marker is the marker
+            found, or None; rest is what followed the marker in this chunk.
+        """
+        window = self._pending + chunk
+
+        found, index = None, -1
+        for marker in self.markers:
+            i = window.find(marker)
+            if i != -1 and (index == -1 or i < index):
+                found, index = marker, i
+        if found is not None:
+            self._pending = ""
+            return window[:index], found, window[index + len(found) :]
+
+        # Hold back the longest tail that could still grow into a marker
+        for k in range(min(self._max_prefix, len(window)), 0, -1):
+            if window[-k:] in self._prefixes:
+                self._pending = window[-k:]
+                return window[:-k], None, ""
+
+        self._pending = ""
+        return window, None, ""
+
+
+class _StreamSplitter:
+    """
+    Splits streamed model output into thinking and action as it arrives.
+
+    Thinking is printed while it streams; printing stops at the first action
+    marker. From there the action is scanned for the parenthesis that closes
+    it (ignoring parentheses inside string literals), so the caller can stop
+    reading as soon as action_complete is set. Timings are measured from
+    construction.
+
+    Args:
+        echo: Whether to print the thinking as it streams.
+    """
+
+    ACTION_MARKERS = ["finish(message=", "do(action="]
+
+    def __init__(self, echo: bool = True):
+        self.echo = echo
+        self.start_time = time.time()
+        self.time_to_first_token: float | None = None
+        self.time_to_thinking_end: float | None = None
+        self.time_to_action_end: float | None = None
+        self.in_action_phase = False  # Track if we've entered the action phase
+        self.action_complete = False  # The action's closing parenthesis arrived
+        self.stopped_early = False  # The caller stopped reading, see stop()
+        self.usage: Any = None  # Latest token usage reported in the stream
+        self._matcher = _MarkerMatcher(self.ACTION_MARKERS)
+        # Deltas are joined once, when raw_content is read
+        self._chunks: list[str] = []
+        self._length = 0
+        # Action scanner state: open parentheses, open quote char, escape flag
+        self._depth = 0
+        self._quote: str | None = None
+        self._escaped = False
+        self._action_end = 0  # Index in raw_content just past the action
+
+    @property
+    def raw_content(self) -> str:
+        """Everything received so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, content: str) -> None:
+        """Process one streamed content delta."""
+        self._chunks.append(content)
+        self._length += len(content)
+
+        # Record time to first token
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.time() - self.start_time
+
+        if self.in_action_phase:
+            # Already in action phase, just accumulate content without printing
+            self._scan_action(content)
+            return
+
+        thinking_part, marker, action_part = self._matcher.feed(content)
+        self._print(thinking_part)
+
+        if marker is not None:
+            self._print("\n")  # Print newline after thinking is complete
+            self.in_action_phase = True
+
+            # Record time to thinking end
+            self.time_to_thinking_end = time.time() - self.start_time
+            self._scan_action(marker + action_part)
+
+    def _scan_action(self, text: str) -> None:
+        """Track parentheses of the action until the outermost one closes."""
+        if self.action_complete:
+            return
+
+        for i, char in enumerate(text):
+            if self._quote is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif char in "\"'":
+                self._quote = char
+            elif char == "(":
+                self._depth += 1
+            elif char == ")":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.action_complete = True
+                    self.time_to_action_end = time.time() - self.start_time
+                    # text is always the tail of raw_content
+                    self._action_end = self._length - len(text) + i + 1
+                    return
+
+    def stop(self) -> None:
+        """Mark the stream as abandoned after the action, dropping the rest."""
+        self.stopped_early = True
+        self._chunks = [self.raw_content[: self._action_end]]
+
+    def _print(self, text: str) -> None:
+        if self.echo and text:
+            print(text, end="", flush=True)
+
+
 class MessageBuilder:
     """Helper class for building conversation messages."""
 
@@ -226,27 +1223,31 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str, image_base64: str | None = None, image: Screenshot | None = None
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
 
         Args:
             text: Text content.
-            image_base64: Optional base64-encoded image.
+            image_base64: Optional base64-encoded PNG image.
+            image: Optional screenshot; its data URL (with the real MIME type)
+                is only built here, when the message needs it.
 
         Returns:
             Message dictionary.
         """
         content = []
 
-        if image_base64:
-            content.append(
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
-                }
-            )
+        if image is not None:
+            image_url = image.data_url
+        elif image_base64:
+            image_url = f"data:image/png;base64,{image_base64}"
+        else:
+            image_url = None
+
+        if image_url:
+            content.append({"type": "image_url", "image_url": {"url": image_url}})
 
         content.append({"type": "text", "text": text})
 
@@ -262,6 +1263,9 @@ class MessageBuilder:
         """
         Remove image content from a message to save context space.
 
+        The message is not modified, so a message list that was already sent
+        (and may be sent again, e.g. on retry) keeps its exact bytes.
+
         Args:
             message: Message dictionary.
 
@@ -269,9 +1273,12 @@ class MessageBuilder:
             Message with images removed.
         """
         if isinstance(message.get("content"), list):
-            message["content"] = [
-                item for item in message["content"] if item.get("type") == "text"
-            ]
+            return {
+                **message,
+                "content": [
+                    item for item in message["content"] if item.get("type") == "text"
+                ],
+            }
         return message
 
     @staticmethod
@@ -279,6 +1286,10 @@ class MessageBuilder:
         """
         Build screen info string for the model.
 
+        The output only depends on the values: current_app comes first and
+        extra keys follow in sorted order, so equal screens serialize to the
+        same bytes and keep the server's prefix cache warm.
+
         Args:
             current_app: Current app name.
             **extra_info: Additional info to include.
@@ -286,5 +1297,5 @@ class MessageBuilder:
         Returns:
             JSON string with screen info.
         """
-        info = {"current_app": current_app, **extra_info}
+        info = {"current_app": current_app, **dict(sorted(extra_info.items()))}
         return json.dumps(info, ensure_ascii=False)
@@ -0,0 +1,199 @@
+"""Token-budgeted conversation context for long agent tasks."""
+
+import json
+import re
+from typing import Any
+
+# CJK ideographs, kana, hangul and full-width forms: about one token each
+_WIDE_CHARS = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+_ANSWER = re.compile(r"<answer>(.*?)(?:</answer>|$)", re.DOTALL)
+
+# Per-message overhead of chat templates (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text without a tokenizer.
+
+    CJK characters count as one token each, other text as one token per four
+    characters. Good enough to keep a prompt within a budget.
+
+    Args:
+        text: Text to measure.
+
+    Returns:
+        Estimated token count.
+    """
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def estimate_message_tokens(message: dict[str, Any], image_tokens: int = 1000) -> int:
+    """
+    Estimate the number of tokens of one chat message.
+
+    Args:
+        message: Message dictionary in OpenAI format.
+        image_tokens: Tokens counted for each image.
+
+    Returns:
+        Estimated token count.
+    """
+    content = message.get("content")
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    if isinstance(content, str):
+        return tokens + estimate_tokens(content)
+
+    for item in content or []:
+        if item.get("type") == "text":
+            tokens += estimate_tokens(item.get("text", ""))
+        elif item.get("type") == "image_url":
+            tokens += image_tokens
+    return tokens
+
+
+class ContextManager:
+    """
+    Keeps the prompt of a long task within a token budget.
+
+    The agent context is [system, task, assistant, user, assistant, ...,
+    user]. The system prompt, the task message and the last keep_turns
+    user/assistant turns are always sent verbatim. When the prompt exceeds
+    max_tokens, the oldest remaining turns are folded into one compact
+    assistant message listing the app and action of each step; if that is
+    still too large, its oldest lines are dropped.
+
+    Folding goes down to fold_to of the budget and is then kept as is until
+    the budget is exceeded again. In between, every request extends the
+    previous one, which keeps the server's prefix cache effective.
+
+    The full history stays with the agent; fit() only builds what is sent.
+    Use one ContextManager per agent; a shorter context starts a new task.
+
+    Args:
+        max_tokens: Token budget of the prompt. None sends everything.
+        keep_turns: Number of most recent turns never summarized.
+        image_tokens: Tokens counted for each image in the estimate.
+        fold_to: Fraction of the budget to fold down to once it is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        keep_turns: int = 4,
+        image_tokens: int = 1000,
+        fold_to: float = 0.75,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.image_tokens = image_tokens
+        self.fold_to = fold_to
+        self.last_tokens = 0  # Estimated size of the last fitted prompt
+        # Fold kept between requests: steps summarized, summary lines dropped
+        self._folded = 0
+        self._dropped = 0
+        self._length = 0
+
+    def fit(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Build the messages to send for the next request.
+
+        Args:
+            messages: Full agent context, ending with the current user message.
+
+        Returns:
+            Messages within the budget (the input list if it already fits).
+        """
+        sizes = [estimate_message_tokens(m, self.image_tokens) for m in messages]
+        total = sum(sizes)
+
+        if len(messages) < self._length:
+            self._folded = self._dropped = 0
+        self._length = len(messages)
+
+        # Step j is messages[2j - 1] (user, the task for j = 1) and
+        # messages[2j] (assistant); the current user message is the last one
+        foldable = (len(messages) - 2) // 2 - self.keep_turns
+        if self.max_tokens is None or foldable <= 0:
+            self.last_tokens = total
+            return messages
+        if self._folded == 0 and total <= self.max_tokens:
+            self.last_tokens = total
+            return messages
+
+        # Re-apply the previous fold so the prefix does not change
+        lines: list[str] = []
+        for step in range(1, self._folded + 1):
+            lines.append(self._summarize(messages, step))
+            total -= self._step_size(sizes, step)
+        folded, dropped = self._folded, self._dropped
+
+        def summary_tokens() -> int:
+            return estimate_tokens("\n".join(lines[dropped:]))
+
+        # Over budget: fold steps, oldest first, then drop summary lines,
+        # until the prompt is down to fold_to of the budget
+        if total + summary_tokens() > self.max_tokens:
+            target = self.max_tokens * self.fold_to
+            while folded < foldable and total + summary_tokens() > target:
+                folded += 1
+                lines.append(self._summarize(messages, folded))
+                total -= self._step_size(sizes, folded)
+            while folded - dropped > 1 and total + summary_tokens() > target:
+                dropped += 1
+        self._folded, self._dropped = folded, dropped
+
+        header = f"Steps 1-{folded} (summarized):"
+        if dropped:
+            header += f" {dropped} earliest omitted"
+        summary = {
+            "role": "assistant",
+            "content": "\n".join([header, *lines[dropped:]]),
+        }
+
+        fitted = messages[:2] + [summary] + messages[2 * folded + 1 :]
+        self.last_tokens = total + estimate_message_tokens(summary)
+        return fitted
+
+    @staticmethod
+    def _summarize(messages: list[dict[str, Any]], step: int) -> str:
+        """One summary line: the app on screen and the action of a step."""
+        app = _screen_app(messages[2 * step - 1])
+        return f"{step}. [{app}] {_answer(messages[2 * step])}"
+
+    @staticmethod
+    def _step_size(sizes: list[int], step: int) -> int:
+        """Tokens saved by folding a step (the task message always stays)."""
+        saved = sizes[2 * step]
+        if step > 1:
+            saved += sizes[2 * step - 1]
+        return saved
+
+
+def _screen_app(message: dict[str, Any]) -> str:
+    """Get the current app from the screen info of a user message."""
+    content = message.get("content")
+    texts = (
+        [content]
+        if isinstance(content, str)
+        else [item.get("text", "") for item in content or [] if "text" in item]
+    )
+    for text in texts:
+        start = text.rfind("{")
+        if start == -1:
+            continue
+        try:
+            return json.loads(text[start:]).get("current_app", "?")
+        except (ValueError, AttributeError):
+            continue
+    return "?"
+
+
+def _answer(message: dict[str, Any]) -> str:
+    """Get the action of an assistant message, without the thinking."""
+    content = message.get("content")
+    if not isinstance(content, str):
+        return ""
+    match = _ANSWER.search(content)
+    return (match.group(1) if match else content).strip()
@@ -0,0 +1,83 @@
+"""Image preprocessing applied to screenshots before they are sent to the model."""
+
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.screenshot import Screenshot
+
+# Output format name -> (PIL format, MIME type)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+def preprocess_image(
+    screenshot: Screenshot,
+    max_long_edge: int | None = None,
+    max_pixels: int | None = None,
+    image_format: str | None = None,
+    quality: int = 85,
+    grayscale: bool = False,
+) -> Screenshot:
+    """
+    Resize and re-encode a screenshot for the model upload.
+
+    The returned screenshot carries the processed size. Actions must still be
+    executed against the original screenshot's width and height: the model
+    answers in relative 0-1000 coordinates, which are independent of the
+    resolution it was shown.
+
+    Args:
+        screenshot: Captured screenshot.
+        max_long_edge: Downscale so the longer side is at most this many pixels.
+        max_pixels: Downscale so width * height is at most this many pixels.
+        image_format: "png", "jpeg" or "webp"; None keeps the captured format.
+        quality: Encoder quality for JPEG and WebP (1-100).
+        grayscale: Convert to a single luminance channel.
+
+    Returns:
+        The processed screenshot, or the input unchanged if nothing applies.
+    """
+    width, height = screenshot.width, screenshot.height
+    scale = 1.0
+    if max_long_edge and max(width, height) > max_long_edge:
+        scale = min(scale, max_long_edge / max(width, height))
+    if max_pixels and width * height > max_pixels:
+        scale = min(scale, (max_pixels / (width * height)) ** 0.5)
+
+    if image_format is not None and image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format: {image_format}")
+    target_mime = IMAGE_FORMATS[image_format][1] if image_format else None
+
+    if scale == 1.0 and not grayscale and target_mime in (None, screenshot.mime_type):
+        return screenshot
+
+    # Host-decoded frames are used as they are, not encoded and decoded again
+    img = screenshot.to_image()
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        # draft() lets the JPEG decoder downscale for free before resizing
+        img.draft("RGB", size)
+        img = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    img = img.convert("L" if grayscale else "RGB")
+
+    if image_format is None:
+        image_format = "jpeg" if screenshot.mime_type == "image/jpeg" else "png"
+    pil_format, mime_type = IMAGE_FORMATS[image_format]
+
+    buffered = BytesIO()
+    if pil_format == "PNG":
+        img.save(buffered, format=pil_format)
+    else:
+        img.save(buffered, format=pil_format, quality=quality)
+
+    return Screenshot(
+        data=buffered.getvalue(),
+        width=img.width,
+        height=img.height,
+        is_sensitive=screenshot.is_sensitive,
+        mime_type=mime_type,
+    )
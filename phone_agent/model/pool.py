@@ -0,0 +1,300 @@
+"""Pool of model endpoints with load balancing, circuit breakers and failover."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import openai
+
+ROUTING_POLICIES = ("least_outstanding", "ewma")
+
+
+class ModelUnavailableError(Exception):
+    """Raised without sending a request when every endpoint's circuit is open."""
+
+
+class ModelTimeoutError(Exception):
+    """Raised when a model stream misses a first-token, inter-token or total timeout."""
+
+
+@dataclass
+class Endpoint:
+    """One model replica and its routing and circuit breaker state."""
+
+    base_url: str
+    client: Any  # OpenAI or AsyncOpenAI client for requests
+    outstanding: int = 0  # Requests in flight
+    ewma_ttft: float | None = None  # Smoothed time to first token (seconds)
+    ejected_until: float = 0.0  # Monotonic time until which the circuit is open
+    consecutive_failures: int = 0
+    trial: bool = False  # A half-open trial request is in flight
+    requests: int = 0
+    failures: int = 0
+    last_used: float = field(default=0.0, repr=False)
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the endpoint's circuit is not open."""
+        return time.monotonic() >= self.ejected_until
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """
+    Whether an error is the replica's fault, so a retry may succeed.
+
+    Connection errors, timeouts, rate limiting and 5xx responses count;
+    other 4xx responses would fail on every replica.
+
+    Args:
+        error: Exception raised by the OpenAI client.
+
+    Returns:
+        True if the request should be retried elsewhere.
+    """
+    if isinstance(
+        error,
+        (openai.APIConnectionError, openai.APITimeoutError, ModelTimeoutError),
+    ):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class EndpointPool:
+    """
+    Routes requests across several OpenAI-compatible endpoints.
+
+    Routing picks among healthy endpoints, either the one with the fewest
+    requests in flight ("least_outstanding") or the lowest expected wait,
+    i.e. the smoothed TTFT times the requests in flight plus one ("ewma";
+    endpoints without measurements are tried first).
+
+    Each endpoint has a circuit breaker: after breaker_threshold failures
+    in a row it is ejected (open) for eject_seconds, then lets a single
+    trial request through (half-open), which closes the circuit on success
+    and opens it again on failure. When every circuit is open, requests
+    fail at once with ModelUnavailableError instead of waiting on a server
+    that is down. Optional background health checks open the circuit of
+    unreachable endpoints early and close it for recovered ones.
+
+    Thread-safe; one pool can serve many agents, sync or async.
+
+    Args:
+        base_urls: Endpoint base URLs.
+        create_client: Builds the request client for a base URL.
+        routing: "least_outstanding" or "ewma".
+        eject_seconds: How long an open circuit gets no traffic.
+        ewma_alpha: Weight of the newest TTFT in the moving average.
+        breaker_threshold: Failures in a row that open the circuit.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        create_client: Callable[[str], Any],
+        routing: str = "least_outstanding",
+        eject_seconds: float = 30.0,
+        ewma_alpha: float = 0.3,
+        breaker_threshold: int = 3,
+    ):
+        if not base_urls:
+            raise ValueError("At least one model endpoint is required")
+        if routing not in ROUTING_POLICIES:
+            raise ValueError(
+                f"Unknown routing policy: {routing}. Choose from {ROUTING_POLICIES}"
+            )
+
+        self.endpoints = [Endpoint(url, create_client(url)) for url in base_urls]
+        self.routing = routing
+        self.eject_seconds = eject_seconds
+        self.ewma_alpha = ewma_alpha
+        self.breaker_threshold = max(1, breaker_threshold)
+        self._lock = threading.Lock()
+        self._health_thread: threading.Thread | None = None
+        self._stop_health = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(
+        self, exclude: set[str] | None = None, healthy_only: bool = False
+    ) -> Endpoint | None:
+        """
+        Pick an endpoint for a request and count it as in flight.
+
+        Endpoints with a closed circuit are preferred over half-open ones,
+        which take one trial request at a time.
+
+        Args:
+            exclude: Base URLs already tried for this request.
+            healthy_only: Return None instead of raising when no endpoint
+                can take the request, e.g. for an optional request.
+
+        Returns:
+            The endpoint, or None if all of them were excluded. Call
+            release() when the request is over.
+
+        Raises:
+            ModelUnavailableError: If the circuit of every endpoint not
+                excluded is open (or half-open with a trial in flight).
+        """
+        exclude = exclude or set()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.base_url not in exclude]
+            if not candidates:
+                return None
+
+            available = [e for e in candidates if e.healthy and not e.trial]
+            if not available:
+                if healthy_only:
+                    return None
+                wait = min(e.ejected_until for e in candidates) - time.monotonic()
+                raise ModelUnavailableError(
+                    "All model endpoints are unavailable (circuit open); "
+                    f"next trial in {max(0.0, wait):.0f}s"
+                )
+
+            endpoint = min(available, key=lambda e: (self._half_open(e), self._cost(e)))
+            endpoint.trial = self._half_open(endpoint)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            endpoint.last_used = time.monotonic()
+            return endpoint
+
+    def release(
+        self,
+        endpoint: Endpoint,
+        ttft: float | None = None,
+        error: Exception | None = None,
+        completed: bool = False,
+    ) -> None:
+        """
+        Finish a request started with acquire().
+
+        A request released with none of them (e.g. cancelled) leaves the
+        circuit as it is.
+
+        Args:
+            endpoint: The endpoint that served it.
+            ttft: Time to first token of a request that succeeded; closes the
+                circuit and updates the latency average.
+            error: The endpoint's failure, if any; counts towards opening
+                the circuit.
+            completed: The endpoint answered, even without content or with a
+                client error; closes the circuit.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.trial = False
+            if error is not None:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.breaker_threshold:
+                    self._eject(endpoint, error)
+            elif ttft is not None or completed:
+                endpoint.consecutive_failures = 0
+                if ttft is not None and endpoint.ewma_ttft is None:
+                    endpoint.ewma_ttft = ttft
+                elif ttft is not None:
+                    endpoint.ewma_ttft += self.ewma_alpha * (ttft - endpoint.ewma_ttft)
+
+    def check(self, endpoint: Endpoint, timeout: float = 5.0) -> bool:
+        """
+        Probe an endpoint's /models route and update its health.
+
+        Args:
+            endpoint: Endpoint to probe.
+            timeout: Probe timeout in seconds.
+
+        Returns:
+            True if the endpoint answered.
+        """
+        try:
+            probe = openai.OpenAI(
+                base_url=endpoint.base_url,
+                api_key=endpoint.client.api_key,
+                timeout=timeout,
+                max_retries=0,
+            )
+            with probe:
+                probe.models.list()
+        except Exception as e:
+            with self._lock:
+                if endpoint.healthy:
+                    endpoint.consecutive_failures = self.breaker_threshold
+                    self._eject(endpoint, e)
+            return False
+
+        with self._lock:
+            if endpoint.consecutive_failures >= self.breaker_threshold:
+                print(f"Model endpoint {endpoint.base_url} is back")
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = 0.0
+        return True
+
+    def start_health_checks(self, interval: float) -> None:
+        """
+        Probe all endpoints every `interval` seconds on a daemon thread.
+
+        Args:
+            interval: Seconds between probe rounds.
+        """
+        if self._health_thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stop_health.wait(interval):
+                for endpoint in self.endpoints:
+                    self.check(endpoint)
+
+        self._health_thread = threading.Thread(target=run, daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        """Stop the background health checks."""
+        self._stop_health.set()
+        self._health_thread = None
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Get the routing state of every endpoint.
+
+        Returns:
+            One dict per endpoint with its URL, health, load and counters.
+        """
+        with self._lock:
+            return [
+                {
+                    "base_url": e.base_url,
+                    "healthy": e.healthy,
+                    "half_open": self._half_open(e),
+                    "outstanding": e.outstanding,
+                    "ewma_ttft": e.ewma_ttft,
+                    "requests": e.requests,
+                    "failures": e.failures,
+                }
+                for e in self.endpoints
+            ]
+
+    def _cost(self, endpoint: Endpoint) -> tuple:
+        """Routing key: lower is better; ties go to the least recently used."""
+        if self.routing == "ewma":
+            ewma = endpoint.ewma_ttft if endpoint.ewma_ttft is not None else 0.0
+            return (ewma * (endpoint.outstanding + 1), endpoint.last_used)
+        return (endpoint.outstanding, endpoint.last_used)
+
+    def _half_open(self, endpoint: Endpoint) -> bool:
+        """Whether the circuit was open and the next request is a trial."""
+        return (
+            endpoint.consecutive_failures >= self.breaker_threshold and endpoint.healthy
+        )
+
+    def _eject(self, endpoint: Endpoint, error: Exception) -> None:
+        """Open an endpoint's circuit (lock held)."""
+        endpoint.ejected_until = time.monotonic() + self.eject_seconds
+        print(
+            f"Model endpoint {endpoint.base_url} failed ({error}); "
+            f"ejected for {self.eject_seconds:.0f}s"
+        )
@@ -0,0 +1,107 @@
+"""Observation phase of an agent step: screenshot and app state, captured together."""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from phone_agent.screenshot import Screenshot
+
+
+@dataclass
+class Observation:
+    """
+    What the agent sees at the start of a step.
+
+    Timings are wall-clock seconds for each leg. The legs run concurrently,
+    so total_time is close to the slower of the two.
+    """
+
+    screenshot: Screenshot
+    current_app: str
+    screenshot_time: float
+    app_time: float
+    total_time: float
+
+    @property
+    def critical_leg(self) -> str:
+        """Name of the leg that bounded the observation ("screenshot" or "app")."""
+        return "screenshot" if self.screenshot_time >= self.app_time else "app"
+
+
+def observe(
+    get_screenshot: Callable[[], Screenshot],
+    get_current_app: Callable[[], str],
+    executor: Executor | None = None,
+) -> Observation:
+    """
+    Capture the screenshot and the current app concurrently.
+
+    The app query runs on the executor while the screenshot is captured on the
+    calling thread. Without an executor both run one after the other.
+
+    Args:
+        get_screenshot: Captures the screen.
+        get_current_app: Returns the foreground app name.
+        executor: Executor for the app query, usually one per agent.
+
+    Returns:
+        Observation with the results and per-leg timings.
+    """
+    start = time.perf_counter()
+
+    def timed_app() -> tuple[str, float]:
+        leg_start = time.perf_counter()
+        return get_current_app(), time.perf_counter() - leg_start
+
+    future = executor.submit(timed_app) if executor is not None else None
+
+    screenshot = get_screenshot()
+    screenshot_time = time.perf_counter() - start
+
+    if future is not None:
+        current_app, app_time = future.result()
+    else:
+        current_app, app_time = timed_app()
+
+    return Observation(
+        screenshot=screenshot,
+        current_app=current_app,
+        screenshot_time=screenshot_time,
+        app_time=app_time,
+        total_time=time.perf_counter() - start,
+    )
+
+
+async def observe_async(
+    get_screenshot: Callable[[], Awaitable[Screenshot]],
+    get_current_app: Callable[[], Awaitable[str]],
+) -> Observation:
+    """
+    Asyncio counterpart of observe().
+
+    Args:
+        get_screenshot: Coroutine function capturing the screen.
+        get_current_app: Coroutine function returning the foreground app name.
+
+    Returns:
+        Observation with the results and per-leg timings.
+    """
+    start = time.perf_counter()
+
+    async def timed(leg: Callable[[], Awaitable]) -> tuple:
+        leg_start = time.perf_counter()
+        return await leg(), time.perf_counter() - leg_start
+
+    (screenshot, screenshot_time), (current_app, app_time) = await asyncio.gather(
+        timed(get_screenshot), timed(get_current_app)
+    )
+
+    return Observation(
+        screenshot=screenshot,
+        current_app=current_app,
+        screenshot_time=screenshot_time,
+        app_time=app_time,
+        total_time=time.perf_counter() - start,
+    )
@@ -0,0 +1,172 @@
+"""Screenshot container shared by the ADB, HDC and iOS backends."""
+
+import base64
+from functools import cached_property, lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.metrics import FALLBACK_SCREENSHOTS
+
+
+class Screenshot:
+    """
+    Represents a captured screenshot.
+
+    The image is kept in the encoding it was captured in (PNG from screencap,
+    JPEG from HDC, ...). Frames decoded on the host (raw framebuffers, video
+    streams) are kept decoded and only encoded as PNG when the bytes are first
+    requested, so a preprocessing step that re-encodes them anyway works from
+    the pixels directly. The base64 string for the model upload is only built
+    when first requested, and then cached.
+
+    Args:
+        data: Encoded image, or None if `image` is given.
+        width: Image width in pixels.
+        height: Image height in pixels.
+        is_sensitive: Whether the screen was flagged as sensitive.
+        mime_type: MIME type of `data`.
+        image: Decoded image; `data` is encoded from it (as PNG) on demand.
+    """
+
+    def __init__(
+        self,
+        data: bytes | None,
+        width: int,
+        height: int,
+        is_sensitive: bool = False,
+        mime_type: str = "image/png",
+        image: Image.Image | None = None,
+    ):
+        if data is None and image is None:
+            raise ValueError("Screenshot needs encoded data or an image")
+        self._data = data
+        self.width = width
+        self.height = height
+        self.is_sensitive = is_sensitive
+        self.mime_type = mime_type
+        self.image = image
+
+    def __repr__(self) -> str:
+        return (
+            f"Screenshot(width={self.width}, height={self.height}, "
+            f"is_sensitive={self.is_sensitive}, mime_type={self.mime_type!r})"
+        )
+
+    @property
+    def data(self) -> bytes:
+        """Encoded image data."""
+        if self._data is None:
+            buffered = BytesIO()
+            self.image.convert("RGB").save(buffered, format="PNG")
+            self._data = buffered.getvalue()
+        return self._data
+
+    def to_image(self) -> Image.Image:
+        """
+        Get the decoded image, without encoding or decoding it if it is held.
+
+        Returns:
+            PIL image; a lazily decoded one if only the encoded data is held.
+        """
+        if self.image is not None:
+            return self.image
+        return Image.open(BytesIO(self._data))
+
+    @cached_property
+    def base64_data(self) -> str:
+        """Base64-encoded image data."""
+        return base64.b64encode(self.data).decode("utf-8")
+
+    @property
+    def data_url(self) -> str:
+        """Data URL for the image, as expected by OpenAI-compatible APIs."""
+        return f"data:{self.mime_type};base64,{self.base64_data}"
+
+    @classmethod
+    def from_bytes(cls, data: bytes, is_sensitive: bool = False) -> "Screenshot":
+        """
+        Wrap an already encoded image without re-encoding it.
+
+        Only the image header is parsed to learn the format and dimensions.
+
+        Args:
+            data: Encoded image bytes (PNG, JPEG, ...).
+            is_sensitive: Whether the screen was flagged as sensitive.
+
+        Returns:
+            Screenshot object.
+        """
+        img = Image.open(BytesIO(data))
+        mime_type = Image.MIME.get(img.format, "image/png")
+        return cls(
+            data=data,
+            width=img.width,
+            height=img.height,
+            is_sensitive=is_sensitive,
+            mime_type=mime_type,
+        )
+
+    @classmethod
+    def from_base64(cls, base64_data: str) -> "Screenshot":
+        """
+        Wrap a base64-encoded image, keeping the string for reuse.
+
+        Args:
+            base64_data: Base64-encoded image.
+
+        Returns:
+            Screenshot object.
+        """
+        screenshot = cls.from_bytes(base64.b64decode(base64_data))
+        screenshot.__dict__["base64_data"] = base64_data
+        return screenshot
+
+    @classmethod
+    def from_image(cls, img: Image.Image, is_sensitive: bool = False) -> "Screenshot":
+        """
+        Wrap a decoded frame (raw capture or stream); PNG-encoded on demand.
+
+        Args:
+            img: PIL image of the screen.
+            is_sensitive: Whether the screen was flagged as sensitive.
+
+        Returns:
+            Screenshot object.
+        """
+        return cls(
+            data=None,
+            width=img.width,
+            height=img.height,
+            is_sensitive=is_sensitive,
+            image=img,
+        )
+
+    @classmethod
+    def blank(cls, width: int, height: int, is_sensitive: bool = False) -> "Screenshot":
+        """
+        Create a black screenshot, used as a fallback when capture fails.
+
+        Args:
+            width: Image width in pixels.
+            height: Image height in pixels.
+            is_sensitive: Whether the failure was due to sensitive content.
+
+        Returns:
+            Screenshot object with a black PNG image.
+        """
+        FALLBACK_SCREENSHOTS.inc(reason="sensitive" if is_sensitive else "error")
+        return cls(
+            data=_black_png(width, height),
+            width=width,
+            height=height,
+            is_sensitive=is_sensitive,
+        )
+
+
+@lru_cache(maxsize=4)
+def _black_png(width: int, height: int) -> bytes:
+    """Encode a black PNG once per size."""
+    buffered = BytesIO()
+    Image.new("RGB", (width, height), color="black").save(buffered, format="PNG")
+    return buffered.getvalue()
@@ -0,0 +1,170 @@
+"""Adaptive screen-settle detection used after device actions.
+
+Instead of sleeping a fixed delay after every tap or swipe, the screen is
+polled with cheap low-resolution frames until consecutive frames are
+perceptually identical, bounded by the min/max delays in
+TIMING_CONFIG.settle. When adaptive settling is disabled or no frame can be
+captured, the static delay is used instead.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from PIL import Image
+
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.tracing import span
+
+# Size of the thumbnail frames are reduced to before hashing
+HASH_SIZE = (9, 8)
+
+
+def frame_hash(image: Image.Image) -> int:
+    """
+    Compute a 64-bit difference hash (dHash) of a frame.
+
+    Each bit records whether a pixel is brighter than its right neighbour on a
+    9x8 grayscale thumbnail, so the hash ignores compression noise but flips
+    bits when content moves, appears or disappears.
+
+    Args:
+        image: Frame to hash, at any resolution.
+
+    Returns:
+        The hash as an integer.
+    """
+    pixels = image.convert("L").resize(HASH_SIZE, Image.Resampling.BILINEAR).tobytes()
+    width, height = HASH_SIZE
+
+    value = 0
+    for row in range(height):
+        offset = row * width
+        for col in range(width - 1):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two frame hashes."""
+    return (a ^ b).bit_count()
+
+
+def wait_for_settle(
+    delay: float, capture_frame: Callable[[], Image.Image | None] | None = None
+) -> float:
+    """
+    Wait for the screen to settle after an action.
+
+    Args:
+        delay: Static delay in seconds, used when adaptive settling is disabled
+            or frames are unavailable.
+        capture_frame: Returns a (preferably low-resolution) frame of the
+            current screen, or None if it cannot be captured.
+
+    Returns:
+        Seconds actually waited.
+    """
+    with span("settle", "sleep", delay=delay):
+        return _wait_for_settle(delay, capture_frame)
+
+
+def _wait_for_settle(
+    delay: float, capture_frame: Callable[[], Image.Image | None] | None
+) -> float:
+    """Poll frames until the screen settles (see wait_for_settle())."""
+    config = TIMING_CONFIG.settle
+    if not config.enabled or capture_frame is None:
+        time.sleep(delay)
+        return delay
+
+    start = time.monotonic()
+    time.sleep(config.min_delay)
+
+    tracker = _SettleTracker()
+    while time.monotonic() - start < config.max_delay:
+        try:
+            frame = capture_frame()
+        except Exception:
+            frame = None
+
+        if frame is None:
+            # Frames unavailable, finish the static delay instead
+            remaining = delay - (time.monotonic() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+            return time.monotonic() - start
+
+        if tracker.add(frame):
+            break
+        time.sleep(config.poll_interval)
+
+    return time.monotonic() - start
+
+
+async def wait_for_settle_async(
+    delay: float,
+    capture_frame: Callable[[], Awaitable[Image.Image | None]] | None = None,
+) -> float:
+    """
+    Asyncio counterpart of wait_for_settle().
+
+    Args:
+        delay: Static delay in seconds, used when adaptive settling is disabled
+            or frames are unavailable.
+        capture_frame: Coroutine function returning a frame of the current
+            screen, or None if it cannot be captured.
+
+    Returns:
+        Seconds actually waited.
+    """
+    config = TIMING_CONFIG.settle
+    if not config.enabled or capture_frame is None:
+        await asyncio.sleep(delay)
+        return delay
+
+    start = time.monotonic()
+    await asyncio.sleep(config.min_delay)
+
+    tracker = _SettleTracker()
+    while time.monotonic() - start < config.max_delay:
+        try:
+            frame = await capture_frame()
+        except Exception:
+            frame = None
+
+        if frame is None:
+            remaining = delay - (time.monotonic() - start)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            return time.monotonic() - start
+
+        if tracker.add(frame):
+            break
+        await asyncio.sleep(config.poll_interval)
+
+    return time.monotonic() - start
+
+
+class _SettleTracker:
+    """Counts consecutive matching frames until the screen is stable."""
+
+    def __init__(self):
+        self._previous: int | None = None
+        self._matches = 0
+
+    def add(self, frame: Image.Image) -> bool:
+        """Record a frame, returning True once enough frames matched."""
+        config = TIMING_CONFIG.settle
+        current = frame_hash(frame)
+        previous, self._previous = self._previous, current
+
+        if (
+            previous is not None
+            and hash_distance(previous, current) <= config.hash_threshold
+        ):
+            self._matches += 1
+            return self._matches >= config.stable_frames - 1
+
+        self._matches = 0
+        return False
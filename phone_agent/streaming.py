@@ -0,0 +1,275 @@
+"""Continuous screen streaming sources with a latest-frame buffer.
+
+A frame source keeps a long-lived video stream open to the device and decodes it
+on a background thread into a single-slot buffer, so a screenshot becomes a
+memory read instead of a device round-trip.
+
+Frames are only handed out if they were decoded after the last action on the
+device, so the agent never reasons about a screen that predates its own input.
+When no such frame arrives in time (e.g. the screen is static and the encoder
+emits nothing), callers fall back to a regular cold screenshot.
+"""
+
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.screenshot import Screenshot
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+
+@dataclass
+class Frame:
+    """A frame and the monotonic time it became available."""
+
+    timestamp: float
+    image: Image.Image | None = None  # Decoded frame (video streams)
+    data: bytes | None = None  # Encoded frame, passed through (MJPEG)
+
+    def to_screenshot(self) -> Screenshot:
+        """Convert the frame into a Screenshot."""
+        if self.data is not None:
+            return Screenshot.from_bytes(self.data)
+        return Screenshot.from_image(self.image)
+
+    def to_image(self) -> Image.Image:
+        """Get the frame as a PIL image; JPEG frames decode at 1/8 size."""
+        if self.image is not None:
+            return self.image
+        img = Image.open(BytesIO(self.data))
+        img.draft("L", (img.width // 8, img.height // 8))
+        return img
+
+
+class FrameSource(ABC):
+    """
+    Base class for background frame sources.
+
+    Subclasses implement `_stream()`, which blocks while reading the device
+    stream and calls `_publish()` for every frame. The stream is
+    reopened automatically whenever `_stream()` returns or raises.
+
+    Args:
+        max_frame_wait: Seconds to wait for a frame newer than the last action.
+        encoder_latency: Frames decoded within this many seconds of an action
+            may still show the pre-action screen and are treated as stale.
+        reconnect_delay: Seconds to wait before reopening a dropped stream.
+    """
+
+    def __init__(
+        self,
+        max_frame_wait: float = 0.3,
+        encoder_latency: float = 0.1,
+        reconnect_delay: float = 1.0,
+    ):
+        self.max_frame_wait = max_frame_wait
+        self.encoder_latency = encoder_latency
+        self.reconnect_delay = reconnect_delay
+
+        self._frame: Frame | None = None
+        self._last_action_time = 0.0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start decoding frames on a background thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and close the stream."""
+        self._running = False
+        self._close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def mark_action(self) -> None:
+        """Record that an action has been sent; older frames become stale."""
+        with self._condition:
+            self._last_action_time = time.monotonic()
+
+    def latest(self, timeout: float | None = None) -> Frame | None:
+        """
+        Get the latest frame that is newer than the last action.
+
+        Args:
+            timeout: Seconds to wait for such a frame. Defaults to max_frame_wait.
+
+        Returns:
+            The frame, or None if no fresh frame arrived in time.
+        """
+        if timeout is None:
+            timeout = self.max_frame_wait
+
+        with self._condition:
+            self._condition.wait_for(self._has_fresh_frame, timeout=timeout)
+            if self._has_fresh_frame():
+                return self._frame
+        return None
+
+    def latest_image(self) -> Image.Image | None:
+        """
+        Get the latest frame newer than the last action as an image.
+
+        Used for screen-settle polling, which costs nothing on the device
+        this way.
+
+        Returns:
+            The image, or None if no fresh frame arrived in time.
+        """
+        frame = self.latest()
+        return frame.to_image() if frame is not None else None
+
+    def _has_fresh_frame(self) -> bool:
+        """Check whether the buffered frame postdates the last action."""
+        if self._frame is None:
+            return False
+        return self._frame.timestamp > self._last_action_time + self.encoder_latency
+
+    def _publish(
+        self, image: Image.Image | None = None, data: bytes | None = None
+    ) -> None:
+        """Replace the buffered frame and wake up waiting readers."""
+        with self._condition:
+            self._frame = Frame(timestamp=time.monotonic(), image=image, data=data)
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Keep the stream open until stopped."""
+        while self._running:
+            try:
+                self._stream()
+            except Exception as e:
+                if self._running:
+                    print(f"Frame stream error: {e}")
+            finally:
+                self._close()
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+    @abstractmethod
+    def _stream(self) -> None:
+        """Read the device stream and publish decoded frames."""
+
+    def _close(self) -> None:
+        """Release the resources of the current stream."""
+
+
+class ScreenrecordFrameSource(FrameSource):
+    """
+    Frame source for Android devices backed by `screenrecord` H.264 output.
+
+    Decoding requires PyAV (pip install av). `screenrecord` stops after its
+    time limit; the stream is then reopened transparently.
+
+    Args:
+        device_id: Optional ADB device ID.
+        bit_rate: Encoder bit rate in bits per second.
+        **kwargs: Passed to FrameSource.
+    """
+
+    def __init__(
+        self, device_id: str | None = None, bit_rate: int = 8_000_000, **kwargs
+    ):
+        super().__init__(**kwargs)
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "H.264 stream decoding requires PyAV. Install: pip install av"
+            )
+
+        self.device_id = device_id
+        self.bit_rate = bit_rate
+        self._process: subprocess.Popen | None = None
+
+    def _stream(self) -> None:
+        """Decode the screenrecord H.264 elementary stream."""
+        import av
+
+        adb_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
+        self._process = subprocess.Popen(
+            adb_prefix
+            + [
+                "exec-out",
+                "screenrecord",
+                "--output-format=h264",
+                f"--bit-rate={self.bit_rate}",
+                "-",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+        codec = av.CodecContext.create("h264", "r")
+        while self._running:
+            chunk = self._process.stdout.read1(65536)
+            if not chunk:
+                break
+            for packet in codec.parse(chunk):
+                for frame in codec.decode(packet):
+                    self._publish(frame.to_image())
+
+    def _close(self) -> None:
+        """Terminate the screenrecord process."""
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+class MJPEGFrameSource(FrameSource):
+    """
+    Frame source for iOS devices backed by the WebDriverAgent MJPEG server.
+
+    WDA serves a multipart MJPEG stream (port 9100 by default; forward it with
+    `iproxy 9100 9100` for USB devices). Frames are split on JPEG markers, so
+    the multipart boundary format does not matter, and are kept as JPEG.
+
+    Args:
+        mjpeg_url: URL of the WDA MJPEG server.
+        **kwargs: Passed to FrameSource.
+    """
+
+    def __init__(self, mjpeg_url: str = "http://localhost:9100", **kwargs):
+        super().__init__(**kwargs)
+        self.mjpeg_url = mjpeg_url
+        self._response = None
+
+    def _stream(self) -> None:
+        """Split the MJPEG stream into JPEG images."""
+        import requests
+
+        self._response = requests.get(self.mjpeg_url, stream=True, timeout=10)
+        buffer = b""
+        for chunk in self._response.iter_content(chunk_size=65536):
+            if not self._running:
+                break
+            buffer += chunk
+
+            # Only the newest complete frame matters; drop anything older
+            end = buffer.rfind(JPEG_EOI)
+            if end == -1:
+                continue
+            start = buffer.rfind(JPEG_SOI, 0, end)
+            if start != -1:
+                self._publish(data=buffer[start : end + 2])
+            buffer = buffer[end + 2 :]
+
+    def _close(self) -> None:
+        """Close the HTTP stream."""
+        response, self._response = self._response, None
+        if response is not None:
+            response.close()
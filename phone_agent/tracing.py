@@ -0,0 +1,285 @@
+"""
+Always-on tracing of the agent loop, exported as Chrome trace events.
+
+Spans are timed with two clock reads and kept as tuples in a bounded ring
+buffer, so tracing costs a couple of microseconds per span and a fixed amount of
+memory, against milliseconds for the device calls and seconds for the model
+calls it measures. Open an exported file in chrome://tracing or Perfetto.
+
+Environment Variables:
+    PHONE_AGENT_TRACE: Set to false to turn tracing off (default: true).
+    PHONE_AGENT_TRACE_MAX_SPANS: Spans kept in memory (default: 65536).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterable
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+class Span:
+    """A timed section of code; use as a context manager."""
+
+    __slots__ = ("_tracer", "name", "category", "args", "_start")
+
+    def __init__(
+        self, tracer: "Tracer", name: str, category: str, args: dict[str, Any]
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start = 0
+
+    def __enter__(self) -> "Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        end = time.perf_counter_ns()
+        self._tracer.record(
+            self.name, self.category, self._start, end - self._start, self.args
+        )
+        return False
+
+    def set(self, **args: Any) -> None:
+        """Attach arguments known only once the span has run, e.g. a result."""
+        self.args.update(args)
+
+
+class _NoopSpan:
+    """Span returned while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Records spans from any thread into a bounded in-memory buffer.
+
+    Each span is stored as (name, category, start_ns, duration_ns, thread_id,
+    args), with start_ns from time.perf_counter_ns(). When the buffer is
+    full the oldest spans are dropped.
+
+    Args:
+        max_spans: Spans kept in memory.
+        enabled: Record spans; when False, span() returns a shared no-op.
+    """
+
+    def __init__(self, max_spans: int = 65536, enabled: bool = True):
+        self.enabled = enabled
+        self._spans: deque[tuple] = deque(maxlen=max_spans)
+        self._thread_names: dict[int, str] = {}
+
+    def span(self, name: str, category: str = "agent", **args: Any):
+        """
+        Time a section of code.
+
+        Args:
+            name: Span name; keep it low-cardinality (e.g. "adb shell") and put
+                details such as the command in args.
+            category: Span category, e.g. "agent", "device" or "sleep".
+            **args: Arguments shown with the span in the trace viewer.
+
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, category, args)
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        duration_ns: int,
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a span timed elsewhere (on the calling thread)."""
+        if not self.enabled:
+            return
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+        self._spans.append((name, category, start_ns, duration_ns, thread_id, args))
+
+    def spans(
+        self, since_ns: int | None = None, threads: Iterable[int] | None = None
+    ) -> list[tuple]:
+        """
+        Get the recorded spans.
+
+        Args:
+            since_ns: Only spans that started at or after this
+                time.perf_counter_ns() value.
+            threads: Only spans recorded on these thread IDs.
+
+        Returns:
+            Span tuples, oldest first.
+        """
+        spans = list(self._spans)
+        if since_ns is not None:
+            spans = [s for s in spans if s[2] >= since_ns]
+        if threads is not None:
+            threads = set(threads)
+            spans = [s for s in spans if s[4] in threads]
+        return spans
+
+    def clear(self) -> None:
+        """Drop all recorded spans."""
+        self._spans.clear()
+
+    def export_chrome_trace(self, path: str, spans: list[tuple] | None = None) -> int:
+        """
+        Write spans as a Chrome trace-event JSON file.
+
+        Args:
+            path: Output file.
+            spans: Spans to write (default: all recorded ones).
+
+        Returns:
+            Number of spans written.
+        """
+        spans = self.spans() if spans is None else spans
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"name": name},
+            }
+            for thread_id, name in list(self._thread_names.items())
+        ]
+        for name, category, start_ns, duration_ns, thread_id, args in spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f,
+                ensure_ascii=False,
+                default=str,
+            )
+        return len(spans)
+
+
+def summarize(spans: list[tuple]) -> dict[str, dict[str, Any]]:
+    """
+    Summarize spans per name, e.g. the spans of one task.
+
+    Args:
+        spans: Span tuples (see Tracer.spans()).
+
+    Returns:
+        Dict of span name to count, total/p50/p95/max seconds and a
+        histogram: counts per HISTOGRAM_BUCKETS_MS bucket. Names are in
+        order of their first start.
+    """
+    durations: dict[str, list[float]] = {}
+    for name, _, _, duration_ns, _, _ in sorted(spans, key=lambda s: s[2]):
+        durations.setdefault(name, []).append(duration_ns / 1e9)
+
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        histogram = [0] * len(HISTOGRAM_BUCKETS_MS)
+        for value in values:
+            bucket = 0
+            while value * 1000 > HISTOGRAM_BUCKETS_MS[bucket]:
+                bucket += 1
+            histogram[bucket] += 1
+        summary[name] = {
+            "count": len(values),
+            "total": sum(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+            "histogram": histogram,
+        }
+    return summary
+
+
+def format_summary(summary: dict[str, dict[str, Any]], width: int = 20) -> str:
+    """
+    Render a summary as a table with a bar of each name's share of the time.
+
+    Shares are relative to the "task" span if there is one, else to the
+    longest total.
+
+    Args:
+        summary: Result of summarize().
+        width: Width of the share bars in characters.
+
+    Returns:
+        The table, one line per span name.
+    """
+    if not summary:
+        return ""
+    reference = summary.get("task", max(summary.values(), key=lambda s: s["total"]))
+    wall = reference["total"] or 1.0
+
+    lines = [
+        f"{'span':<16}{'count':>6}{'total s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'max ms':>9}  share"
+    ]
+    for name, s in summary.items():
+        share = s["total"] / wall
+        bar = "█" * round(min(share, 1.0) * width)
+        lines.append(
+            f"{name:<16}{s['count']:>6}{s['total']:>9.2f}{s['p50'] * 1000:>9.1f}"
+            f"{s['p95'] * 1000:>9.1f}{s['max'] * 1000:>9.1f}  {bar} {share:.0%}"
+        )
+    return "\n".join(lines)
+
+
+# Global tracer instance
+_tracer = Tracer(
+    max_spans=int(os.getenv("PHONE_AGENT_TRACE_MAX_SPANS", "65536")),
+    enabled=os.getenv("PHONE_AGENT_TRACE", "true").lower() in ("true", "1", "yes"),
+)
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the global tracer instance.
+
+    Returns:
+        The tracer instance.
+    """
+    return _tracer
+
+
+def span(name: str, category: str = "agent", **args: Any):
+    """Time a section of code with the global tracer (see Tracer.span())."""
+    return _tracer.span(name, category, **args)
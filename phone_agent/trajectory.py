@@ -0,0 +1,89 @@
+"""
+Trajectories: recorded agent runs that can be replayed without the model.
+
+A trajectory keeps, for every step, the hash of the screen the model saw,
+the foreground app, the model output and the action taken. Replaying one
+(PhoneAgent.run(task, replay=trajectory)) executes the recorded actions
+while the screen matches the recording, and asks the model only from the
+first step where it does not.
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from phone_agent.screenshot import Screenshot
+from phone_agent.settle import HASH_SIZE, frame_hash
+
+
+@dataclass
+class TrajectoryStep:
+    """One recorded agent step."""
+
+    screen_hash: int  # settle.frame_hash() of the screenshot before the action
+    current_app: str
+    raw_output: str  # Model output as streamed
+    thinking: str
+    answer: str  # Action as written by the model
+    action: dict[str, Any]  # Parsed action that was executed
+    timings: dict[str, float] = field(default_factory=dict)
+    replayed: bool = False  # Taken from a recording instead of the model
+
+
+@dataclass
+class Trajectory:
+    """A task and the steps the agent took for it."""
+
+    task: str
+    steps: list[TrajectoryStep] = field(default_factory=list)
+    device_id: str | None = None
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the last step ended the task with finish()."""
+        return bool(self.steps) and self.steps[-1].action.get("_metadata") == "finish"
+
+    def save(self, path: str) -> None:
+        """
+        Write the trajectory as JSON.
+
+        Args:
+            path: Output file.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "Trajectory":
+        """
+        Read a trajectory written by save().
+
+        Args:
+            path: Trajectory file.
+
+        Returns:
+            The trajectory.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        steps = [TrajectoryStep(**step) for step in data.pop("steps", [])]
+        return cls(steps=steps, **data)
+
+
+def screen_hash(screenshot: Screenshot) -> int:
+    """
+    Hash a screenshot for comparison with a recorded step.
+
+    Args:
+        screenshot: Captured screenshot.
+
+    Returns:
+        The settle.frame_hash() of the image.
+    """
+    img = screenshot.to_image()
+    # JPEG frames can be decoded at a fraction of their size; the hash only
+    # needs a thumbnail
+    img.draft("L", (HASH_SIZE[0] * 8, HASH_SIZE[1] * 8))
+    return frame_hash(img)
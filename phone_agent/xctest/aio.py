@@ -0,0 +1,365 @@
+"""Asyncio client for iOS devices via WebDriverAgent.
+
+AsyncWDAClient mirrors the synchronous functions of phone_agent.xctest as
+coroutines over a pooled httpx.AsyncClient, reusing their request bodies and
+app index. Create one client per device and close it when done; an event loop
+can drive many of them at once.
+"""
+
+import os
+import tempfile
+import uuid
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.aio import run_process
+from phone_agent.config.apps_ios import APP_PACKAGES_IOS as APP_PACKAGES
+from phone_agent.screenshot import Screenshot
+from phone_agent.settle import wait_for_settle_async
+from phone_agent.xctest.device import (
+    BACK_GESTURE,
+    app_name_for_bundle,
+    double_tap_actions,
+    long_press_actions,
+    swipe_duration,
+    swipe_payload,
+    tap_actions,
+)
+from phone_agent.xctest.screenshot import _create_fallback_screenshot
+
+
+class AsyncWDAClient:
+    """
+    Async WebDriverAgent client for one iOS device.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        session_id: Optional WDA session ID.
+        device_id: Optional device UDID (for the idevicescreenshot fallback).
+        timeout: Default request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        wda_url: str = "http://localhost:8100",
+        session_id: str | None = None,
+        device_id: str | None = None,
+        timeout: float = 10,
+    ):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "httpx is required for the async iOS client. Install: pip install httpx"
+            )
+
+        self.wda_url = wda_url.rstrip("/")
+        self.session_id = session_id
+        self.device_id = device_id
+        self._http = httpx.AsyncClient(timeout=timeout, verify=False)
+
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncWDAClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def get_screenshot(self, timeout: int = 10) -> Screenshot:
+        """
+        Capture a screenshot.
+
+        Tries WebDriverAgent first, then idevicescreenshot.
+
+        Args:
+            timeout: Timeout in seconds.
+
+        Returns:
+            Screenshot object, or a black fallback image if both failed.
+        """
+        screenshot = await self._get_screenshot_wda(timeout)
+        if screenshot is None:
+            screenshot = await self._get_screenshot_idevice(timeout)
+        if screenshot is None:
+            screenshot = _create_fallback_screenshot(is_sensitive=False)
+        return screenshot
+
+    async def get_settle_frame(self, timeout: int = 5) -> Image.Image | None:
+        """
+        Capture a frame for screen-settle detection.
+
+        Args:
+            timeout: Timeout in seconds.
+
+        Returns:
+            PIL image of the screen, or None if it could not be captured.
+        """
+        screenshot = await self._get_screenshot_wda(timeout)
+        if screenshot is None:
+            return None
+
+        img = Image.open(BytesIO(screenshot.data))
+        img.draft("L", (screenshot.width // 8, screenshot.height // 8))
+        return img
+
+    async def get_current_app(self) -> str:
+        """
+        Get the currently active app name.
+
+        Returns:
+            The app name if recognized, otherwise "System Home".
+        """
+        try:
+            response = await self._http.get(
+                f"{self.wda_url}/wda/activeAppInfo", timeout=5
+            )
+            if response.status_code == 200:
+                value = response.json().get("value", {})
+                return app_name_for_bundle(value.get("bundleId", ""))
+        except Exception as e:
+            print(f"Error getting current app: {e}")
+
+        return "System Home"
+
+    async def tap(self, x: int, y: int, delay: float = 1.0) -> None:
+        """
+        Tap at the specified coordinates.
+
+        Args:
+            x: X coordinate.
+            y: Y coordinate.
+            delay: Delay in seconds after tap.
+        """
+        await self._action("actions", tap_actions(x, y), 15, delay, "tapping")
+
+    async def double_tap(self, x: int, y: int, delay: float = 1.0) -> None:
+        """
+        Double tap at the specified coordinates.
+
+        Args:
+            x: X coordinate.
+            y: Y coordinate.
+            delay: Delay in seconds after double tap.
+        """
+        await self._action(
+            "actions", double_tap_actions(x, y), 10, delay, "double tapping"
+        )
+
+    async def long_press(
+        self, x: int, y: int, duration: float = 3.0, delay: float = 1.0
+    ) -> None:
+        """
+        Long press at the specified coordinates.
+
+        Args:
+            x: X coordinate.
+            y: Y coordinate.
+            duration: Duration of press in seconds.
+            delay: Delay in seconds after long press.
+        """
+        await self._action(
+            "actions",
+            long_press_actions(x, y, duration),
+            duration + 10,
+            delay,
+            "long pressing",
+        )
+
+    async def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration: float | None = None,
+        delay: float = 1.0,
+    ) -> None:
+        """
+        Swipe from start to end coordinates.
+
+        Args:
+            start_x: Starting X coordinate.
+            start_y: Starting Y coordinate.
+            end_x: Ending X coordinate.
+            end_y: Ending Y coordinate.
+            duration: Duration of swipe in seconds (auto-calculated if None).
+            delay: Delay in seconds after swipe.
+        """
+        if duration is None:
+            duration = swipe_duration(start_x, start_y, end_x, end_y)
+
+        await self._action(
+            "wda/dragfromtoforduration",
+            swipe_payload(start_x, start_y, end_x, end_y, duration),
+            duration + 10,
+            delay,
+            "swiping",
+        )
+
+    async def back(self, delay: float = 1.0) -> None:
+        """
+        Navigate back with a swipe from the left edge.
+
+        Args:
+            delay: Delay in seconds after navigation.
+        """
+        await self._action(
+            "wda/dragfromtoforduration",
+            BACK_GESTURE,
+            10,
+            delay,
+            "performing back gesture",
+        )
+
+    async def home(self, delay: float = 1.0) -> None:
+        """
+        Press the home button.
+
+        Args:
+            delay: Delay in seconds after pressing home.
+        """
+        try:
+            await self._http.post(f"{self.wda_url}/wda/homescreen")
+            await self._wait_for_settle(delay)
+        except Exception as e:
+            print(f"Error pressing home: {e}")
+
+    async def launch_app(self, app_name: str, delay: float = 1.0) -> bool:
+        """
+        Launch an app by name.
+
+        Args:
+            app_name: The app name (must be in APP_PACKAGES).
+            delay: Delay in seconds after launching.
+
+        Returns:
+            True if app was launched, False if app not found.
+        """
+        if app_name not in APP_PACKAGES:
+            return False
+
+        try:
+            response = await self._http.post(
+                self._session_url("wda/apps/launch"),
+                json={"bundleId": APP_PACKAGES[app_name]},
+            )
+            await self._wait_for_settle(delay)
+            return response.status_code in (200, 201)
+        except Exception as e:
+            print(f"Error launching app: {e}")
+            return False
+
+    async def type_text(self, text: str, frequency: int = 60) -> None:
+        """
+        Type text into the currently focused input field.
+
+        Args:
+            text: The text to type.
+            frequency: Typing frequency (keys per minute).
+        """
+        try:
+            response = await self._http.post(
+                self._session_url("wda/keys"),
+                json={"value": list(text), "frequency": frequency},
+                timeout=30,
+            )
+            if response.status_code not in (200, 201):
+                print(
+                    f"Warning: Text input may have failed. Status: {response.status_code}"
+                )
+        except Exception as e:
+            print(f"Error typing text: {e}")
+
+    async def clear_text(self) -> None:
+        """Clear text in the currently focused input field."""
+        try:
+            response = await self._http.get(self._session_url("element/active"))
+            if response.status_code == 200:
+                value = response.json().get("value", {})
+                element_id = value.get("ELEMENT") or value.get(
+                    "element-6066-11e4-a52e-4f735466cecf"
+                )
+                if element_id:
+                    await self._http.post(
+                        self._session_url(f"element/{element_id}/clear")
+                    )
+                    return
+
+            # Fallback: send backspace commands
+            await self._http.post(
+                self._session_url("wda/keys"), json={"value": ["\u0008"] * 100}
+            )
+        except Exception as e:
+            print(f"Error clearing text: {e}")
+
+    async def hide_keyboard(self) -> None:
+        """Hide the on-screen keyboard."""
+        try:
+            await self._http.post(f"{self.wda_url}/wda/keyboard/dismiss")
+        except Exception as e:
+            print(f"Error hiding keyboard: {e}")
+
+    async def _action(
+        self, endpoint: str, body: dict, timeout: float, delay: float, what: str
+    ) -> None:
+        """Post a gesture and wait for the screen to settle."""
+        try:
+            await self._http.post(
+                self._session_url(endpoint), json=body, timeout=timeout
+            )
+            await self._wait_for_settle(delay)
+        except Exception as e:
+            print(f"Error {what}: {e}")
+
+    async def _wait_for_settle(self, delay: float) -> None:
+        """Wait after an action, adaptively if screen-settle detection is enabled."""
+        await wait_for_settle_async(delay, self.get_settle_frame)
+
+    def _session_url(self, endpoint: str) -> str:
+        """Get the URL of a session endpoint."""
+        if self.session_id:
+            return f"{self.wda_url}/session/{self.session_id}/{endpoint}"
+        return f"{self.wda_url}/{endpoint}"
+
+    async def _get_screenshot_wda(self, timeout: int) -> Screenshot | None:
+        """Capture a screenshot with WebDriverAgent."""
+        try:
+            response = await self._http.get(
+                f"{self.wda_url}/screenshot", timeout=timeout
+            )
+            if response.status_code == 200:
+                base64_data = response.json().get("value", "")
+                if base64_data:
+                    return Screenshot.from_base64(base64_data)
+        except Exception as e:
+            print(f"WDA screenshot failed: {e}")
+        return None
+
+    async def _get_screenshot_idevice(self, timeout: int) -> Screenshot | None:
+        """Capture a screenshot with idevicescreenshot."""
+        temp_path = os.path.join(
+            tempfile.gettempdir(), f"ios_screenshot_{uuid.uuid4()}.png"
+        )
+        cmd = ["idevicescreenshot"]
+        if self.device_id:
+            cmd.extend(["-u", self.device_id])
+        cmd.append(temp_path)
+
+        try:
+            result = await run_process(cmd, timeout)
+            if result.returncode == 0 and os.path.exists(temp_path):
+                with open(temp_path, "rb") as f:
+                    data = f.read()
+                os.remove(temp_path)
+                return Screenshot.from_bytes(data)
+        except FileNotFoundError:
+            print(
+                "Note: idevicescreenshot not found. Install: brew install libimobiledevice"
+            )
+        except Exception as e:
+            print(f"idevicescreenshot failed: {e}")
+        return None
@@ -1,10 +1,11 @@
 """Device control utilities for iOS automation via WebDriverAgent."""
 
 import subprocess
-import time
 from typing import Optional
 
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS as APP_PACKAGES
+from phone_agent.settle import wait_for_settle
+from phone_agent.xctest.screenshot import get_settle_frame
 
 SCALE_FACTOR = 3 # 3 for most modern iPhone 
 
@@ -56,13 +57,8 @@ def get_current_app(
             value = data.get("value", {})
             bundle_id = value.get("bundleId", "")
 
-            if bundle_id:
-                # Try to find app name from bundle ID
-                for app_name, package in APP_PACKAGES.items():
-                    if package == bundle_id:
-                        return app_name
-
-            return "System Home"
+            # Try to find app name from bundle ID
+            return app_name_for_bundle(bundle_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -95,25 +91,11 @@ def tap(
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for tap/click
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 0.1},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
+        actions = tap_actions(x, y)
 
         requests.post(url, json=actions, timeout=15, verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -144,29 +126,11 @@ def double_tap(
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for double tap
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerUp", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
+        actions = double_tap_actions(x, y)
 
         requests.post(url, json=actions, timeout=10, verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -199,28 +163,11 @@ def long_press(
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
         # W3C WebDriver Actions API for long press
-        # Convert duration to milliseconds
-        duration_ms = int(duration * 1000)
-
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": duration_ms},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
+        actions = long_press_actions(x, y, duration)
 
         requests.post(url, json=actions, timeout=int(duration + 10), verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -255,25 +202,14 @@ def swipe(
         import requests
 
         if duration is None:
-            # Calculate duration based on distance
-            dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-            duration = dist_sq / 1000000  # Convert to seconds
-            duration = max(0.3, min(duration, 2.0))  # Clamp between 0.3-2 seconds
+            duration = swipe_duration(start_x, start_y, end_x, end_y)
 
         url = _get_wda_session_url(wda_url, session_id, "wda/dragfromtoforduration")
-
-        # WDA dragfromtoforduration API payload
-        payload = {
-            "fromX": start_x / SCALE_FACTOR,
-            "fromY": start_y / SCALE_FACTOR,
-            "toX": end_x / SCALE_FACTOR,
-            "toY": end_y / SCALE_FACTOR,
-            "duration": duration,
-        }
+        payload = swipe_payload(start_x, start_y, end_x, end_y, duration)
 
         requests.post(url, json=payload, timeout=int(duration + 10), verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -304,17 +240,11 @@ def back(
         url = _get_wda_session_url(wda_url, session_id, "wda/dragfromtoforduration")
 
         # Swipe from left edge to simulate back gesture
-        payload = {
-            "fromX": 0,
-            "fromY": 640,
-            "toX": 400,
-            "toY": 640,
-            "duration": 0.3,
-        }
+        payload = BACK_GESTURE
 
         requests.post(url, json=payload, timeout=10, verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -342,7 +272,7 @@ def home(
 
         requests.post(url, timeout=10, verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -381,7 +311,7 @@ def launch_app(
             url, json={"bundleId": bundle_id}, timeout=10, verify=False
         )
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
         return response.status_code in (200, 201)
 
     except ImportError:
@@ -450,9 +380,116 @@ def press_button(
 
         requests.post(url, json={"name": button_name}, timeout=10, verify=False)
 
-        time.sleep(delay)
+        _wait_for_settle(delay, wda_url, session_id)
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
     except Exception as e:
         print(f"Error pressing button: {e}")
+
+
+def _pointer_actions(steps: list[dict]) -> dict:
+    """Wrap pointer steps for one finger in a W3C Actions request body."""
+    return {
+        "actions": [
+            {
+                "type": "pointer",
+                "id": "finger1",
+                "parameters": {"pointerType": "touch"},
+                "actions": steps,
+            }
+        ]
+    }
+
+
+def tap_actions(x: int, y: int) -> dict:
+    """W3C Actions request body for a tap at screen pixel coordinates."""
+    return _pointer_actions(
+        [
+            {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 0.1},
+            {"type": "pointerUp", "button": 0},
+        ]
+    )
+
+
+def double_tap_actions(x: int, y: int) -> dict:
+    """W3C Actions request body for a double tap at screen pixel coordinates."""
+    return _pointer_actions(
+        [
+            {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerUp", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerUp", "button": 0},
+        ]
+    )
+
+
+def long_press_actions(x: int, y: int, duration: float) -> dict:
+    """W3C Actions request body for a long press of `duration` seconds."""
+    # Convert duration to milliseconds
+    duration_ms = int(duration * 1000)
+    return _pointer_actions(
+        [
+            {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": duration_ms},
+            {"type": "pointerUp", "button": 0},
+        ]
+    )
+
+
+def swipe_duration(start_x: int, start_y: int, end_x: int, end_y: int) -> float:
+    """Default swipe duration in seconds, based on the swipe distance."""
+    dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+    duration = dist_sq / 1000000  # Convert to seconds
+    return max(0.3, min(duration, 2.0))  # Clamp between 0.3-2 seconds
+
+
+def swipe_payload(
+    start_x: int, start_y: int, end_x: int, end_y: int, duration: float
+) -> dict:
+    """WDA dragfromtoforduration request body for a swipe."""
+    return {
+        "fromX": start_x / SCALE_FACTOR,
+        "fromY": start_y / SCALE_FACTOR,
+        "toX": end_x / SCALE_FACTOR,
+        "toY": end_y / SCALE_FACTOR,
+        "duration": duration,
+    }
+
+
+# Swipe from the left edge, used as the back gesture
+BACK_GESTURE = {
+    "fromX": 0,
+    "fromY": 640,
+    "toX": 400,
+    "toY": 640,
+    "duration": 0.3,
+}
+
+
+def app_name_for_bundle(bundle_id: str) -> str:
+    """
+    Map a bundle ID to its app name.
+
+    Args:
+        bundle_id: iOS bundle identifier.
+
+    Returns:
+        The app name if recognized, otherwise "System Home".
+    """
+    for app_name, package in APP_PACKAGES.items():
+        if package == bundle_id:
+            return app_name
+    return "System Home"
+
+
+def _wait_for_settle(delay: float, wda_url: str, session_id: str | None) -> None:
+    """Wait after an action, adaptively if screen-settle detection is enabled."""
+    wait_for_settle(delay, lambda: get_settle_frame(wda_url, session_id))
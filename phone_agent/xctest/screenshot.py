@@ -1,24 +1,14 @@
 """Screenshot utilities for capturing iOS device screen."""
 
-import base64
 import os
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 
 from PIL import Image
 
-
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+from phone_agent.screenshot import Screenshot
 
 
 def get_screenshot(
@@ -37,7 +27,7 @@ def get_screenshot(
         timeout: Timeout in seconds for screenshot operations.
 
     Returns:
-        Screenshot object containing base64 data and dimensions.
+        Screenshot object containing the image data and dimensions.
 
     Note:
         Tries WebDriverAgent first, falls back to idevicescreenshot if available.
@@ -83,17 +73,8 @@ def _get_screenshot_wda(
             base64_data = data.get("value", "")
 
             if base64_data:
-                # Decode to get dimensions
-                img_data = base64.b64decode(base64_data)
-                img = Image.open(BytesIO(img_data))
-                width, height = img.size
-
-                return Screenshot(
-                    base64_data=base64_data,
-                    width=width,
-                    height=height,
-                    is_sensitive=False,
-                )
+                # Keep WDA's base64 string for the upload; decode for dimensions
+                return Screenshot.from_base64(base64_data)
 
     except ImportError:
         print("Note: requests library not installed. Install: pip install requests")
@@ -103,6 +84,31 @@ def _get_screenshot_wda(
     return None
 
 
+def get_settle_frame(
+    wda_url: str = "http://localhost:8100",
+    session_id: str | None = None,
+    timeout: int = 5,
+) -> Image.Image | None:
+    """
+    Capture a frame for screen-settle detection through WebDriverAgent.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        session_id: Optional WDA session ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        PIL image of the screen, or None if it could not be captured.
+    """
+    screenshot = _get_screenshot_wda(wda_url, session_id, timeout)
+    if screenshot is None:
+        return None
+
+    img = Image.open(BytesIO(screenshot.data))
+    img.draft("L", (screenshot.width // 8, screenshot.height // 8))
+    return img
+
+
 def _get_screenshot_idevice(
     device_id: str | None, timeout: int
 ) -> Screenshot | None:
@@ -131,20 +137,14 @@ def _get_screenshot_idevice(
         )
 
         if result.returncode == 0 and os.path.exists(temp_path):
-            # Read and encode image
-            img = Image.open(temp_path)
-            width, height = img.size
-
-            buffered = BytesIO()
-            img.save(buffered, format="PNG")
-            base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            # Read image as captured, without re-encoding
+            with open(temp_path, "rb") as f:
+                data = f.read()
 
             # Cleanup
             os.remove(temp_path)
 
-            return Screenshot(
-                base64_data=base64_data, width=width, height=height, is_sensitive=False
-            )
+            return Screenshot.from_bytes(data)
 
     except FileNotFoundError:
         print(
@@ -169,17 +169,7 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     # Default iPhone screen size (iPhone 14 Pro)
     default_width, default_height = 1179, 2556
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return Screenshot.blank(default_width, default_height, is_sensitive)
 
 
 def save_screenshot(
@@ -197,8 +187,7 @@ def save_screenshot(
         True if successful, False otherwise.
     """
     try:
-        img_data = base64.b64decode(screenshot.base64_data)
-        img = Image.open(BytesIO(img_data))
+        img = Image.open(BytesIO(screenshot.data))
         img.save(file_path)
         return True
     except Exception as e:
@@ -223,8 +212,4 @@ def get_screenshot_png(
         PNG bytes or None if failed.
     """
     screenshot = get_screenshot(wda_url, session_id, device_id)
-
-    try:
-        return base64.b64decode(screenshot.base64_data)
-    except Exception:
-        return None
+    return screenshot.data or None
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark driving a fleet of devices from threads versus one event loop.
+
+Each simulated device runs a number of agent-like steps (a tap followed by a
+screenshot). The synchronous API is driven sequentially and with one thread
+per device; the async API (phone_agent.adb.aio) is driven by a single event
+loop, both with the adb binary and with the adb server socket transport. The
+devices are served by the fake adb (scripts/fake_adb.py) and the fake adb
+server (scripts/fake_adb_server.py), so no phone is needed.
+
+Usage examples:
+  python scripts/benchmark_async_devices.py
+  python scripts/benchmark_async_devices.py --devices 32 --steps 5 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_adb  # noqa: E402
+from fake_adb_server import SERIAL, FakeADBServer  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from phone_agent.adb import protocol as adb_protocol  # noqa: E402
+from phone_agent.adb import set_persistent_shell  # noqa: E402
+from phone_agent.config.timing import TIMING_CONFIG  # noqa: E402
+from phone_agent.device_factory import (  # noqa: E402
+    AsyncDeviceFactory,
+    DeviceFactory,
+    DeviceType,
+)
+
+
+def sync_steps(factory: DeviceFactory, device_id: str, steps: int) -> None:
+    """Run the steps of one device with the synchronous API."""
+    for _ in range(steps):
+        factory.tap(540, 1200, device_id, delay=0)
+        factory.get_screenshot(device_id)
+
+
+async def async_steps(factory: AsyncDeviceFactory, device_id: str, steps: int) -> None:
+    """Run the steps of one device with the async API."""
+    for _ in range(steps):
+        await factory.tap(540, 1200, device_id, delay=0)
+        await factory.get_screenshot(device_id)
+
+
+def run_sequential(devices: list[str], steps: int) -> float:
+    factory = DeviceFactory(DeviceType.ADB)
+    start = time.perf_counter()
+    for device_id in devices:
+        sync_steps(factory, device_id, steps)
+    return time.perf_counter() - start
+
+
+def run_threads(devices: list[str], steps: int) -> float:
+    factory = DeviceFactory(DeviceType.ADB)
+    threads = [
+        threading.Thread(target=sync_steps, args=(factory, device_id, steps))
+        for device_id in devices
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_event_loop(devices: list[str], steps: int) -> float:
+    factory = AsyncDeviceFactory(DeviceType.ADB)
+
+    async def main() -> None:
+        await asyncio.gather(
+            *(async_steps(factory, device_id, steps) for device_id in devices)
+        )
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark driving many devices from one event loop",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--devices", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Simulated per-command adb latency in seconds",
+    )
+    args = parser.parse_args()
+
+    TIMING_CONFIG.settle.enabled = False
+    set_persistent_shell(False)
+    devices = [f"{SERIAL}-{i}" for i in range(args.devices)]
+    operations = args.devices * args.steps * 2
+
+    with tempfile.TemporaryDirectory() as workdir:
+        frame = os.path.join(workdir, "frame.png")
+        Image.new("RGB", (1080, 2400), color=(30, 144, 255)).save(frame)
+        fake_adb.install(workdir, frame, args.latency)
+
+        server = FakeADBServer(frame, os.path.join(workdir, "device"))
+        server.start()
+        adb_protocol.get_client().port = server.port
+
+        print(
+            f"{args.devices} devices x {args.steps} steps (tap + screenshot), "
+            f"{args.latency * 1000:.0f} ms per adb command"
+        )
+        print("-" * 60)
+
+        rows = [
+            ("sync, sequential", "binary", run_sequential),
+            ("sync, thread/device", "binary", run_threads),
+            ("async, one loop", "binary", run_event_loop),
+            ("async, one loop", "socket", run_event_loop),
+        ]
+        for name, transport, runner in rows:
+            adb_protocol.set_adb_transport(transport)
+            elapsed = runner(devices, args.steps)
+            print(
+                f"{name:<20} {transport:<7} {elapsed:8.2f} s   "
+                f"{operations / elapsed:8.1f} ops/s"
+            )
+
+        server.stop()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark foreground-app parsing on recorded `dumpsys window` output.
+
+Compares the legacy parser (scan every line of the full dump, loop over every
+entry of APP_PACKAGES per focus line) against the reverse package index, both
+on the full dump and on the focus lines the device now sends back after
+filtering with grep.
+
+Record a dump from a device with:
+  adb shell dumpsys window > dumpsys_window.txt
+
+Usage examples:
+  python scripts/benchmark_current_app.py --dump dumpsys_window.txt
+  python scripts/benchmark_current_app.py --windows 200 --app 美团
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.adb.device import parse_current_app  # noqa: E402
+from phone_agent.config.apps import APP_PACKAGES  # noqa: E402
+
+
+def legacy_parse(output: str) -> str:
+    """The previous parser, kept as the baseline."""
+    for line in output.split("\n"):
+        if "mCurrentFocus" in line or "mFocusedApp" in line:
+            for app_name, package in APP_PACKAGES.items():
+                if package in line:
+                    return app_name
+    return "System Home"
+
+
+def synthesize_dump(windows: int, package: str) -> str:
+    """Build a dump shaped like `dumpsys window`, with focus lines at the end."""
+    lines = ["WINDOW MANAGER POLICY STATE (dumpsys window policy)"]
+    lines += [f"    mPolicyFlag{i}=false" for i in range(200)]
+    lines.append("WINDOW MANAGER WINDOWS (dumpsys window windows)")
+    for i in range(windows):
+        owner = "com.android.systemui" if i % 3 else f"com.example.app{i}"
+        lines += [
+            f"  Window #{i} Window{{{i:07x} u0 {owner}/{owner}.Main}}:",
+            f"    mDisplayId=0 rootTaskId={i} mSession=Session{{{i:x} 1234:u0a10{i}}}",
+            "    mOwnerUid=10123 showForAllUsers=false package=" + owner,
+            "    mAttrs={(0,0)(fillxfill) sim={adjust=resize} ty=BASE_APPLICATION}",
+            "    Requested w=1080 h=2400 mLayoutSeq=1234",
+            "    mHasSurface=true isReadyForDisplay()=true mWindowRemovalAllowed=false",
+            "    Frames: parent=[0,0][1080,2400] display=[0,0][1080,2400]",
+            "    mForceSeamlesslyRotate=false seamlesslyRotate: pending=null",
+            "    isOnScreen=true isVisible=true",
+        ]
+    lines += [
+        "",
+        f"  mCurrentFocus=Window{{4f3c2a1 u0 {package}/{package}.MainActivity}}",
+        f"  mFocusedApp=ActivityRecord{{9e8d7c6 u0 {package}/.MainActivity t42}}",
+        "  mInputMethodTarget=null",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def time_parser(parse, output: str, iterations: int) -> list[float]:
+    """Time a parser, returning per-call latencies in microseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parse(output)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark foreground-app parsing",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--dump", type=str, help="Recorded dumpsys window output")
+    parser.add_argument("--windows", type=int, default=150)
+    parser.add_argument("--app", type=str, default="美团", help="Foreground app")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.dump:
+        with open(args.dump, encoding="utf-8", errors="replace") as f:
+            full = f.read()
+    else:
+        full = synthesize_dump(args.windows, APP_PACKAGES[args.app])
+    filtered = "".join(
+        line + "\n"
+        for line in full.split("\n")
+        if "mCurrentFocus" in line or "mFocusedApp" in line
+    )
+
+    expected = legacy_parse(full)
+    print(f"Foreground app: {expected}")
+    if parse_current_app(full) != expected or parse_current_app(filtered) != expected:
+        # The legacy parser matched packages as substrings of the whole line
+        print(f"Note: index parser found {parse_current_app(full)}")
+    print(
+        f"Full dump: {len(full.encode())} bytes   filtered: {len(filtered.encode())} bytes"
+    )
+    print("-" * 60)
+
+    rows = [
+        ("legacy, full dump", legacy_parse, full),
+        ("index, full dump", parse_current_app, full),
+        ("index, filtered", parse_current_app, filtered),
+    ]
+    baseline = None
+    for name, parse, output in rows:
+        median = statistics.median(time_parser(parse, output, args.iterations))
+        baseline = baseline or median
+        print(f"{name:<20} p50 {median:10.1f} us   {baseline / median:8.1f}x")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark task throughput of a device fleet against a single device.
+
+Runs the same task queue through phone_agent.fleet.Fleet with one device and
+with the whole fleet, and reports tasks/hour and the utilisation of each
+device. The devices are served by the fake adb server
+(scripts/fake_adb_server.py) and the model by the fake OpenAI server
+(scripts/fake_openai_server.py), whose reply is a swipe, so every task runs
+for --steps steps. No phone or GPU is needed.
+
+Usage examples:
+  python scripts/benchmark_fleet.py
+  python scripts/benchmark_fleet.py --devices 16 --tasks 64 --action-delay 0.5
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_adb  # noqa: E402
+from fake_adb_server import SERIAL, FakeADBServer  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from phone_agent.adb import protocol as adb_protocol  # noqa: E402
+from phone_agent.agent import AgentConfig  # noqa: E402
+from phone_agent.config.timing import TIMING_CONFIG  # noqa: E402
+from phone_agent.fleet import Fleet  # noqa: E402
+from phone_agent.model import ModelConfig  # noqa: E402
+
+FOCUS_LINE = "  mCurrentFocus=Window{1 u0 com.android.settings/.Settings}"
+
+
+def run(devices: list[str], base_url: str, tasks: int, steps: int) -> dict:
+    """Run the task queue on the given devices; return the fleet stats."""
+    fleet = Fleet(
+        devices,
+        ModelConfig(base_url=base_url),
+        AgentConfig(max_steps=steps, verbose=False),
+    )
+    return fleet.run(f"Task {i}" for i in range(tasks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark running a task queue on a fleet of devices",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=3, help="Steps per task")
+    parser.add_argument(
+        "--action-delay",
+        type=float,
+        default=0.2,
+        help="Seconds the device takes to carry out an action",
+    )
+    parser.add_argument("--decode-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    TIMING_CONFIG.settle.enabled = False
+    TIMING_CONFIG.device.default_swipe_delay = args.action_delay
+    adb_protocol.set_adb_transport("socket")
+    devices = [f"{SERIAL}-{i}" for i in range(args.devices)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        frame = os.path.join(workdir, "frame.png")
+        Image.new("RGB", (1080, 2400), color=(30, 144, 255)).save(frame)
+        fake_adb.install(workdir, frame)
+        # The fake device shell runs local commands; answer the app query
+        dumpsys = os.path.join(workdir, "dumpsys")
+        with open(dumpsys, "w") as f:
+            f.write(f"#!/bin/sh\necho '{FOCUS_LINE}'\n")
+        os.chmod(dumpsys, 0o755)
+
+        adb_server = FakeADBServer(frame, os.path.join(workdir, "device"))
+        adb_server.start()
+        adb_protocol.get_client().port = adb_server.port
+        model_server = FakeOpenAIServer(decode_ms=args.decode_ms)
+        model_server.start()
+
+        print(
+            f"{args.tasks} tasks x {args.steps} steps, "
+            f"{args.action_delay * 1000:.0f} ms per action"
+        )
+        print(f"{'devices':<10}{'elapsed s':>11}{'tasks/hour':>12}{'utilisation':>13}")
+        print("-" * 46)
+        for fleet_devices in (devices[:1], devices):
+            # Only the summary table is wanted, not the per-step output
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                stats = run(
+                    fleet_devices, model_server.base_url, args.tasks, args.steps
+                )
+            finally:
+                sys.stdout = stdout
+            print(
+                f"{len(fleet_devices):<10}{stats['elapsed']:>11.2f}"
+                f"{stats['tasks_per_hour']:>12.0f}{stats['utilisation']:>13.0%}"
+            )
+        print()
+        print(
+            "Tasks per device:", " / ".join(str(d["tasks"]) for d in stats["devices"])
+        )
+
+        model_server.stop()
+        adb_server.stop()
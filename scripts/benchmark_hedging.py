@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark hedged model requests against tail latency.
+
+Starts fake OpenAI-compatible servers (scripts/fake_openai_server.py) where
+a small fraction of requests stall before their first token, as a replica
+does during a GC pause or a long queue. The same load is sent through
+ModelClient without hedging and with hedging at a few percentiles. For each
+setting it reports the TTFT percentiles seen by the caller, the hedge and
+win rates, and the extra load the duplicates put on the servers.
+
+The first requests of every run only fill the TTFT window the hedge delay
+is taken from; they are not measured.
+
+Usage examples:
+  python scripts/benchmark_hedging.py
+  python scripts/benchmark_hedging.py --percentiles 90 99 --slow-rate 0.02
+  python scripts/benchmark_hedging.py --async --concurrency 16
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+from phone_agent.model import AsyncModelClient, ModelClient, ModelConfig  # noqa: E402
+from phone_agent.model.client import HEDGE_MIN_SAMPLES, MessageBuilder  # noqa: E402
+
+MESSAGES = [MessageBuilder.create_user_message("Open Settings")]
+
+
+def run_sync(client: ModelClient, requests: int, concurrency: int) -> list[float]:
+    """Send the load from threads; return the TTFT of every request."""
+    with ThreadPoolExecutor(concurrency) as executor:
+        responses = executor.map(lambda _: client.request(MESSAGES), range(requests))
+        return [r.time_to_first_token for r in responses]
+
+
+async def run_async(
+    client: AsyncModelClient, requests: int, concurrency: int
+) -> list[float]:
+    """Send the load from tasks; return the TTFT of every request."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            response = await client.request(MESSAGES, echo=False)
+        return response.time_to_first_token
+
+    return await asyncio.gather(*(one() for _ in range(requests)))
+
+
+async def warm_up_and_run_async(
+    client: AsyncModelClient, requests: int, concurrency: int
+) -> list[float]:
+    """Fill the TTFT window, then measure, on one event loop."""
+    await run_async(client, HEDGE_MIN_SAMPLES, concurrency)
+    return await run_async(client, requests, concurrency)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """The p-th percentile of values, in milliseconds."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark hedged model requests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=400)
+    parser.add_argument(
+        "--percentiles", type=float, nargs="+", default=[90, 95], help="Hedge at"
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        f"{args.replicas} replicas, {args.slow_rate:.0%} of requests stall "
+        f"{args.slow_ms:g} ms, {args.requests} requests, "
+        f"{args.concurrency} concurrent, {'async' if args.use_async else 'sync'} client"
+    )
+    print(
+        f"{'hedging':<10}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'max ms':>8}"
+        f"{'hedged':>8}{'won':>6}{'server load':>13}"
+    )
+    print("-" * 69)
+    for hedge_percentile in [None, *args.percentiles]:
+        servers = [
+            FakeOpenAIServer(
+                decode_ms=1, slow_rate=args.slow_rate, slow_ms=args.slow_ms
+            )
+            for _ in range(args.replicas)
+        ]
+        for server in servers:
+            server.start()
+
+        config = ModelConfig(
+            base_urls=[server.base_url for server in servers],
+            hedge_percentile=hedge_percentile,
+        )
+        # Only the summary table is wanted, not the streamed thinking
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            if args.use_async:
+                client = AsyncModelClient(config)
+                ttfts = asyncio.run(
+                    warm_up_and_run_async(client, args.requests, args.concurrency)
+                )
+            else:
+                client = ModelClient(config)
+                run_sync(client, HEDGE_MIN_SAMPLES, args.concurrency)
+                ttfts = run_sync(client, args.requests, args.concurrency)
+        finally:
+            sys.stdout = stdout
+
+        stats = client.hedge_stats()
+        sent = sum(server.requests for server in servers)
+        load = sent / (args.requests + HEDGE_MIN_SAMPLES)
+        name = "off" if hedge_percentile is None else f"p{hedge_percentile:g}"
+        print(
+            f"{name:<10}{percentile(ttfts, 50):>8.1f}{percentile(ttfts, 95):>8.1f}"
+            f"{percentile(ttfts, 99):>8.1f}{max(ttfts) * 1000:>8.1f}"
+            f"{stats['hedge_rate']:>8.1%}{stats['win_rate']:>6.0%}{load:>12.2f}x"
+        )
+
+        for server in servers:
+            server.stop()
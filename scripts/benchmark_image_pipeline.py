@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark model-input image preprocessing settings.
+
+For each setting, reports the upload size, the host-side preprocessing time
+and, when a model endpoint is given, the end-to-end latency of one agent-style
+request (prompt + screenshot) through ModelClient.
+
+Usage examples:
+  python scripts/benchmark_image_pipeline.py --image screen.png
+  python scripts/benchmark_image_pipeline.py --device-id emulator-5554
+  python scripts/benchmark_image_pipeline.py --image screen.png \\
+      --base-url http://localhost:8000/v1 --model autoglm-phone-9b
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.config import get_system_prompt  # noqa: E402
+from phone_agent.model import ModelClient, ModelConfig  # noqa: E402
+from phone_agent.model.client import MessageBuilder  # noqa: E402
+from phone_agent.screenshot import Screenshot  # noqa: E402
+
+SETTINGS = [
+    ("original", {}),
+    ("png 1280", {"image_max_long_edge": 1280, "image_format": "png"}),
+    ("jpeg q85", {"image_format": "jpeg", "image_quality": 85}),
+    ("jpeg 1280 q85", {"image_max_long_edge": 1280, "image_format": "jpeg"}),
+    (
+        "jpeg 1024 q75",
+        {"image_max_long_edge": 1024, "image_format": "jpeg", "image_quality": 75},
+    ),
+    (
+        "webp 1280 q80",
+        {"image_max_long_edge": 1280, "image_format": "webp", "image_quality": 80},
+    ),
+    (
+        "jpeg 1M px gray",
+        {
+            "image_max_pixels": 1_000_000,
+            "image_format": "jpeg",
+            "image_grayscale": True,
+        },
+    ),
+]
+
+
+def load_screenshot(args: argparse.Namespace) -> Screenshot:
+    """Load the benchmark screenshot from a file or a connected device."""
+    if args.image:
+        with open(args.image, "rb") as f:
+            return Screenshot.from_bytes(f.read())
+
+    from phone_agent.device_factory import DeviceFactory, DeviceType
+
+    factory = DeviceFactory(DeviceType(args.device_type))
+    return factory.get_screenshot(args.device_id)
+
+
+def time_request(config: ModelConfig, image: Screenshot, lang: str) -> float:
+    """Send one first-step request and return its total latency in seconds."""
+    client = ModelClient(config)
+    messages = [
+        MessageBuilder.create_system_message(get_system_prompt(lang)),
+        MessageBuilder.create_user_message(
+            text='打开设置\n\n{"current_app": "System Home"}', image=image
+        ),
+    ]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.request(messages)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark model-input image preprocessing settings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--image", type=str, help="Screenshot file to use")
+    parser.add_argument("--device-id", type=str, default=None)
+    parser.add_argument("--device-type", choices=["adb", "hdc"], default="adb")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--base-url", type=str, help="Model API for end-to-end timing")
+    parser.add_argument("--apikey", type=str, default="EMPTY")
+    parser.add_argument("--model", type=str, default="autoglm-phone-9b")
+    parser.add_argument("--lang", choices=["cn", "en"], default="cn")
+    args = parser.parse_args()
+
+    screenshot = load_screenshot(args)
+    print(
+        f"Input: {screenshot.width}x{screenshot.height} {screenshot.mime_type}, "
+        f"{len(screenshot.data)} bytes"
+    )
+    print("-" * 78)
+    header = f"{'setting':<18}{'size':>11}{'upload bytes':>14}{'encode ms':>11}"
+    if args.base_url:
+        header += f"{'step s':>10}"
+    print(header)
+
+    for name, overrides in SETTINGS:
+        config = ModelConfig(
+            base_url=args.base_url or "http://localhost:8000/v1",
+            api_key=args.apikey,
+            model_name=args.model,
+            lang=args.lang,
+            **overrides,
+        )
+        client = ModelClient(config)
+
+        encode_times = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            image = client.prepare_image(screenshot)
+            upload = image.data_url
+            encode_times.append((time.perf_counter() - start) * 1000)
+            # Drop the cached base64 so the next iteration pays for it again
+            image.__dict__.pop("base64_data", None)
+
+        line = (
+            f"{name:<18}{f'{image.width}x{image.height}':>11}"
+            f"{len(upload):>14}{statistics.median(encode_times):>11.1f}"
+        )
+        if args.base_url:
+            line += f"{time_request(config, image, args.lang):>10.2f}"
+        print(line)
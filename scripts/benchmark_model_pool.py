@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark routing and failover across several model replicas.
+
+Starts fake OpenAI-compatible servers (scripts/fake_openai_server.py) with
+different latencies, one of which fails in the middle of the run, and sends
+the same concurrent load through ModelClient with each routing policy. For
+each policy it reports the TTFT percentiles, the requests that failed, the
+ones that were retried on another replica, and how the requests were spread
+over the replicas.
+
+Usage examples:
+  python scripts/benchmark_model_pool.py
+  python scripts/benchmark_model_pool.py --requests 200 --concurrency 16
+  python scripts/benchmark_model_pool.py --latency-ms 20 20 150 --failure drop
+  python scripts/benchmark_model_pool.py --failure stall --first-token-timeout 0.5
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import FAILURES, FakeOpenAIServer  # noqa: E402
+
+from phone_agent.model import ModelClient, ModelConfig  # noqa: E402
+from phone_agent.model.client import MessageBuilder  # noqa: E402
+from phone_agent.model.pool import ROUTING_POLICIES  # noqa: E402
+
+
+def run(
+    client: ModelClient,
+    servers: list[FakeOpenAIServer],
+    requests: int,
+    concurrency: int,
+    failure: str,
+) -> tuple[list[float], int, int]:
+    """
+    Send the load; the first replica fails for the middle third of it.
+
+    Returns:
+        Tuple of (TTFT of the successful requests, failed requests, requests
+        that needed more than one attempt).
+    """
+    messages = [MessageBuilder.create_user_message("Open Settings")]
+    ttfts: list[float] = []
+    failed = retried = 0
+    done = 0
+    lock = threading.Lock()
+
+    def one(_: int) -> None:
+        nonlocal failed, retried, done
+        try:
+            response = client.request(messages)
+        except Exception:
+            with lock:
+                failed += 1
+        else:
+            with lock:
+                ttfts.append(response.time_to_first_token or 0.0)
+                retried += response.attempts > 1
+        with lock:
+            done += 1
+            if done == requests // 3:
+                servers[0].failure = failure
+            elif done == 2 * requests // 3:
+                servers[0].failure = None
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    return ttfts, failed, retried
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark load balancing and failover across model replicas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        nargs="+",
+        default=[10, 10, 80],
+        help="Extra time to first token of each replica",
+    )
+    parser.add_argument("--failure", choices=FAILURES, default="reset")
+    parser.add_argument("--eject-seconds", type=float, default=0.5)
+    parser.add_argument("--first-token-timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(
+        f"{len(args.latency_ms)} replicas (extra TTFT "
+        f"{', '.join(f'{ms:g}' for ms in args.latency_ms)} ms), "
+        f"{args.requests} requests, {args.concurrency} concurrent, "
+        f"replica 1 fails ('{args.failure}') for the middle third"
+    )
+    print(
+        f"{'routing':<19}{'p50 ms':>8}{'p95 ms':>8}{'failed':>8}{'retried':>9}"
+        f"  requests per replica"
+    )
+    print("-" * 72)
+    for routing in ROUTING_POLICIES:
+        servers = [
+            FakeOpenAIServer(decode_ms=1, latency_ms=ms) for ms in args.latency_ms
+        ]
+        for server in servers:
+            server.start()
+
+        client = ModelClient(
+            ModelConfig(
+                base_urls=[server.base_url for server in servers],
+                routing=routing,
+                eject_seconds=args.eject_seconds,
+                first_token_timeout=args.first_token_timeout,
+            )
+        )
+        # Only the summary table is wanted, not the streamed thinking
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            ttfts, failed, retried = run(
+                client, servers, args.requests, args.concurrency, args.failure
+            )
+        finally:
+            sys.stdout = stdout
+
+        ttfts.sort()
+        p50 = statistics.median(ttfts) * 1000 if ttfts else float("nan")
+        p95 = ttfts[int(len(ttfts) * 0.95)] * 1000 if ttfts else float("nan")
+        spread = " / ".join(str(server.requests) for server in servers)
+        print(f"{routing:<19}{p50:>8.1f}{p95:>8.1f}{failed:>8}{retried:>9}  {spread}")
+
+        for server in servers:
+            server.stop()
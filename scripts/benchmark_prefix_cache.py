@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark how well agent prompts reuse the server's prefix cache.
+
+Runs a simulated task twice, as if on two consecutive days, building each
+step's prompt the way PhoneAgent does (system prompt, task, screen info,
+screenshot, context budget) and sending it through ModelClient. For every
+step it records the time to first token and the prompt tokens the server
+reports as cached.
+
+Two prompt layouts are compared:
+  dated, refold   system prompt starting with the date, context re-folded
+                  to the budget on every step
+  stable prefix   undated system prompt (date in the task message), context
+                  folded in batches (ContextManager's default)
+
+Without --base-url, each layout gets a fresh fake server
+(scripts/fake_openai_server.py) that simulates prefill time and prefix
+caching. A real vLLM/SGLang server needs automatic prefix caching enabled
+(and --enable-prompt-tokens-details on vLLM to report cached tokens); its
+cache is not reset between layouts.
+
+Usage examples:
+  python scripts/benchmark_prefix_cache.py
+  python scripts/benchmark_prefix_cache.py --steps 50 --budget 5000
+  python scripts/benchmark_prefix_cache.py --base-url http://localhost:8000/v1
+"""
+
+import argparse
+import datetime
+import io
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from phone_agent.config import get_date_prompt, get_system_prompt  # noqa: E402
+from phone_agent.model import ContextManager, ModelClient, ModelConfig  # noqa: E402
+from phone_agent.model.client import MessageBuilder  # noqa: E402
+from phone_agent.screenshot import Screenshot  # noqa: E402
+
+LAYOUTS = [
+    ("dated, refold", {"stable_prefix": False, "fold_to": 1.0}),
+    ("stable prefix", {"stable_prefix": True, "fold_to": 0.75}),
+]
+APPS = ["System Home", "Settings", "WeChat", "Taobao"]
+
+
+def date_prompt(lang: str, day: int) -> str:
+    """Date line of the system prompt, `day` days from today."""
+    label = get_date_prompt(lang).split(": ", 1)[0]
+    date = datetime.date.today() + datetime.timedelta(days=day)
+    return f"{label}: {date.isoformat()}"
+
+
+def screenshot(step: int) -> Screenshot:
+    """Small synthetic screenshot, different on every step."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (108, 240), color=(step * 37 % 256, 90, 160)).save(buffer, "PNG")
+    return Screenshot.from_bytes(buffer.getvalue())
+
+
+def run_task(
+    client: ModelClient,
+    task: str,
+    steps: int,
+    day: int,
+    lang: str,
+    budget: int | None,
+    stable_prefix: bool,
+    fold_to: float,
+) -> list[tuple[float, int | None, int | None]]:
+    """Run one simulated task; return (TTFT, prompt, cached tokens) per step."""
+    system_prompt = get_system_prompt(lang, include_date=False)
+    if not stable_prefix:
+        system_prompt = f"{date_prompt(lang, day)}\n{system_prompt}"
+    context_manager = ContextManager(budget, keep_turns=4, fold_to=fold_to)
+
+    context = [MessageBuilder.create_system_message(system_prompt)]
+    results = []
+    for step in range(1, steps + 1):
+        screen_info = MessageBuilder.build_screen_info(APPS[step % len(APPS)])
+        if step == 1:
+            text = f"{task}\n\n{screen_info}"
+            if stable_prefix:
+                text = f"{date_prompt(lang, day)}\n{text}"
+        else:
+            text = f"** Screen Info **\n\n{screen_info}"
+        context.append(
+            MessageBuilder.create_user_message(text=text, image=screenshot(step))
+        )
+
+        response = client.request(context_manager.fit(context))
+        results.append(
+            (
+                response.time_to_first_token,
+                response.prompt_tokens,
+                response.cached_tokens,
+            )
+        )
+
+        context[-1] = MessageBuilder.remove_images_from_message(context[-1])
+        context.append(
+            MessageBuilder.create_assistant_message(
+                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
+            )
+        )
+    return results
+
+
+def summarize(name: str, day: int, results: list) -> None:
+    """Print TTFT of the first and later steps and the cache hit rate."""
+    first = results[0][0] * 1000
+    later = statistics.mean(r[0] for r in results[1:]) * 1000
+    reported = [(p, c) for _, p, c in results if p and c is not None]
+    if reported:
+        hits = sum(c for _, c in reported) / sum(p for p, _ in reported)
+        hit_rate = f"{hits:>9.0%}"
+    else:
+        hit_rate = f"{'n/a':>9}"
+    print(f"{name:<16}{day + 1:>4}{first:>13.1f}{later:>15.1f}{hit_rate}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark prompt prefix-cache reuse across agent steps",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--base-url", type=str, help="Model API (default: fake)")
+    parser.add_argument("--apikey", type=str, default="EMPTY")
+    parser.add_argument("--model", type=str, default="autoglm-phone-9b")
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--budget", type=int, default=3000, help="Context budget")
+    parser.add_argument("--lang", choices=["cn", "en"], default="en")
+    parser.add_argument(
+        "--task", type=str, default="Open Settings and turn on dark mode"
+    )
+    args = parser.parse_args()
+
+    print(f"{args.steps} steps per task, context budget {args.budget} tokens")
+    print(
+        f"{'layout':<16}{'day':>4}{'step 1 TTFT':>13}{'step 2+ TTFT':>15}{'cached':>9}"
+    )
+    print("-" * 57)
+    for name, layout in LAYOUTS:
+        server = None
+        base_url = args.base_url
+        if base_url is None:
+            server = FakeOpenAIServer(decode_ms=2)
+            server.start()
+            base_url = server.base_url
+
+        client = ModelClient(
+            ModelConfig(
+                base_url=base_url,
+                api_key=args.apikey,
+                model_name=args.model,
+                lang=args.lang,
+                report_usage=True,
+            )
+        )
+        # Only the metrics table is wanted, not the streamed thinking
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            # Connection setup and lazy imports are not part of step 1
+            client.request([MessageBuilder.create_user_message("ping")])
+            days = [
+                run_task(
+                    client, args.task, args.steps, day, args.lang, args.budget, **layout
+                )
+                for day in range(2)
+            ]
+        finally:
+            sys.stdout = stdout
+        for day, results in enumerate(days):
+            summarize(name, day, results)
+
+        if server is not None:
+            server.stop()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark ADB screenshot capture paths.
+
+Compares the raw framebuffer path and the in-memory `exec-out` PNG path against
+the legacy `screencap` + `pull` path. By default a fake `adb` stand-in (scripts/fake_adb.py) serves a synthetic
+frame, so the numbers isolate host-side overhead; pass --real to benchmark a
+connected device instead. The fake serves a pre-encoded PNG, so it does not
+charge exec-out for on-device compression, which is what raw mode avoids.
+
+Usage examples:
+  python scripts/benchmark_screenshot.py
+  python scripts/benchmark_screenshot.py --latency 0.05 --iterations 30
+  python scripts/benchmark_screenshot.py --real --device-id emulator-5554
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image  # noqa: E402
+
+from phone_agent.adb import screenshot as adb_screenshot  # noqa: E402
+
+
+def make_frame(path: str, width: int = 1080, height: int = 2400) -> None:
+    """Write a synthetic screen-like PNG with flat regions and some detail."""
+    img = Image.new("RGB", (width, height), color=(245, 245, 245))
+    pixels = img.load()
+    for y in range(0, height, 120):
+        for x in range(width):
+            for dy in range(40):
+                pixels[x, y + dy] = ((x * 7) % 256, (y // 3) % 256, (x + y) % 256)
+    img.save(path, format="PNG")
+
+
+def run(capture, iterations: int) -> list[float]:
+    """Time a capture callable, returning per-call latencies in milliseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        screenshot = capture()
+        timings.append((time.perf_counter() - start) * 1000)
+        if screenshot is None or screenshot.width == 0:
+            raise RuntimeError("Capture failed")
+    return timings
+
+
+def capture_with(method: str, device_id: str | None):
+    """Capture callable for one in-memory method (a CAPTURE_COMMANDS key)."""
+
+    def capture():
+        command = adb_screenshot.CAPTURE_COMMANDS[method]
+        data, stderr = adb_screenshot._exec_out(device_id, command, 10)
+        return adb_screenshot.parse_capture(method, data, stderr)
+
+    return capture
+
+
+def report(name: str, timings: list[float]) -> None:
+    """Print latency summary for one capture path."""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<10} mean {statistics.mean(timings):8.1f} ms   "
+        f"p50 {statistics.median(timings):8.1f} ms   p95 {p95:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark ADB screenshot capture paths",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.03,
+        help="Simulated per-adb-invocation latency in seconds (fake adb only)",
+    )
+    parser.add_argument(
+        "--real", action="store_true", help="Use the real adb binary and device"
+    )
+    parser.add_argument("--device-id", type=str, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.real:
+            import fake_adb
+
+            frame = os.path.join(workdir, "frame.png")
+            make_frame(frame)
+            fake_adb.install(workdir, frame, latency=args.latency)
+            print(
+                f"Fake adb: {os.path.getsize(frame)} byte frame, "
+                f"{args.latency * 1000:.0f} ms per invocation"
+            )
+
+        print(f"Iterations: {args.iterations}")
+        print("-" * 60)
+
+        raw = run(capture_with("raw", args.device_id), args.iterations)
+        exec_out = run(capture_with("exec-out", args.device_id), args.iterations)
+        pull = run(
+            lambda: adb_screenshot._get_screenshot_pull(args.device_id, 10),
+            args.iterations,
+        )
+
+        report("raw", raw)
+        report("exec-out", exec_out)
+        report("pull", pull)
+        print("-" * 60)
+        for name, timings in (("raw", raw), ("exec-out", exec_out)):
+            speedup = statistics.mean(pull) / statistics.mean(timings)
+            print(f"Speedup over pull ({name}): {speedup:.2f}x")
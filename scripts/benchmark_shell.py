@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-command overhead of ADB shell commands.
+
+Compares one `adb shell` subprocess per command against a persistent shell
+session and against the adb server socket protocol. By default a fake `adb`
+stand-in (scripts/fake_adb.py) and a fake adb server
+(scripts/fake_adb_server.py) run the commands with the local `sh`, so the
+numbers isolate process and connection setup; pass --real to benchmark a
+connected device instead.
+
+Usage examples:
+  python scripts/benchmark_shell.py
+  python scripts/benchmark_shell.py --latency 0.05 --iterations 50
+  python scripts/benchmark_shell.py --real --device-id emulator-5554
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from phone_agent.adb import protocol as adb_protocol  # noqa: E402
+from phone_agent.adb import shell as adb_shell  # noqa: E402
+
+# Cheap command available on every device and on the fake adb
+COMMAND = ["echo", "ok"]
+
+
+def run(iterations: int, device_id: str | None, command: list[str]) -> list[float]:
+    """Time run_shell calls, returning per-call latencies in milliseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = adb_shell.run_shell(command, device_id, timeout=10)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"Command failed: {result.stdout}{result.stderr}")
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    """Print latency summary for one command path."""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<12} mean {statistics.mean(timings):8.2f} ms   "
+        f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark ADB shell command overhead",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.03,
+        help="Simulated per-adb-invocation latency in seconds (fake adb only)",
+    )
+    parser.add_argument(
+        "--real", action="store_true", help="Use the real adb binary and device"
+    )
+    parser.add_argument("--device-id", type=str, default=None)
+    parser.add_argument(
+        "--command",
+        type=str,
+        default=" ".join(COMMAND),
+        help="Shell command to time (e.g. 'input keyevent 0' on a real device)",
+    )
+    args = parser.parse_args()
+    command = args.command.split()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.real:
+            import fake_adb
+            from fake_adb_server import FakeADBServer
+
+            fake_adb.install(workdir, os.devnull, latency=args.latency)
+            print(f"Fake adb: {args.latency * 1000:.0f} ms per invocation")
+
+            server = FakeADBServer(os.devnull, workdir)
+            server.start()
+            adb_protocol._client = adb_protocol.ADBServerClient(port=server.port)
+
+        print(f"Command: {args.command}   Iterations: {args.iterations}")
+        print("-" * 64)
+
+        adb_shell.set_persistent_shell(False)
+        subprocess_timings = run(args.iterations, args.device_id, command)
+
+        adb_shell.set_persistent_shell(True)
+        start = time.perf_counter()
+        adb_shell.get_session(args.device_id).run("true", timeout=10)
+        setup_ms = (time.perf_counter() - start) * 1000
+        session_timings = run(args.iterations, args.device_id, command)
+        adb_shell.close_sessions()
+
+        adb_protocol.set_adb_transport("socket")
+        socket_timings = run(args.iterations, args.device_id, command)
+        adb_protocol.set_adb_transport("binary")
+
+        report("subprocess", subprocess_timings)
+        report("session", session_timings)
+        report("socket", socket_timings)
+        print("-" * 64)
+        print(f"Session setup (once): {setup_ms:.1f} ms")
+        for name, timings in (("session", session_timings), ("socket", socket_timings)):
+            speedup = statistics.mean(subprocess_timings) / statistics.mean(timings)
+            print(f"Speedup per command ({name}): {speedup:.1f}x")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming thinking/action splitter of ModelClient.
+
+Replays SSE streams through the splitter that ModelClient uses and through
+the previous implementation (string concatenation plus a prefix check of
+every marker per chunk), and checks that both split the stream the same way.
+Only the splitter is timed; the SSE lines are decoded beforehand.
+
+Without --sse, streams of several lengths are synthesized: thinking text
+followed by an action, cut into token-sized deltas. Record real streams with
+e.g. `curl -N <base-url>/chat/completions -d '{..., "stream": true}' > s.sse`.
+
+Usage examples:
+  python scripts/benchmark_stream_splitter.py
+  python scripts/benchmark_stream_splitter.py --lengths 1000 100000 --repeat 5
+  python scripts/benchmark_stream_splitter.py --sse step1.sse --sse step2.sse
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.model.client import _StreamSplitter  # noqa: E402
+
+THINKING = (
+    "The search page is open and the keyboard is shown. The first result "
+    "matches the requested shop, so I should tap it to open the details, "
+    "then find the delivery fee before adding anything to the cart. "
+)
+ACTION = 'do(action="Tap", element=[512, 348])'
+
+
+class LegacySplitter:
+    """The splitter as it was before the streaming marker matcher."""
+
+    ACTION_MARKERS = ["finish(message=", "do(action="]
+
+    def __init__(self):
+        self.raw_content = ""
+        self.in_action_phase = False
+        self.thinking_printed = []
+        self._buffer = ""
+
+    def feed(self, content: str) -> None:
+        self.raw_content += content
+        if self.in_action_phase:
+            return
+
+        self._buffer += content
+        for marker in self.ACTION_MARKERS:
+            if marker in self._buffer:
+                self.thinking_printed.append(self._buffer.split(marker, 1)[0])
+                self.thinking_printed.append("\n")
+                self.in_action_phase = True
+                return
+
+        for marker in self.ACTION_MARKERS:
+            for i in range(1, len(marker)):
+                if self._buffer.endswith(marker[:i]):
+                    return
+
+        self.thinking_printed.append(self._buffer)
+        self._buffer = ""
+
+
+def synthesize(length: int, seed: int = 0) -> list[str]:
+    """Build the deltas of a stream with about `length` characters of thinking."""
+    rng = random.Random(seed)
+    text = (THINKING * (length // len(THINKING) + 1))[:length] + ACTION
+    deltas = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        deltas.append(text[i : i + size])
+        i += size
+    return deltas
+
+
+def load_sse(path: str) -> list[str]:
+    """Read the content deltas of a recorded SSE stream."""
+    deltas = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("data:") or line == "data: [DONE]":
+                continue
+            choices = json.loads(line[len("data:") :]).get("choices") or []
+            if choices and choices[0].get("delta", {}).get("content") is not None:
+                deltas.append(choices[0]["delta"]["content"])
+    return deltas
+
+
+def replay(make_splitter, deltas: list[str], repeat: int) -> tuple[float, object]:
+    """Feed all deltas through fresh splitters; return the best time."""
+    best = float("inf")
+    splitter = None
+    for _ in range(repeat):
+        splitter = make_splitter()
+        start = time.perf_counter()
+        for delta in deltas:
+            splitter.feed(delta)
+        splitter.raw_content  # Joined lazily by the new splitter
+        best = min(best, time.perf_counter() - start)
+    return best, splitter
+
+
+class _CapturingSplitter(_StreamSplitter):
+    """Current splitter, recording printed thinking instead of printing it."""
+
+    def __init__(self):
+        super().__init__(echo=False)
+        self.thinking_printed = []
+
+    def _print(self, text: str) -> None:
+        self.thinking_printed.append(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the streaming thinking/action splitter",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 400_000],
+        help="Thinking lengths (characters) of the synthesized streams",
+    )
+    parser.add_argument(
+        "--sse", action="append", default=[], help="Recorded SSE stream to replay"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    streams = [(os.path.basename(path), load_sse(path)) for path in args.sse]
+    if not streams:
+        streams = [(f"{n} chars", synthesize(n)) for n in args.lengths]
+
+    print(
+        f"{'stream':<16}{'deltas':>9}{'legacy ms':>12}{'current ms':>12}{'speedup':>9}"
+    )
+    print("-" * 58)
+    for name, deltas in streams:
+        legacy_time, legacy = replay(LegacySplitter, deltas, args.repeat)
+        current_time, current = replay(_CapturingSplitter, deltas, args.repeat)
+
+        # Without an action, the legacy splitter never prints a held-back tail
+        same = (
+            legacy.raw_content == current.raw_content
+            and legacy.in_action_phase == current.in_action_phase
+            and (
+                not legacy.in_action_phase
+                or "".join(legacy.thinking_printed) == "".join(current.thinking_printed)
+            )
+        )
+        print(
+            f"{name:<16}{len(deltas):>9}{legacy_time * 1000:>12.2f}"
+            f"{current_time * 1000:>12.2f}{legacy_time / current_time:>8.1f}x"
+            + ("" if same else "   OUTPUT DIFFERS")
+        )
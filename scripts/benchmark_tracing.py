@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the cost of always-on tracing (phone_agent.tracing).
+
+Times an empty traced section with tracing on and off, and a cheap
+stand-in for a device call with and without a span around it, then puts
+the cost in proportion to an agent step: a step records about a dozen
+spans and takes hundreds of milliseconds to seconds.
+
+Usage examples:
+  python scripts/benchmark_tracing.py
+  python scripts/benchmark_tracing.py --iterations 1000000 --spans-per-step 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.tracing import Tracer  # noqa: E402
+
+
+def per_call_ns(fn, iterations: int) -> float:
+    """Best-of-three mean time of fn() in nanoseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter_ns() - start) / iterations)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Microbenchmark the cost of tracing spans",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--spans-per-step", type=int, default=12)
+    parser.add_argument(
+        "--step-ms", type=float, default=500, help="Duration of a fast agent step"
+    )
+    args = parser.parse_args()
+
+    enabled = Tracer(max_spans=65536)
+    disabled = Tracer(enabled=False)
+    payload = {"cmd": "input"}
+
+    def bare() -> None:
+        len(payload)
+
+    def traced_on() -> None:
+        with enabled.span("adb shell", "device", cmd="input"):
+            len(payload)
+
+    def traced_off() -> None:
+        with disabled.span("adb shell", "device", cmd="input"):
+            len(payload)
+
+    base = per_call_ns(bare, args.iterations)
+    on = per_call_ns(traced_on, args.iterations) - base
+    off = per_call_ns(traced_off, args.iterations) - base
+
+    step_overhead = on * args.spans_per_step / 1e6
+    print(f"{args.iterations} spans, best of 3")
+    print(f"{'tracing on':<14}{on:>9.0f} ns/span")
+    print(f"{'tracing off':<14}{off:>9.0f} ns/span")
+    print(
+        f"\n{args.spans_per_step} spans per step: {step_overhead * 1000:.1f} us, "
+        f"{step_overhead / args.step_ms:.5%} of a {args.step_ms:g} ms step"
+    )
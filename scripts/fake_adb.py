@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for the `adb` binary, used by the benchmark scripts.
+
+It understands just enough of the adb command line to serve screenshots from a
+local image file and to run shell commands with the local `sh`, so capture and
+command paths can be compared without a real device.
+
+Environment Variables:
+    FAKE_ADB_DIR: Directory used as the fake device storage (required).
+    FAKE_ADB_FRAME: PNG file served as the current screen (required).
+    FAKE_ADB_LATENCY: Simulated per-invocation connection latency in seconds.
+    FAKE_ADB_CRLF: If set to 1, exec-out output is mangled with LF -> CRLF,
+        like old devices that run exec-out through a pty.
+"""
+
+import os
+import shutil
+import stat
+import struct
+import sys
+import time
+
+
+def install(workdir: str, frame: str, latency: float = 0.0) -> None:
+    """
+    Put a fake `adb` executable first on PATH for the current process.
+
+    Args:
+        workdir: Scratch directory for the shim and the fake device storage.
+        frame: PNG file served as the current screen.
+        latency: Simulated per-invocation connection latency in seconds.
+    """
+    storage = os.path.join(workdir, "device")
+    os.makedirs(storage, exist_ok=True)
+
+    # POSIX only: subprocess on Windows does not resolve .bat shims from PATH.
+    # The `screencap` shim serves the frame to commands run in the fake shell.
+    script = os.path.abspath(__file__)
+    for name, args in (("adb", ""), ("screencap", " --screencap")):
+        shim = os.path.join(workdir, name)
+        with open(shim, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}"{args} "$@"\n')
+        os.chmod(shim, os.stat(shim).st_mode | stat.S_IEXEC)
+
+    os.environ["PATH"] = workdir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["FAKE_ADB_DIR"] = storage
+    os.environ["FAKE_ADB_FRAME"] = frame
+    os.environ["FAKE_ADB_LATENCY"] = str(latency)
+
+
+def screencap(args: list[str], frame: str, storage: str) -> bytes:
+    """
+    Emulate the device's `screencap` command.
+
+    Args:
+        args: Arguments after `screencap`.
+        frame: PNG file served as the current screen.
+        storage: Directory used as the fake device storage.
+
+    Returns:
+        What screencap writes to stdout.
+    """
+    if args == ["-p"]:
+        with open(frame, "rb") as f:
+            return f.read()
+
+    if args[:1] == ["-p"] and len(args) == 2:
+        shutil.copyfile(frame, os.path.join(storage, os.path.basename(args[1])))
+        return b""
+
+    # Decode the frame once and keep the raw dump, like a real framebuffer
+    raw_path = os.path.join(storage, "framebuffer.raw")
+    if not os.path.exists(raw_path):
+        from PIL import Image
+
+        img = Image.open(frame).convert("RGBA")
+        with open(raw_path, "wb") as f:
+            f.write(struct.pack("<IIII", img.width, img.height, 1, 0))
+            f.write(img.tobytes())
+    with open(raw_path, "rb") as f:
+        return f.read()
+
+
+def main(argv: list[str]) -> int:
+    """Dispatch a fake adb command line."""
+    storage = os.environ["FAKE_ADB_DIR"]
+    frame = os.environ["FAKE_ADB_FRAME"]
+
+    if argv[:1] == ["--screencap"]:
+        # Invoked from inside the fake device shell, no adb connection cost
+        sys.stdout.buffer.write(screencap(argv[1:], frame, storage))
+        return 0
+
+    time.sleep(float(os.getenv("FAKE_ADB_LATENCY", "0")))
+
+    if argv[:1] == ["-s"]:
+        argv = argv[2:]
+
+    if argv[:2] == ["exec-out", "screencap"]:
+        data = screencap(argv[2:], frame, storage)
+        if os.getenv("FAKE_ADB_CRLF") == "1":
+            data = data.replace(b"\n", b"\r\n")
+        sys.stdout.buffer.write(data)
+        return 0
+
+    if argv[:1] == ["exec-out"]:
+        # Other commands run by the device shell, output passed through raw
+        os.execvp("sh", ["sh", "-c", " ".join(argv[1:])])
+
+    if argv[:2] == ["shell", "screencap"]:
+        sys.stdout.buffer.write(screencap(argv[2:], frame, storage))
+        return 0
+
+    if argv[:1] == ["pull"] and len(argv) == 3:
+        remote = os.path.join(storage, os.path.basename(argv[1]))
+        if not os.path.exists(remote):
+            print(f"adb: error: remote object '{argv[1]}' does not exist")
+            return 1
+        shutil.copyfile(remote, argv[2])
+        print(f"{argv[1]}: 1 file pulled.")
+        return 0
+
+    if argv == ["shell"]:
+        # Interactive shell without a pty, as adb uses when stdin is a pipe
+        os.execvp("sh", ["sh"])
+
+    if argv[:1] == ["shell"]:
+        # Like adb, run the arguments joined with spaces by the device shell
+        os.execvp("sh", ["sh", "-c", " ".join(argv[1:])])
+
+    if argv[:1] == ["devices"]:
+        print("List of devices attached")
+        print("fake-device\tdevice product:fake model:Fake_Device")
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for the adb server, speaking the smart-socket protocol.
+
+It serves a fake device whose shell commands run with the local `sh` and
+whose `screencap` serves a local image file (see fake_adb.py), so the socket
+transport in phone_agent.adb.protocol can be exercised without a device.
+Any serial starting with "fake-device" routes to it, so a fleet of devices
+can be simulated.
+
+Run directly to check the client against it:
+  python scripts/fake_adb_server.py
+"""
+
+import os
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_adb import screencap
+
+SERIAL = "fake-device"
+
+# Injectable failures: refuse shell v2 like a legacy device, or run a shell v2
+# command but drop the connection instead of answering
+FAILURES = ("no-shell-v2", "drop")
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves one client connection."""
+
+    server: "FakeADBServer"
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = self._read_request()
+            except ConnectionError:
+                return
+
+            if request == "host:version":
+                self._okay(self._string(b"0029"))
+                return
+            if request == "host:devices-l":
+                line = (
+                    f"{SERIAL}\tdevice product:fake model:Fake_Device transport_id:1\n"
+                )
+                self._okay(self._string(line.encode()))
+                return
+            if request == "host:transport-any" or request.startswith(
+                f"host:transport:{SERIAL}"
+            ):
+                # The connection now talks to the device; read the service next
+                self._okay()
+                continue
+            if request.startswith("host:transport:"):
+                self._fail(f"device '{request.split(':', 2)[2]}' not found")
+                return
+
+            service, _, command = request.partition(":")
+            if service == "shell,v2,raw" and self.server.failure == "no-shell-v2":
+                self._fail(f"unknown service: {request}")
+            elif service == "shell,v2,raw" and self.server.failure == "drop":
+                self.server.run(command)
+            elif service == "shell,v2,raw":
+                self._okay()
+                returncode, stdout, stderr = self.server.run(command)
+                self._packet(1, stdout)
+                self._packet(2, stderr)
+                self._packet(3, bytes([returncode & 0xFF]))
+            elif service == "shell":
+                self._okay()
+                _, stdout, stderr = self.server.run(command)
+                self.request.sendall(stdout + stderr)
+            elif service == "exec":
+                self._okay()
+                self.request.sendall(self.server.run(command)[1])
+            elif service == "sync":
+                self._okay()
+                self._sync()
+            else:
+                self._fail(f"unknown service: {request}")
+            return
+
+    def _sync(self) -> None:
+        """Serve RECV requests until QUIT or disconnect."""
+        while True:
+            header = self._read_exact(8)
+            tag, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if tag != b"RECV":
+                return
+            path = self._read_exact(length).decode()
+            local = os.path.join(self.server.storage, os.path.basename(path))
+            if not os.path.exists(local):
+                message = b"No such file or directory"
+                self.request.sendall(
+                    b"FAIL" + struct.pack("<I", len(message)) + message
+                )
+                return
+            with open(local, "rb") as f:
+                data = f.read()
+            for offset in range(0, len(data), 64 * 1024):
+                chunk = data[offset : offset + 64 * 1024]
+                self.request.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            self.request.sendall(b"DONE" + struct.pack("<I", 0))
+
+    def _read_request(self) -> str:
+        length = int(self._read_exact(4), 16)
+        return self._read_exact(length).decode()
+
+    def _read_exact(self, size: int) -> bytes:
+        buffer = b""
+        while len(buffer) < size:
+            chunk = self.request.recv(size - len(buffer))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            buffer += chunk
+        return buffer
+
+    def _okay(self, payload: bytes = b"") -> None:
+        self.request.sendall(b"OKAY" + payload)
+
+    def _fail(self, message: str) -> None:
+        self.request.sendall(b"FAIL" + self._string(message.encode()))
+
+    def _packet(self, packet_id: int, data: bytes) -> None:
+        if data or packet_id == 3:
+            self.request.sendall(
+                bytes([packet_id]) + struct.pack("<I", len(data)) + data
+            )
+
+    @staticmethod
+    def _string(data: bytes) -> bytes:
+        return b"%04x" % len(data) + data
+
+
+class FakeADBServer(socketserver.ThreadingTCPServer):
+    """
+    Fake adb server bound to an ephemeral localhost port.
+
+    Args:
+        frame: PNG file served by `screencap`.
+        storage: Directory used as the fake device storage.
+        failure: Failure injected into shell v2 requests (see FAILURES), or
+            None. Can be changed while serving.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, frame: str, storage: str, failure: str | None = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.frame = frame
+        self.storage = storage
+        self.failure = failure
+        self.commands: list[str] = []
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self.server_address[1]
+
+    def start(self) -> None:
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def run(self, command: str) -> tuple[int, bytes, bytes]:
+        """Run a device command, returning (exit status, stdout, stderr)."""
+        self.commands.append(command)
+        args = command.split()
+        if args[:1] == ["screencap"]:
+            return 0, screencap(args[1:], self.frame, self.storage), b""
+        result = subprocess.run(["sh", "-c", command], capture_output=True)
+        return result.returncode, result.stdout, result.stderr
+
+
+if __name__ == "__main__":
+    from PIL import Image
+
+    from phone_agent.adb.protocol import ADBProtocolError, ADBServerClient
+
+    with tempfile.TemporaryDirectory() as workdir:
+        frame = os.path.join(workdir, "frame.png")
+        Image.new("RGB", (108, 240), color=(30, 144, 255)).save(frame)
+
+        server = FakeADBServer(frame, workdir)
+        server.start()
+        client = ADBServerClient(port=server.port)
+
+        print("devices:", client.devices())
+        print("shell:", client.shell(SERIAL, "echo out; echo err >&2; exit 3"))
+        png = client.exec_out(None, "screencap -p")
+        print("exec-out:", len(png), "bytes, png" if png.startswith(b"\x89PNG") else "")
+        client.shell(SERIAL, "screencap -p /sdcard/tmp.png")
+        pulled = [len(client.pull(SERIAL, "/sdcard/tmp.png")) for _ in range(3)]
+        print("pull (pooled):", pulled)
+        try:
+            client.shell("missing", "true")
+        except ADBProtocolError as e:
+            print("error:", e)
+
+        client.close()
+        server.stop()
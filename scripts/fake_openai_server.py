@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for an OpenAI-compatible inference server.
+
+It streams a fixed chat completion token by token and simulates automatic
+prefix caching: prompts are hashed in fixed-size blocks, blocks seen before
+count as cached tokens (reported in `usage`) and skip the simulated prefill
+time. Stream options are handled like vLLM (include_usage and
+continuous_usage_stats), and a client that disconnects aborts the
+generation, so ModelClient can be exercised and benchmarked without a GPU.
+Failures can be injected to exercise failover between several servers.
+
+Run directly to serve on a fixed port:
+  python scripts/fake_openai_server.py --port 8000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import select
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phone_agent.model.context import estimate_tokens  # noqa: E402
+
+REPLY = (
+    "<think>The settings page is open. The display section is further down, "
+    "so I need to scroll before I can see the dark mode switch. Nothing on "
+    "this screen asks for confirmation, and the previous action worked as "
+    "expected, so I keep going with the plan: scroll, open Display, then turn "
+    "the switch on.</think>"
+    '<answer>do(action="Swipe", start=[500, 800], end=[500, 300])</answer>'
+)
+BLOCK_CHARS = 64  # Prefix cache granularity, in prompt characters
+# Injectable failures: answer 503, drop the connection before the first
+# token, drop it halfway through the stream, or keep it open but stop
+# sending before the first token (stall) or halfway through (hang)
+FAILURES = ("status", "reset", "drop", "stall", "hang")
+STALL_SECONDS = 3600
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves one HTTP request."""
+
+    server: "FakeOpenAIServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(
+                200, {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+            )
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+
+        server = self.server
+        server.requests += 1
+        if server.failure == "status":
+            server.failed += 1
+            self._json(503, {"error": {"message": "overloaded"}})
+            return
+        if server.failure == "reset":
+            server.failed += 1
+            self.close_connection = True
+            return
+
+        prompt_tokens, cached_tokens = server.prefill(body.get("messages", []))
+        time.sleep(server.latency_seconds)
+        if random.random() < server.slow_rate:
+            time.sleep(server.slow_seconds)
+        time.sleep(server.prefill_seconds(prompt_tokens - cached_tokens))
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 0,
+            "total_tokens": prompt_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        if not body.get("stream"):
+            usage["completion_tokens"] = len(server.tokens)
+            time.sleep(server.decode_seconds * len(server.tokens))
+            message = {"role": "assistant", "content": server.reply}
+            self._json(200, self._completion(message, usage))
+            return
+
+        options = body.get("stream_options") or {}
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, token in enumerate(server.tokens):
+                if server.failure == "stall" and i == 0:
+                    server.failed += 1
+                    self._wait_for_disconnect(STALL_SECONDS)
+                    server.aborted += 1
+                    self.close_connection = True
+                    return
+                if server.failure in ("drop", "hang") and i == len(server.tokens) // 2:
+                    server.failed += 1
+                    if server.failure == "hang":
+                        time.sleep(STALL_SECONDS)
+                    self.close_connection = True
+                    return
+                time.sleep(server.decode_seconds)
+                chunk = self._chunk({"content": token})
+                if options.get("continuous_usage_stats"):
+                    usage["completion_tokens"] = i + 1
+                    chunk["usage"] = dict(usage, total_tokens=prompt_tokens + i + 1)
+                self._event(json.dumps(chunk))
+            if options.get("include_usage"):
+                usage["completion_tokens"] = len(server.tokens)
+                final = self._chunk(None)
+                final["choices"] = []
+                final["usage"] = usage
+                self._event(json.dumps(final))
+            self._event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            server.completed += 1
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream: abort like a real server would
+            server.aborted += 1
+
+    def _wait_for_disconnect(self, seconds: float) -> None:
+        """Send nothing until the client closes the connection or time is up."""
+        end = time.time() + seconds
+        while time.time() < end:
+            readable, _, _ = select.select([self.connection], [], [], 0.05)
+            if readable and not self.connection.recv(1, socket.MSG_PEEK):
+                return
+
+    def _completion(self, message: dict, usage: dict) -> dict:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    def _chunk(self, delta: dict | None) -> dict:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": 0, "delta": delta or {}, "finish_reason": None}],
+        }
+
+    def _event(self, data: str) -> None:
+        payload = f"data: {data}\n\n".encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+        self.wfile.flush()
+
+    def _json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Fake OpenAI-compatible server bound to a localhost port.
+
+    Args:
+        port: Port to listen on; 0 picks a free one.
+        reply: Completion streamed for every request.
+        prefill_ms_per_1k: Simulated prefill time per 1000 uncached tokens.
+        decode_ms: Simulated time per streamed token.
+        latency_ms: Extra time before the first token, e.g. a slow replica.
+        slow_rate: Fraction of requests that are slow, e.g. hit a GC pause or
+            a long queue (tail latency).
+        slow_ms: Extra time before the first token of a slow request.
+        failure: Failure injected into every completion (see FAILURES), or
+            None. Can be changed while serving.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        reply: str = REPLY,
+        prefill_ms_per_1k: float = 50,
+        decode_ms: float = 10,
+        latency_ms: float = 0,
+        failure: str | None = None,
+        slow_rate: float = 0,
+        slow_ms: float = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.reply = reply
+        # Roughly token-sized pieces, as a tokenizer would stream them
+        self.tokens = [reply[i : i + 4] for i in range(0, len(reply), 4)]
+        self.prefill_ms_per_1k = prefill_ms_per_1k
+        self.decode_seconds = decode_ms / 1000
+        self.latency_seconds = latency_ms / 1000
+        self.failure = failure
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_ms / 1000
+        self.requests = 0
+        self.completed = 0
+        self.aborted = 0
+        self.failed = 0
+        self._blocks: set[bytes] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI base URL of the server."""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def prefill_seconds(self, tokens: int) -> float:
+        """Simulated prefill time of uncached prompt tokens."""
+        return tokens * self.prefill_ms_per_1k / 1_000_000
+
+    def prefill(self, messages: list) -> tuple[int, int]:
+        """
+        Cache the prompt's blocks and measure it.
+
+        Returns:
+            Tuple of (prompt tokens, prompt tokens already cached).
+        """
+        text = json.dumps(messages, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha256()
+        cached_chars = 0
+        with self._lock:
+            for start in range(0, len(text) - BLOCK_CHARS + 1, BLOCK_CHARS):
+                # Each block hash covers the whole prefix, as in vLLM
+                digest.update(text[start : start + BLOCK_CHARS].encode())
+                key = digest.copy().digest()
+                if key in self._blocks and cached_chars == start:
+                    cached_chars = start + BLOCK_CHARS
+                self._blocks.add(key)
+
+        prompt_tokens = estimate_tokens(text)
+        cached_tokens = estimate_tokens(text[:cached_chars])
+        return prompt_tokens, min(cached_tokens, prompt_tokens)
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients closing idle keep-alive connections are not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self) -> None:
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=50)
+    parser.add_argument("--decode-ms", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--failure", choices=FAILURES)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        args.port,
+        REPLY,
+        args.prefill_ms_per_1k,
+        args.decode_ms,
+        args.latency_ms,
+        args.failure,
+    )
+    print(f"Serving {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -34,6 +34,13 @@ setup(
         "openai>=2.9.0",
     ],
     extras_require={
+        "async": [
+            "httpx>=0.23.0",
+        ],
+        # Zero-copy decoding of raw screenshots (PHONE_AGENT_SCREENSHOT_MODE=raw)
+        "fast": [
+            "numpy>=1.24.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",
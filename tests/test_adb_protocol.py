@@ -0,0 +1,94 @@
+"""adb server socket transport against an in-process fake adb server."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from fake_adb_server import SERIAL, FakeADBServer
+
+from phone_agent.adb import aio, protocol
+from phone_agent.adb.protocol import ADBProtocolError, ADBServerClient
+
+
+@pytest.fixture
+def server(tmp_path):
+    frame = tmp_path / "frame.png"
+    Image.new("RGB", (108, 240), color=(30, 144, 255)).save(frame)
+    server = FakeADBServer(str(frame), str(tmp_path))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = ADBServerClient(port=server.port, timeout=5)
+    yield client
+    client.close()
+
+
+def test_devices(client):
+    assert client.devices()[0][:2] == (SERIAL, "device")
+
+
+def test_shell_v2_separates_streams_and_exit_status(client):
+    result = client.shell(SERIAL, "echo out; echo err >&2; exit 3")
+
+    assert result == (3, b"out\n", b"err\n")
+
+
+def test_exec_out_is_binary_safe(client):
+    png = client.exec_out(SERIAL, "screencap -p")
+
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def test_pull_reuses_the_sync_connection(client):
+    client.shell(SERIAL, "screencap -p /sdcard/tmp.png")
+
+    pulled = [client.pull(SERIAL, "/sdcard/tmp.png") for _ in range(3)]
+
+    assert pulled[0].startswith(b"\x89PNG") and pulled.count(pulled[0]) == 3
+    assert len(client._sync_pool[SERIAL]) == 1
+
+
+def test_unknown_device_raises(client):
+    with pytest.raises(ADBProtocolError, match="not found"):
+        client.shell("missing", "true")
+
+
+def test_refused_shell_v2_falls_back_to_legacy_shell(server, client):
+    server.failure = "no-shell-v2"
+
+    result = client.shell(SERIAL, "echo out; exit 3")
+
+    # The legacy shell has no exit status and merges stderr into stdout
+    assert result == (None, b"out\n", b"")
+    assert not client.shell_v2_supported(SERIAL)
+    assert server.commands == ["echo out; exit 3"]
+
+
+def test_dropped_shell_v2_reply_is_not_sent_again(server, client):
+    server.failure = "drop"
+
+    with pytest.raises(ADBProtocolError):
+        client.shell(SERIAL, "echo once")
+
+    # The command may have run, so it must not be repeated on the legacy shell
+    assert server.commands == ["echo once"]
+    assert client.shell_v2_supported(SERIAL)
+
+
+def test_async_dropped_shell_v2_reply_is_not_sent_again(server, client, monkeypatch):
+    monkeypatch.setattr(protocol, "_client", client)
+    server.failure = "drop"
+
+    with pytest.raises(ADBProtocolError):
+        asyncio.run(aio._socket_shell(SERIAL, "echo once"))
+
+    assert server.commands == ["echo once"]
@@ -0,0 +1,38 @@
+"""Capture method fallbacks of the ADB screenshot path."""
+
+import asyncio
+import subprocess
+
+from PIL import Image
+
+from phone_agent.adb import aio
+from phone_agent.adb import screenshot as adb_screenshot
+from phone_agent.screenshot import Screenshot
+
+PULLED = Screenshot.from_image(Image.new("RGB", (4, 8)))
+
+
+def _time_out(device_id, command, timeout):
+    raise subprocess.TimeoutExpired(command, timeout)
+
+
+def test_capture_error_falls_back_to_pull(monkeypatch):
+    monkeypatch.setattr(adb_screenshot, "_exec_out", _time_out)
+    monkeypatch.setattr(adb_screenshot, "_get_screenshot_pull", lambda *args: PULLED)
+
+    assert adb_screenshot.get_screenshot("timeout-device") is PULLED
+    # A timeout says nothing about the method, so it stays enabled
+    assert adb_screenshot.capture_methods("timeout-device")[0] == "exec-out"
+
+
+def test_async_capture_error_falls_back_to_pull(monkeypatch):
+    async def time_out(command, device_id, timeout):
+        raise subprocess.TimeoutExpired(command, timeout)
+
+    async def pull(device_id, timeout):
+        return PULLED
+
+    monkeypatch.setattr(aio, "exec_out", time_out)
+    monkeypatch.setattr(aio, "_get_screenshot_pull", pull)
+
+    assert asyncio.run(aio.get_screenshot("timeout-device")) is PULLED
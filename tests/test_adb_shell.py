@@ -0,0 +1,75 @@
+"""Persistent shell sessions against the fake adb binary."""
+
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+import fake_adb
+
+from phone_agent.adb import protocol, shell
+from phone_agent.adb.shell import ShellSession, ShellSessionError, run_shell
+
+
+@pytest.fixture
+def fake_device(tmp_path, monkeypatch):
+    for name in ("PATH", "FAKE_ADB_DIR", "FAKE_ADB_FRAME", "FAKE_ADB_LATENCY"):
+        monkeypatch.setenv(name, os.environ.get(name, ""))
+    frame = tmp_path / "frame.png"
+    Image.new("RGB", (108, 240)).save(frame)
+    fake_adb.install(str(tmp_path), str(frame))
+
+    monkeypatch.setattr(protocol, "_ADB_TRANSPORT", "binary")
+    monkeypatch.setattr(shell, "_PERSISTENT_SHELL", True)
+    monkeypatch.setattr(shell, "_SESSION_UNSUPPORTED", set())
+    yield
+    shell.close_sessions()
+
+
+def test_session_frames_each_command(fake_device):
+    session = ShellSession()
+    try:
+        assert session.run("echo one") == (0, b"one\n")
+        # No trailing newline, stderr merged, exit status kept
+        assert session.run("printf two; echo err >&2; (exit 3)") == (
+            3,
+            b"twoerr\n",
+        )
+        assert session.run("true") == (0, b"")
+        # The sentinel of an earlier command never leaks into later output
+        assert session.run("seq 3") == (0, b"1\n2\n3\n")
+    finally:
+        session.close()
+
+
+def test_session_restarts_after_the_shell_exits(fake_device):
+    session = ShellSession()
+    try:
+        session.run("true")
+        session._process.kill()
+        session._process.wait()
+
+        assert session.run("echo back") == (0, b"back\n")
+    finally:
+        session.close()
+
+
+def test_run_shell_uses_the_session(fake_device):
+    result = run_shell(["echo", "hi"])
+
+    assert (result.returncode, result.stdout) == (0, "hi\n")
+    assert shell._sessions[None]._process is not None
+
+
+def test_unresponsive_session_falls_back_to_adb_shell(fake_device, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_LATENCY", "0.5")
+    monkeypatch.setattr(shell, "_START_TIMEOUT", 0.1)
+
+    with pytest.raises(ShellSessionError):
+        ShellSession().start()
+
+    result = run_shell(["echo", "hi"])
+    assert (result.returncode, result.stdout) == (0, "hi\n")
@@ -0,0 +1,112 @@
+"""Batch runs: task files, the results store and resuming."""
+
+import json
+
+from phone_agent.batch import ResultStore, read_tasks, run_batch
+from phone_agent.fleet import TaskResult
+
+
+def result(task_id: str, success: bool = True) -> TaskResult:
+    return TaskResult(
+        task=f"task {task_id}",
+        device_id="fake-device",
+        success=success,
+        message="",
+        steps=1,
+        started_at=0.0,
+        duration=0.0,
+        task_id=task_id,
+    )
+
+
+class StubFleet:
+    """Runs tasks instantly, failing the ones listed."""
+
+    def __init__(self, failing: tuple[str, ...] = ()):
+        self.failing = failing
+        self.ran: list[str] = []
+
+    def run(self, tasks, on_result=None):
+        for task_id, _ in tasks:
+            self.ran.append(task_id)
+            on_result(result(task_id, success=task_id not in self.failing))
+        return {"tasks": len(self.ran)}
+
+
+def write_tasks(path, lines: list[str]) -> str:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_tasks_assigns_ids_and_skips_bad_lines(tmp_path, capsys):
+    path = write_tasks(
+        tmp_path / "tasks.jsonl",
+        [
+            '{"id": "a", "task": "Open WeChat"}',
+            '"Open Maps"',
+            "",
+            "{not json",
+            '{"id": "a", "task": "Repeated id"}',
+            '{"id": 7, "task": "Numeric id"}',
+            '{"id": "b"}',
+        ],
+    )
+
+    tasks = list(read_tasks(path))
+
+    assert tasks == [("a", "Open WeChat"), ("line-2", "Open Maps"), ("7", "Numeric id")]
+    output = capsys.readouterr().out
+    assert "invalid JSON" in output
+    assert "duplicate id 'a'" in output
+    assert "no task" in output
+
+
+def test_result_store_keeps_the_latest_outcome(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with ResultStore(path) as store:
+        store.append(result("a"))
+        store.append(result("b", success=False))
+        store.append(result("c", success=False))
+        store.append(result("c"))
+
+    store = ResultStore(path)
+    assert store.done_ids() == {"a", "b", "c"}
+    assert store.done_ids(retry_failed=True) == {"a", "c"}
+
+
+def test_result_store_skips_a_torn_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    record = json.dumps({"id": "a", "success": True})
+    path.write_text(record + '\n{"id": "b", "succ', encoding="utf-8")
+
+    with ResultStore(str(path)) as store:
+        assert store.done_ids() == {"a"}
+        store.append(result("c"))
+
+    # The next record starts on its own line
+    assert ResultStore(str(path)).done_ids() == {"a", "c"}
+
+
+def test_run_batch_resumes_where_it_stopped(tmp_path):
+    tasks = write_tasks(tmp_path / "tasks.jsonl", ['"one"', '"two"', '"three"'])
+    results = str(tmp_path / "results.jsonl")
+    # A crash after the first task left one result behind
+    with ResultStore(results) as store:
+        store.append(result("line-1"))
+
+    fleet = StubFleet(failing=("line-2",))
+    stats = run_batch(fleet, tasks, results)
+
+    assert fleet.ran == ["line-2", "line-3"]
+    assert stats["skipped"] == 1
+
+    fleet = StubFleet()
+    stats = run_batch(fleet, tasks, results, retry_failed=True)
+
+    assert fleet.ran == ["line-2"]
+    assert stats["skipped"] == 2
+    assert ResultStore(results).done_ids(retry_failed=True) == {
+        "line-1",
+        "line-2",
+        "line-3",
+    }
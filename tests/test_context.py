@@ -0,0 +1,78 @@
+"""Token-budgeted context folding."""
+
+import json
+
+from phone_agent.model.context import ContextManager, estimate_tokens
+
+
+def build_context(steps: int, padding: int = 400) -> list[dict]:
+    """System prompt, then one user/assistant turn per step and the next user."""
+    messages = [{"role": "system", "content": "You are a phone agent."}]
+    for step in range(1, steps + 2):
+        screen = json.dumps({"current_app": f"App{step}"})
+        text = f"Task text\n{'x' * padding}" if step == 1 else "y" * padding
+        messages.append({"role": "user", "content": f"{text}\n\n{screen}"})
+        if step <= steps:
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": f"<think>{'z' * padding}</think>"
+                    f'<answer>do(action="Tap", element=[{step}, {step}])</answer>',
+                }
+            )
+    return messages
+
+
+def test_estimate_tokens_counts_cjk_characters_as_one_token():
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("打开微信") == 4
+
+
+def test_context_within_budget_is_sent_as_is():
+    messages = build_context(6)
+    manager = ContextManager(max_tokens=100_000)
+
+    assert manager.fit(messages) is messages
+
+
+def test_oldest_turns_are_folded_into_a_summary():
+    messages = build_context(10)
+    manager = ContextManager(max_tokens=1500, keep_turns=2)
+
+    fitted = manager.fit(messages)
+
+    # System prompt and task stay, the summary follows, the newest turns stay
+    assert fitted[:2] == messages[:2]
+    summary = fitted[2]["content"]
+    assert summary.startswith("Steps 1-")
+    assert '1. [App1] do(action="Tap", element=[1, 1])' in summary
+    assert "<think>" not in summary
+    assert fitted[-5:] == messages[-5:]
+    assert manager.last_tokens <= 1500
+
+
+def test_fold_is_kept_while_the_prompt_fits():
+    manager = ContextManager(max_tokens=2000, keep_turns=2)
+    first = manager.fit(build_context(10))
+    second = manager.fit(build_context(11))
+
+    # The next request extends the previous one, so the prefix stays cached
+    assert second[: len(first) - 1] == first[:-1]
+
+
+def test_summary_lines_are_dropped_when_the_summary_is_too_large():
+    manager = ContextManager(max_tokens=700, keep_turns=1)
+
+    fitted = manager.fit(build_context(60, padding=100))
+
+    assert "earliest omitted" in fitted[2]["content"]
+    assert manager.last_tokens <= 700
+
+
+def test_shorter_context_starts_a_new_fold():
+    manager = ContextManager(max_tokens=1500, keep_turns=2)
+    manager.fit(build_context(10))
+
+    fitted = manager.fit(build_context(3))
+
+    assert fitted == build_context(3)
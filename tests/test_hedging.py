@@ -0,0 +1,114 @@
+"""Model requests (hedging, inline reads) against in-process fake replicas."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from fake_openai_server import FakeOpenAIServer
+
+from phone_agent.model import ModelClient, ModelConfig
+from phone_agent.model import client as client_module
+from phone_agent.model.pool import ModelTimeoutError
+
+
+@pytest.fixture
+def replicas():
+    stalled = FakeOpenAIServer(decode_ms=0, failure="stall")
+    healthy = FakeOpenAIServer(decode_ms=0)
+    stalled.start()
+    healthy.start()
+    yield stalled, healthy
+    stalled.stop()
+    healthy.stop()
+
+
+def test_losing_hedge_is_aborted(replicas):
+    stalled, healthy = replicas
+    client = ModelClient(
+        ModelConfig(
+            base_urls=[stalled.base_url, healthy.base_url],
+            hedge_percentile=50,
+            hedge_min_delay=0.05,
+        )
+    )
+    # Hedge after the minimum delay instead of waiting for measured requests
+    client._ttfts.extend([0.01] * 20)
+
+    response = client.request([{"role": "user", "content": "Hi"}], echo=False)
+
+    assert "Swipe" in response.action
+    assert response.hedge_won
+    assert stalled.requests == 1
+    # The replica that never sent a token sees the disconnect right away,
+    # not after the read timeout
+    deadline = time.time() + 2
+    while stalled.aborted == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert stalled.aborted == 1
+
+
+@pytest.fixture
+def replica():
+    server = FakeOpenAIServer(decode_ms=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_single_endpoint_reads_inline(replica, monkeypatch):
+    threads = []
+    read = ModelClient._read
+
+    def record(self, *args):
+        threads.append(args)
+        read(self, *args)
+
+    monkeypatch.setattr(ModelClient, "_read", record)
+    client = ModelClient(ModelConfig(base_url=replica.base_url))
+
+    response = client.request([{"role": "user", "content": "Hi"}], echo=False)
+
+    assert "Swipe" in response.action
+    assert threads == []
+
+
+def test_completed_stream_is_not_aborted(replica, monkeypatch):
+    aborted = []
+    monkeypatch.setattr(client_module, "_abort_response", aborted.append)
+    # Read every stream to the end instead of closing it at the action end
+    client = ModelClient(
+        ModelConfig(base_url=replica.base_url, stop_at_action_end=False)
+    )
+
+    for _ in range(3):
+        client.request([{"role": "user", "content": "Hi"}], echo=False)
+
+    # Only streams cut off before their end have their connection shut down
+    assert replica.completed == 3
+    assert aborted == []
+
+
+def test_inline_first_token_timeout_aborts_the_stream():
+    stalled = FakeOpenAIServer(decode_ms=0, failure="stall")
+    stalled.start()
+    try:
+        client = ModelClient(
+            ModelConfig(
+                base_url=stalled.base_url, first_token_timeout=0.3, max_retries=0
+            )
+        )
+        start = time.time()
+        with pytest.raises(ModelTimeoutError):
+            client.request([{"role": "user", "content": "Hi"}], echo=False)
+        assert time.time() - start < 2
+
+        deadline = time.time() + 2
+        while stalled.aborted == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert stalled.aborted == 1
+    finally:
+        stalled.stop()
@@ -0,0 +1,171 @@
+"""Endpoint routing and circuit breakers of the model pool."""
+
+import openai
+import pytest
+
+from phone_agent.model.pool import (
+    EndpointPool,
+    ModelTimeoutError,
+    ModelUnavailableError,
+    is_endpoint_failure,
+)
+
+URLS = ["http://a/v1", "http://b/v1", "http://c/v1"]
+
+
+def make_pool(routing: str = "least_outstanding", **kwargs) -> EndpointPool:
+    return EndpointPool(URLS, lambda url: None, routing=routing, **kwargs)
+
+
+def test_pool_rejects_bad_configuration():
+    with pytest.raises(ValueError):
+        EndpointPool([], lambda url: None)
+    with pytest.raises(ValueError):
+        make_pool(routing="random")
+
+
+def test_least_outstanding_spreads_requests_in_flight():
+    pool = make_pool()
+
+    picked = [pool.acquire().base_url for _ in URLS]
+
+    assert sorted(picked) == URLS
+    assert [e.outstanding for e in pool.endpoints] == [1, 1, 1]
+
+
+def test_ties_go_to_the_least_recently_used_endpoint():
+    pool = make_pool()
+    for _ in URLS:
+        pool.release(pool.acquire(), ttft=0.1)
+
+    first = pool.acquire()
+    pool.release(first, ttft=0.1)
+
+    assert pool.acquire() is not first
+
+
+def test_ewma_prefers_the_fastest_measured_endpoint():
+    pool = make_pool(routing="ewma")
+    a, b, c = pool.endpoints
+    for endpoint, ttft in ((a, 1.0), (b, 0.1), (c, 0.15)):
+        pool.acquire(exclude={e.base_url for e in pool.endpoints} - {endpoint.base_url})
+        pool.release(endpoint, ttft=ttft)
+
+    assert pool.acquire() is b
+    # b is now busy: its expected wait doubles past c's
+    assert pool.acquire() is c
+
+
+def test_ewma_tries_unmeasured_endpoints_first():
+    pool = make_pool(routing="ewma")
+    measured = pool.acquire()
+    pool.release(measured, ttft=0.01)
+
+    assert pool.acquire() is not measured
+
+
+def test_ewma_smooths_ttft():
+    pool = make_pool(routing="ewma", ewma_alpha=0.5)
+    endpoint = pool.endpoints[0]
+    for ttft in (1.0, 2.0):
+        pool.acquire(exclude=set(URLS[1:]))
+        pool.release(endpoint, ttft=ttft)
+
+    assert endpoint.ewma_ttft == pytest.approx(1.5)
+
+
+def test_excluded_endpoints_are_skipped_for_failover():
+    pool = make_pool()
+
+    assert pool.acquire(exclude=set(URLS[:2])).base_url == URLS[2]
+    assert pool.acquire(exclude=set(URLS)) is None
+
+
+def fail(pool: EndpointPool, url: str, times: int) -> None:
+    """Send requests to one endpoint and fail them."""
+    for _ in range(times):
+        endpoint = pool.acquire(exclude=set(URLS) - {url})
+        pool.release(endpoint, error=ModelTimeoutError("no first token"))
+
+
+def test_endpoint_failures_are_the_replicas_fault():
+    assert is_endpoint_failure(ModelTimeoutError())
+    assert not is_endpoint_failure(ValueError())
+
+
+@pytest.mark.parametrize("status, failure", [(503, True), (429, True), (400, False)])
+def test_status_errors_count_unless_every_replica_would_fail(status, failure):
+    httpx = pytest.importorskip("httpx")
+    request = httpx.Request("POST", "http://a/v1/chat/completions")
+    response = httpx.Response(status, request=request)
+    error = openai.APIStatusError("error", response=response, body=None)
+
+    assert is_endpoint_failure(error) is failure
+
+
+def test_circuit_opens_after_consecutive_failures():
+    pool = make_pool(breaker_threshold=2)
+
+    fail(pool, URLS[0], 1)
+    assert pool.endpoints[0].healthy
+    fail(pool, URLS[0], 1)
+
+    assert not pool.endpoints[0].healthy
+    assert URLS[0] not in {pool.acquire().base_url for _ in range(4)}
+
+
+def test_success_resets_the_failure_count():
+    pool = make_pool(breaker_threshold=2)
+
+    fail(pool, URLS[0], 1)
+    pool.release(pool.acquire(exclude=set(URLS[1:])), ttft=0.1)
+    fail(pool, URLS[0], 1)
+
+    assert pool.endpoints[0].healthy
+
+
+def test_answer_without_content_closes_the_circuit():
+    pool = make_pool(breaker_threshold=2)
+
+    fail(pool, URLS[0], 1)
+    pool.release(pool.acquire(exclude=set(URLS[1:])), completed=True)
+
+    assert pool.endpoints[0].consecutive_failures == 0
+
+
+def test_all_circuits_open_fails_fast():
+    pool = make_pool(breaker_threshold=1)
+    for url in URLS:
+        fail(pool, url, 1)
+
+    with pytest.raises(ModelUnavailableError):
+        pool.acquire()
+    assert pool.acquire(healthy_only=True) is None
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    # A zero ejection makes the open circuit half-open right away
+    pool = make_pool(breaker_threshold=1, eject_seconds=0)
+    fail(pool, URLS[0], 1)
+    only_a = set(URLS[1:])
+
+    trial = pool.acquire(exclude=only_a)
+    assert trial.trial
+    assert pool.stats()[0]["half_open"]
+    # Closed circuits are preferred, and the trial is the only request
+    assert pool.acquire().base_url != URLS[0]
+    with pytest.raises(ModelUnavailableError):
+        pool.acquire(exclude=only_a)
+
+    pool.release(trial, ttft=0.1)
+    assert not pool.stats()[0]["half_open"]
+
+
+def test_failed_trial_opens_the_circuit_again():
+    pool = make_pool(breaker_threshold=1, eject_seconds=0)
+    fail(pool, URLS[0], 1)
+    pool.eject_seconds = 60
+
+    fail(pool, URLS[0], 1)
+
+    assert not pool.endpoints[0].healthy